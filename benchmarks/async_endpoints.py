@@ -0,0 +1,204 @@
+"""
+Offer listing under WSGI with a fixed thread pool versus ASGI with the async views.
+
+Usage:
+    python -m benchmarks.async_endpoints [--concurrency 8 32 128] [--threads 8] [--requests 500]
+
+The test database is seeded once, then every stack is served by its own process:
+- wsgi-sync: focunti/wsgi.py behind a WSGI server with a pool of --threads threads, /api/offers/.
+- asgi-sync: focunti/asgi.py behind uvicorn, the DRF view /api/offers/ runs in a thread.
+- asgi-async: focunti/asgi.py behind uvicorn, the async view /api/async/offers/.
+
+For each number of concurrent clients it reports req/s, p50/p99 latency and errors, and for
+each server process its peak number of threads and peak resident memory. The offer cache is
+disabled so every request reads the database.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import percentile, print_table, setup_django, test_database
+from benchmarks.endpoints import send
+
+STACKS = {
+    "wsgi-sync": ("wsgi", "/api/offers/?page_size=20"),
+    "asgi-sync": ("asgi", "/api/offers/?page_size=20"),
+    "asgi-async": ("asgi", "/api/async/offers/?page_size=20"),
+}
+DATABASE_NAME_VARIABLE = "BENCHMARK_DATABASE_NAME"
+
+
+def serve(server: str, port: int, threads: int) -> None:
+    """
+    Serve the project on the test database created by the parent process.
+    """
+    os.environ["OFFER_CACHE_ENABLED"] = "False"
+    setup_django()
+    from django.conf import settings
+    from django.test.utils import setup_test_environment
+
+    settings.DATABASES["default"]["NAME"] = os.environ[DATABASE_NAME_VARIABLE]
+    setup_test_environment()
+
+    if server == "asgi":
+        import uvicorn
+
+        from focunti.asgi import application
+
+        uvicorn.run(application, host="127.0.0.1", port=port, log_level="warning", lifespan="off")
+        return
+
+    from django.core.servers.basehttp import WSGIRequestHandler, WSGIServer
+
+    from focunti.wsgi import application
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    class PooledWSGIServer(WSGIServer):
+        """
+        WSGI server handling the connections in a fixed pool of threads, like a threaded worker.
+        """
+
+        executor = ThreadPoolExecutor(max_workers=threads)
+
+        def process_request(self, request, client_address):
+            self.executor.submit(self.process_request_thread, request, client_address)
+
+        def process_request_thread(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    server = PooledWSGIServer(("127.0.0.1", port), QuietHandler)
+    server.request_queue_size = 1024
+    server.set_app(application)
+    server.serve_forever()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"the server didn't start listening on port {port}")
+
+
+class ProcessMonitor:
+    """
+    Sample the number of threads and the peak resident memory of a process from /proc (Linux only).
+    """
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.max_threads = 0
+        self.peak_rss_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+
+    def read_status(self) -> dict:
+        try:
+            with open(f"/proc/{self.pid}/status") as status:
+                return dict(line.split(":", 1) for line in status if ":" in line)
+        except OSError:
+            return {}
+
+    def run(self) -> None:
+        while not self._stop.wait(0.05):
+            status = self.read_status()
+            if status:
+                self.max_threads = max(self.max_threads, int(status["Threads"]))
+                self.peak_rss_kb = max(self.peak_rss_kb, int(status["VmHWM"].split()[0]))
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_clients(port: int, token: str, path: str, requests: int, concurrency: int) -> dict:
+    request = ("GET", path, None, True)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: send(port, token, request), range(requests)))
+    wall = time.perf_counter() - start
+    latencies = [elapsed for elapsed, _, _ in results]
+    return {
+        "rps": round(requests / wall, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "errors": sum(1 for _, status, _ in results if status != 200),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 128], help="Concurrent clients.")
+    parser.add_argument("--threads", type=int, default=8, help="Threads of the WSGI server pool.")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per stack and concurrency.")
+    parser.add_argument("--stack", action="append", choices=STACKS, help="Only run these stacks.")
+    parser.add_argument("--serve", choices=["wsgi", "asgi"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.serve, args.port, args.threads)
+        return
+
+    setup_django()
+    from benchmarks.seed import seed
+
+    with test_database() as connection:
+        data = seed(offers=2000, postulations=2000)
+        token = data.tokens[0].key
+        environment = {**os.environ, DATABASE_NAME_VARIABLE: str(connection.settings_dict["NAME"])}
+        # The servers open their own connections to the test database.
+        connection.close()
+
+        rows = []
+        for name, (server, path) in STACKS.items():
+            if args.stack and name not in args.stack:
+                continue
+            port = free_port()
+            command = [sys.executable, "-m", "benchmarks.async_endpoints", "--serve", server, "--port", str(port)]
+            process = subprocess.Popen(command + ["--threads", str(args.threads)], env=environment)
+            try:
+                wait_for_port(port)
+                send(port, token, ("GET", path, None, True))
+                for concurrency in args.concurrency:
+                    with ProcessMonitor(process.pid) as monitor:
+                        result = run_clients(port, token, path, args.requests, concurrency)
+                    peak_rss_mb = round(monitor.peak_rss_kb / 1024, 1)
+                    rows.append([name, concurrency, *result.values(), monitor.max_threads, peak_rss_mb])
+            finally:
+                process.terminate()
+                process.wait()
+
+    print(f"database: {connection.vendor}, WSGI threads: {args.threads}, requests: {args.requests}")
+    headers = ["stack", "clients", "req/s", "p50 ms", "p99 ms", "errors", "max threads", "peak RSS MB"]
+    print_table(headers, rows)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
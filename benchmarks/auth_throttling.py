@@ -0,0 +1,144 @@
+"""
+Login latency of legitimate users while another client floods the login endpoint.
+
+Usage:
+    python -m benchmarks.auth_throttling [--logins 40] [--clients 2] [--attack-rate 20] [--attackers 8]
+
+The WSGI application is served on a local threaded HTTP server, like in benchmarks.endpoints.
+Legitimate clients log in with the right password, each from its own IP address (sent in
+X-Forwarded-For, with NUM_PROXIES = 1). During the "burst" scenarios, attacker threads send
+--attack-rate logins per second with wrong passwords for random usernames, from a single IP
+address. The legitimate logins are measured once the burst has used up its bucket (or after
+--warmup seconds without throttling), in the steady state of the attack.
+
+Every scenario runs with settings.AUTH_THROTTLE enabled and disabled, and reports the p50/p99
+latency of the legitimate logins, their errors, and the attacker requests answered during the
+measurement and rejected with 429. Without throttling every attacker request runs the
+password hasher and the legitimate logins queue behind them.
+"""
+import argparse
+import http.client
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import percentile, print_table, setup_django, test_database
+
+ATTACKER_IP = "198.51.100.66"
+
+
+def post_login(port: int, username: str, password: str, ip: str) -> tuple:
+    headers = {"Content-Type": "application/json", "Host": "testserver", "X-Forwarded-For": ip}
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    start = time.perf_counter()
+    try:
+        connection.request("POST", "/api/login/", json.dumps({"username": username, "password": password}), headers)
+        response = connection.getresponse()
+        response.read()
+        return time.perf_counter() - start, response.status
+    except (OSError, http.client.HTTPException):
+        return time.perf_counter() - start, 0
+    finally:
+        connection.close()
+
+
+def attack(port: int, stop: threading.Event, statuses: list, interval: float) -> None:
+    index = 0
+    next_at = time.monotonic()
+    while not stop.wait(max(0.0, next_at - time.monotonic())):
+        next_at += interval
+        statuses.append(post_login(port, f"victim{threading.get_ident()}-{index}", "wrong-password", ATTACKER_IP)[1])
+        index += 1
+
+
+def run_scenario(port: int, users: list, logins: int, clients: int, attackers: int, rate: float, warmup: float) -> dict:
+    from benchmarks.seed import PASSWORD
+
+    stop = threading.Event()
+    attacker_statuses = []
+    threads = [
+        threading.Thread(target=attack, args=(port, stop, attacker_statuses, attackers / rate)) for _ in range(attackers)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + (warmup if attackers else 0)
+    while time.monotonic() < deadline and 429 not in attacker_statuses:
+        time.sleep(0.1)
+    measured_from = len(attacker_statuses)
+    jobs = [(users[i % len(users)].username, f"10.0.{i // 250}.{i % 250 + 1}") for i in range(logins)]
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = list(executor.map(lambda job: post_login(port, job[0], PASSWORD, job[1]), jobs))
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies = [elapsed for elapsed, _ in results]
+    attacker_statuses = attacker_statuses[measured_from:]
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "errors": sum(1 for _, status in results if status != 200),
+        "attacker_requests": len(attacker_statuses),
+        "attacker_429": sum(1 for status in attacker_statuses if status == 429),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logins", type=int, default=40, help="Legitimate logins per scenario.")
+    parser.add_argument("--clients", type=int, default=2, help="Concurrent legitimate clients.")
+    parser.add_argument("--attack-rate", type=float, default=20, help="Attacker logins per second.")
+    parser.add_argument("--attackers", type=int, default=8, help="Attacker threads of the burst scenarios.")
+    parser.add_argument("--warmup", type=float, default=60, help="Maximum seconds of burst before measuring.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    # Every wrong password of the burst would be logged as a bad request.
+    logging.getLogger("django.request").setLevel(logging.ERROR)
+    from django.conf import settings
+    from django.test import override_settings
+
+    from benchmarks.endpoints import start_server
+    from benchmarks.seed import seed
+    from employment_portal.throttling import get_bucket_store
+
+    with test_database() as connection:
+        data = seed(companies=1, offers=10, users=max(args.logins, 1), postulations=0)
+        server = start_server()
+        port = server.server_address[1]
+        rows = []
+        try:
+            for enabled in (True, False):
+                for attackers in (0, args.attackers):
+                    with override_settings(
+                        AUTH_THROTTLE={**settings.AUTH_THROTTLE, "ENABLED": enabled},
+                        REST_FRAMEWORK={**settings.REST_FRAMEWORK, "NUM_PROXIES": 1},
+                    ):
+                        get_bucket_store().clear()
+                        result = run_scenario(port, data.users, args.logins, args.clients, attackers, args.attack_rate, args.warmup)
+                    rows.append(
+                        [
+                            "on" if enabled else "off",
+                            "burst" if attackers else "quiet",
+                            result["p50_ms"],
+                            result["p99_ms"],
+                            result["errors"],
+                            result["attacker_requests"],
+                            result["attacker_429"],
+                        ]
+                    )
+        finally:
+            server.shutdown()
+
+    print(
+        f"database: {connection.vendor}, logins: {args.logins}, clients: {args.clients}, "
+        f"attack: {args.attack_rate}/s from {args.attackers} threads"
+    )
+    print_table(["throttling", "traffic", "p50 ms", "p99 ms", "errors", "attacker reqs", "attacker 429"], rows)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,64 @@
+"""
+Bulk offer creation versus one request per offer.
+
+Usage:
+    python -m benchmarks.bulk_offers [offers]
+
+Posts the same synthetic offers through /api/create-offer/ one at a time and through
+/api/bulk-create-offers/ in a single request, and reports wall time and queries.
+"""
+import sys
+import time
+
+from benchmarks.common import build_offers, print_table, setup_django, test_database
+
+DEFAULT_OFFERS = 500
+
+
+def main(size: int) -> None:
+    setup_django()
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+
+    from employment_portal.models import ApplicantUser, Company, Offer
+
+    with test_database():
+        print(f"database: {connection.vendor}, offers: {size}")
+        user = ApplicantUser.objects.create_user(username="bench", password="bench", identification_number="1")
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Token " + Token.objects.create(user=user).key)
+        companies = Company.objects.bulk_create(Company(name=f"Company {i}", nit=str(i)) for i in range(10))
+        payload = [
+            {
+                "title": offer.title,
+                "description": offer.description,
+                "salary": str(offer.salary),
+                "company": offer.company.id,
+                "skills": offer.skills,
+            }
+            for offer in build_offers(size, companies)
+        ]
+
+        rows = []
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for item in payload:
+                client.post(reverse("offer-create"), item, format="json")
+            elapsed = time.perf_counter() - start
+        rows.append(["single", f"{elapsed:.2f}", f"{size / elapsed:.0f}", len(queries)])
+        Offer.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = client.post(reverse("offer-bulk-create"), payload, format="json")
+            elapsed = time.perf_counter() - start
+        assert len(response.data["created"]) == size, response.data["errors"][:3]
+        rows.append(["bulk", f"{elapsed:.2f}", f"{size / elapsed:.0f}", len(queries)])
+        print_table(["path", "seconds", "offers/s", "queries"], rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_OFFERS)
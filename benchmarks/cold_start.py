@@ -0,0 +1,97 @@
+"""
+Cold start time of manage.py and of the WSGI and ASGI applications.
+
+Usage:
+    python -m benchmarks.cold_start [--runs 10] [--output FILE] [--compare FILE]
+
+Every run starts a new Python process, like a worker started by the autoscaler:
+- manage.py: "python manage.py check".
+- wsgi / asgi: django.setup(), import of focunti.wsgi or focunti.asgi and a first request to
+  /api/offers/ (see employment_portal.startup), until the first response.
+
+Each target is started with the default settings and with the admin and the API docs switched
+off (ADMIN_ENABLED=False, API_DOCS_ENABLED=False). Reports the median and minimum times and
+saves them to benchmarks/baselines/cold_start.json; pass a previous file to --compare to see
+regressions.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.common import percentile, print_table
+from benchmarks.endpoints import BASELINES_DIR, change, git_commit
+
+CONFIGS = {
+    "default": {},
+    "minimal": {"ADMIN_ENABLED": "False", "API_DOCS_ENABLED": "False"},
+}
+
+
+def manage_py_start(env: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "manage.py", "check"], env={**os.environ, **env}, check=True, capture_output=True
+    )
+    return time.perf_counter() - start
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10, help="Processes started per target and configuration.")
+    parser.add_argument("--output", type=Path, help="Results file, benchmarks/baselines/cold_start.json by default.")
+    parser.add_argument("--compare", type=Path, help="Results file of a previous run to compare with.")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "focunti.settings")
+    from employment_portal.startup import profile_startup
+
+    targets = {
+        "manage.py": manage_py_start,
+        "wsgi": lambda env: profile_startup("wsgi", env=env, import_times=False)["total"],
+        "asgi": lambda env: profile_startup("asgi", env=env, import_times=False)["total"],
+    }
+    results = {}
+    for target, start in targets.items():
+        for config, env in CONFIGS.items():
+            samples = [start(env) for _ in range(args.runs)]
+            results[f"{target} {config}"] = {
+                "p50_ms": round(percentile(samples, 50) * 1000, 1),
+                "min_ms": round(min(samples) * 1000, 1),
+            }
+
+    report = {
+        "meta": {
+            "settings": os.environ["DJANGO_SETTINGS_MODULE"],
+            "commit": git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "runs": args.runs,
+        },
+        "targets": results,
+    }
+    baseline = json.loads(args.compare.read_text())["targets"] if args.compare else {}
+
+    headers = ["target", "p50 ms", "min ms"] + (["p50 vs base"] if baseline else [])
+    rows = []
+    for name, result in results.items():
+        row = [name, result["p50_ms"], result["min_ms"]]
+        if baseline:
+            row.append(change(result["p50_ms"], baseline.get(name, {}).get("p50_ms")))
+        rows.append(row)
+    print(f"settings: {report['meta']['settings']}, commit: {report['meta']['commit']}, runs: {args.runs}")
+    print_table(headers, rows)
+
+    output = args.output or BASELINES_DIR / "cold_start.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"results saved to {output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,90 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Every benchmark runs against a throwaway test database created with the engine of the
+configured settings (DJANGO_SETTINGS_MODULE), so it never touches real data.
+"""
+import math
+import os
+import random
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+WORDS = (
+    "python django react vue angular postgres docker kubernetes aws linux java spring "
+    "golang rust sql api rest graphql backend frontend fullstack devops data analyst "
+    "senior junior remote hybrid team agile scrum testing security cloud mobile android ios"
+).split()
+
+
+def setup_django() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "focunti.settings")
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database(verbosity: int = 0):
+    """
+    Create a test database for the default connection and destroy it on exit.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    old_name = connection.settings_dict["NAME"]
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+
+
+def random_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def build_offers(count: int, companies: list, seed: int = 0) -> list:
+    """
+    Build unsaved synthetic Offer instances spread over the given companies.
+    """
+    from employment_portal.models import Offer
+
+    rng = random.Random(seed)
+    return [
+        Offer(
+            title=random_text(rng, 3).title(),
+            description=random_text(rng, 40),
+            salary=Decimal(rng.randrange(1000, 20000)),
+            company=companies[index % len(companies)],
+            skills=", ".join(rng.sample(WORDS, 4)),
+        )
+        for index in range(count)
+    ]
+
+
+def timed(func, repeat: int) -> list:
+    """
+    Call func repeat times and return the duration of each call in seconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def percentile(samples: list, percent: float) -> float:
+    ordered = sorted(samples)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def print_table(headers: list, rows: list) -> None:
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in [headers, *rows]:
+        print("  ".join(str(value).rjust(width) for value, width in zip(row, widths)))
@@ -0,0 +1,97 @@
+"""
+Per-request database connection cost with the plain PostgreSQL backend and the pooled one.
+
+Usage:
+    python -m benchmarks.connection_pool [--threads 1 8 32] [--requests 500] [--pool-size 10]
+
+Each simulated request does what Django does for a view: open the connection, run a small
+query and close the connection when the request finishes (CONN_MAX_AGE = 0). With the plain
+backend every request pays the TCP, authentication and SSL setup, with
+employment_portal.db.postgresql it checks a connection out of the pool and gives it back.
+Reports req/s, p50/p99 latency, the connections opened and the pool waits. Needs PostgreSQL.
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import percentile, print_table, setup_django, test_database
+
+ENGINES = {
+    "plain": "django.db.backends.postgresql",
+    "pooled": "employment_portal.db.postgresql",
+}
+QUERY = "SELECT id, title FROM employment_portal_offer ORDER BY id DESC LIMIT 20"
+
+
+def run_requests(settings_dict: dict, requests: int) -> list:
+    """
+    Run requests one after the other on a connection of the current thread and return their latencies.
+    """
+    from django.db.utils import load_backend
+
+    wrapper = load_backend(settings_dict["ENGINE"]).DatabaseWrapper(settings_dict, "benchmark")
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        with wrapper.cursor() as cursor:
+            cursor.execute(QUERY)
+            cursor.fetchall()
+        wrapper.close()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32], help="Concurrent request threads.")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per engine and thread count.")
+    parser.add_argument("--pool-size", type=int, default=10, help="MAX_SIZE of the pool.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from employment_portal.db.pool import close_pools, get_pool_stats
+
+    with test_database() as connection:
+        if connection.vendor != "postgresql":
+            sys.exit(f"this benchmark needs PostgreSQL, the database is {connection.vendor}")
+        from benchmarks.seed import seed
+
+        seed(offers=200, postulations=0)
+
+        rows = []
+        for threads in args.threads:
+            per_thread = max(1, args.requests // threads)
+            for name, engine in ENGINES.items():
+                settings_dict = {
+                    **connection.settings_dict,
+                    "ENGINE": engine,
+                    "CONN_MAX_AGE": 0,
+                    "POOL": {"MAX_SIZE": args.pool_size, "LOG_INTERVAL": 0},
+                }
+                close_pools()
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=threads) as executor:
+                    results = executor.map(run_requests, [settings_dict] * threads, [per_thread] * threads)
+                    latencies = [latency for result in results for latency in result]
+                wall = time.perf_counter() - start
+                stats = next(iter(get_pool_stats().values()), {})
+                rows.append(
+                    [
+                        name,
+                        threads,
+                        round(len(latencies) / wall, 1),
+                        round(percentile(latencies, 50) * 1000, 2),
+                        round(percentile(latencies, 99) * 1000, 2),
+                        stats.get("created", len(latencies)),
+                        stats.get("waits", "-"),
+                    ]
+                )
+        close_pools()
+
+    print(f"database: {connection.vendor}, requests: {args.requests}, pool size: {args.pool_size}")
+    print_table(["engine", "threads", "req/s", "p50 ms", "p99 ms", "connections", "pool waits"], rows)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
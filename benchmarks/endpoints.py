@@ -0,0 +1,269 @@
+"""
+Load test of every route of employment_portal/urls.py.
+
+Usage:
+    python -m benchmarks.endpoints [--requests 200] [--concurrency 8] [--endpoint NAME ...]
+                                   [--output FILE] [--compare FILE]
+
+The suite creates a test database with the engine of DJANGO_SETTINGS_MODULE (use
+benchmarks.settings_sqlite for SQLite, focunti.settings for the local PostgreSQL), seeds it
+with synthetic data, serves the WSGI application on a local threaded HTTP server and sends
+the requests of each endpoint from a pool of concurrent clients.
+
+It reports requests per second, p50/p95/p99 latency and queries per request (read from the
+Server-Timing header) for each endpoint, and saves them to a JSON file that can be passed to
+--compare on a later run to see regressions between commits.
+"""
+import argparse
+import http.client
+import json
+import platform
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.common import percentile, print_table, setup_django, test_database
+
+QUERIES_PATTERN = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+BASELINES_DIR = Path(__file__).resolve().parent / "baselines"
+
+
+@dataclass
+class Endpoint:
+    """
+    A route to load, 'build' returns the method, path, JSON body and whether to authenticate for request i.
+    'weight' scales the number of requests, e.g. login and register hash passwords and get fewer.
+    'staff' routes are requested with the token of the staff user of the seed.
+    """
+
+    name: str
+    build: callable
+    weight: float = 1.0
+    staff: bool = False
+
+
+def get_endpoints(data) -> list:
+    from benchmarks.seed import PASSWORD
+
+    users, offers, companies = data.users, data.offers, data.companies
+
+    def offer_payload(i):
+        return {
+            "title": f"Load Offer {i}",
+            "description": "Synthetic offer created by the load test",
+            "salary": "2500.00",
+            "company": companies[i % len(companies)].id,
+            "skills": "Python, Django, PostgreSQL",
+        }
+
+    return [
+        Endpoint(
+            "user-login",
+            lambda i: ("POST", "/api/login/", {"username": users[i % len(users)].username, "password": PASSWORD}, False),
+            weight=0.1,
+        ),
+        Endpoint(
+            "user-register",
+            lambda i: (
+                "POST",
+                "/api/register/",
+                {"username": f"load{i}", "password": PASSWORD, "identification_number": f"load-{i}"},
+                False,
+            ),
+            weight=0.1,
+        ),
+        Endpoint(
+            "company-create",
+            lambda i: ("POST", "/api/create-company/", {"name": f"Load Company {i}", "nit": f"load-{i}"}, True),
+        ),
+        Endpoint("offer-list", lambda i: ("GET", "/api/offers/?page_size=20", None, True)),
+        Endpoint(
+            "offer-list-filtered",
+            lambda i: ("GET", f"/api/offers/?company={companies[i % len(companies)].id}&salary_min=5000", None, True),
+        ),
+        Endpoint("offer-search", lambda i: ("GET", "/api/offers/search/?q=python+django", None, True)),
+        Endpoint("offer-create", lambda i: ("POST", "/api/create-offer/", offer_payload(i), True)),
+        Endpoint(
+            "offer-bulk-create",
+            lambda i: ("POST", "/api/bulk-create-offers/", [offer_payload(i * 50 + j) for j in range(50)], True),
+            weight=0.1,
+        ),
+        Endpoint(
+            "offer-update",
+            lambda i: ("PATCH", f"/api/update-offer/{offers[i % len(offers)].id}/", {"salary": "3000.00"}, True),
+        ),
+        Endpoint(
+            "postulation-create",
+            lambda i: (
+                "POST",
+                "/api/create-postulation/",
+                {"user": users[i % len(users)].id, "offer": offers[i % len(offers)].id},
+                True,
+            ),
+        ),
+        Endpoint(
+            "offer-postulation-export",
+            lambda i: ("GET", f"/api/offers/{offers[i % len(offers)].id}/postulations/export/", None, True),
+            staff=True,
+        ),
+        Endpoint(
+            "company-postulation-export",
+            lambda i: ("GET", f"/api/companies/{companies[i % len(companies)].id}/postulations/export/", None, True),
+            weight=0.1,
+            staff=True,
+        ),
+    ]
+
+
+def start_server():
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadedWSGIServer(("127.0.0.1", 0), QuietHandler, allow_reuse_address=False)
+    server.set_app(WSGIHandler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def send(port: int, token: str, request) -> tuple:
+    method, path, body, authenticate = request
+    # setup_test_environment() only allows the "testserver" host.
+    headers = {"Content-Type": "application/json", "Host": "testserver"}
+    if authenticate:
+        headers["Authorization"] = f"Token {token}"
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    start = time.perf_counter()
+    try:
+        connection.request(method, path, json.dumps(body) if body is not None else None, headers)
+        response = connection.getresponse()
+        response.read()
+        elapsed = time.perf_counter() - start
+        match = QUERIES_PATTERN.search(response.getheader("Server-Timing", ""))
+        return elapsed, response.status, int(match.group(1)) if match else None
+    except (OSError, http.client.HTTPException):
+        return time.perf_counter() - start, 0, None
+    finally:
+        connection.close()
+
+
+def run_endpoint(endpoint: Endpoint, port: int, tokens: list, requests: int, concurrency: int) -> dict:
+    count = max(1, int(requests * endpoint.weight))
+    tokens = [token for token in tokens if token.user.is_staff] if endpoint.staff else tokens
+    jobs = [(tokens[i % len(tokens)].key, endpoint.build(i)) for i in range(count)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda job: send(port, *job), jobs))
+    wall = time.perf_counter() - start
+
+    latencies = [elapsed for elapsed, _, _ in results]
+    queries = [count for _, _, count in results if count is not None]
+    return {
+        "requests": count,
+        "errors": sum(1 for _, status, _ in results if not 200 <= status < 300),
+        "rps": round(count / wall, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "queries": round(sum(queries) / len(queries), 1) if queries else None,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def change(current, baseline) -> str:
+    if not baseline:
+        return "-"
+    return f"{(current - baseline) / baseline * 100:+.0f}%"
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint (scaled by its weight).")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients.")
+    parser.add_argument("--endpoint", action="append", help="Only run these endpoints.")
+    parser.add_argument("--output", type=Path, help="Results file, benchmarks/baselines/<database>.json by default.")
+    parser.add_argument("--compare", type=Path, help="Results file of a previous run to compare with.")
+    parser.add_argument("--offers", type=int, default=2000, help="Seeded offers.")
+    parser.add_argument("--postulations", type=int, default=5000, help="Seeded postulations.")
+    args = parser.parse_args(argv)
+    # Read before the run, a missing or invalid baseline would otherwise be found once it is over.
+    try:
+        baseline = json.loads(args.compare.read_text())["endpoints"] if args.compare else {}
+    except (OSError, ValueError, KeyError) as exc:
+        parser.error(f"--compare {args.compare}: {exc!r}")
+
+    setup_django()
+    from django.conf import settings
+    from django.test import override_settings
+
+    from benchmarks.seed import seed
+
+    # Every client connects from 127.0.0.1, the login and register throttles would answer most of their
+    # requests with 429 (benchmarks.auth_throttling measures the throttling).
+    no_throttle = override_settings(AUTH_THROTTLE={**settings.AUTH_THROTTLE, "ENABLED": False})
+    with test_database() as connection, no_throttle:
+        data = seed(offers=args.offers, postulations=args.postulations)
+        # The server threads open their own connections to the test database.
+        connection.close()
+        server = start_server()
+        port = server.server_address[1]
+
+        results = {}
+        try:
+            for endpoint in get_endpoints(data):
+                if args.endpoint and endpoint.name not in args.endpoint:
+                    continue
+                results[endpoint.name] = run_endpoint(endpoint, port, data.tokens, args.requests, args.concurrency)
+        finally:
+            server.shutdown()
+            server.server_close()
+        vendor = connection.vendor
+
+    report = {
+        "meta": {
+            "database": vendor,
+            "commit": git_commit(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "endpoints": results,
+    }
+
+    headers = ["endpoint", "requests", "errors", "req/s", "p50 ms", "p95 ms", "p99 ms", "queries"]
+    if baseline:
+        headers += ["req/s vs base", "p95 vs base"]
+    rows = []
+    for name, result in results.items():
+        row = [name] + [result[key] for key in ("requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "queries")]
+        if baseline:
+            previous = baseline.get(name, {})
+            row += [change(result["rps"], previous.get("rps")), change(result["p95_ms"], previous.get("p95_ms"))]
+        rows.append(row)
+    print(f"database: {vendor}, commit: {report['meta']['commit']}, concurrency: {args.concurrency}")
+    print_table(headers, rows)
+
+    output = args.output or BASELINES_DIR / f"{vendor}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"results saved to {output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,66 @@
+"""
+Peak memory of the streamed postulation export as the number of postulations grows.
+
+Usage:
+    python -m benchmarks.export_postulations [postulations ...]
+
+The export of a single offer is consumed chunk by chunk like a client would, and the
+peak Python memory is measured with tracemalloc. It should stay flat across sizes.
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import build_offers, print_table, setup_django, test_database
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def main(sizes) -> None:
+    setup_django()
+    from django.db import connection
+    from django.urls import reverse
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+
+    from employment_portal.models import ApplicantUser, Company, Postulation
+
+    with test_database():
+        print(f"database: {connection.vendor}")
+        user = ApplicantUser.objects.create_user(
+            username="bench", password="bench", identification_number="bench", is_staff=True
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Token " + Token.objects.create(user=user).key)
+        company = Company.objects.create(name="Company", nit="1")
+
+        rows = []
+        for size in sizes:
+            offer = build_offers(1, [company], seed=size)[0]
+            offer.save()
+            applicants = ApplicantUser.objects.bulk_create(
+                (
+                    ApplicantUser(username=f"u{size}-{i}", identification_number=f"{size}-{i}", email=f"u{i}@example.com")
+                    for i in range(size)
+                ),
+                batch_size=2000,
+            )
+            Postulation.objects.bulk_create(
+                (Postulation(user=applicant, offer=offer) for applicant in applicants), batch_size=2000
+            )
+            del applicants
+
+            for export_format in ("csv", "ndjson"):
+                tracemalloc.start()
+                start = time.perf_counter()
+                response = client.get(reverse("offer-postulation-export", args=[offer.id]), {"export_format": export_format})
+                written = sum(len(chunk) for chunk in response.streaming_content)
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                rows.append([size, export_format, f"{elapsed:.2f}", f"{written / 1024:.0f}", f"{peak / 1024:.0f}"])
+        print_table(["postulations", "format", "seconds", "output KiB", "peak KiB"], rows)
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
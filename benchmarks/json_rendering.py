@@ -0,0 +1,59 @@
+"""
+JSON rendering and parsing of large offer lists with DRF's JSON classes and the orjson ones.
+
+Usage:
+    python -m benchmarks.json_rendering [size ...]
+
+For each size the offers are serialized once with OfferSerializer, then the page is rendered
+with JSONRenderer and ORJSONRenderer (checking both write the same bytes) and parsed back with
+JSONParser and ORJSONParser. Reports the p50 time of each and the speedup.
+"""
+import io
+import sys
+
+from benchmarks.common import build_offers, percentile, print_table, setup_django, test_database, timed
+
+DEFAULT_SIZES = (100, 1000, 10000)
+REPEAT = 20
+
+
+def main(sizes) -> None:
+    setup_django()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from employment_portal.models import Company, Offer
+    from employment_portal.parsers import ORJSONParser
+    from employment_portal.renderers import ORJSONRenderer
+    from employment_portal.serializers import OfferSerializer
+
+    with test_database() as connection:
+        print(f"database: {connection.vendor}")
+        companies = Company.objects.bulk_create(Company(name=f"Company {i}", nit=str(i)) for i in range(50))
+        Offer.objects.bulk_create(build_offers(max(sizes), companies), batch_size=1000)
+
+        rows = []
+        for size in sorted(sizes):
+            data = OfferSerializer(Offer.objects.order_by("id")[:size], many=True).data
+            content = JSONRenderer().render(data)
+            assert ORJSONRenderer().render(data) == content, "the renderers don't write the same bytes"
+
+            operations = (
+                ("render", lambda: JSONRenderer().render(data), lambda: ORJSONRenderer().render(data)),
+                (
+                    "parse",
+                    lambda: JSONParser().parse(io.BytesIO(content)),
+                    lambda: ORJSONParser().parse(io.BytesIO(content)),
+                ),
+            )
+            for name, drf, fast in operations:
+                drf_ms = percentile(timed(drf, REPEAT), 50) * 1000
+                orjson_ms = percentile(timed(fast, REPEAT), 50) * 1000
+                rows.append(
+                    [size, name, len(content), f"{drf_ms:.2f}", f"{orjson_ms:.2f}", f"{drf_ms / orjson_ms:.1f}x"]
+                )
+        print_table(["offers", "operation", "bytes", "drf p50 ms", "orjson p50 ms", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,96 @@
+"""
+Near-duplicate offer lookup latency against a growing synthetic corpus of one company.
+
+Usage:
+    python -m benchmarks.offer_duplicates [size ...]
+
+For each corpus size the offers of a single company, the worst case since the lookup is per
+company, are inserted in the test database and their signature bands indexed. Each sample
+looks up a repost of a random offer with EDITS words replaced. "compare all" reads every
+offer of the company and computes the Jaccard similarity of its shingles like a check without
+the bands, "bands" is find_duplicate_offer(). "found" is the share of reposts both flag as
+near-duplicates of their original, "false" the share of fresh offers flagged by the bands.
+"""
+import random
+import sys
+
+from benchmarks.common import build_offers, percentile, print_table, setup_django, test_database
+
+DEFAULT_SIZES = (1000, 10000, 50000)
+REPEAT = 20
+EDITS = 2
+# Synthetic vocabulary of the descriptions, the 40 words of benchmarks.common repeat too much
+# to tell offers apart: most 3 word shingles would be shared by thousands of offers.
+VOCABULARY = [f"w{index}" for index in range(5000)]
+
+
+def vocabulary_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def main(sizes) -> None:
+    setup_django()
+    import time
+
+    from django.conf import settings
+
+    from employment_portal.duplicates import find_duplicate_offer, index_offer_signatures, jaccard, offer_shingles
+    from employment_portal.models import Company, Offer
+
+    def compare_all(company_id, description, skills):
+        shingles = offer_shingles(description, skills)
+        best = None
+        for offer_id, other_description, other_skills in Offer.objects.filter(company_id=company_id).values_list(
+            "pk", "description", "skills"
+        ):
+            similarity = jaccard(shingles, offer_shingles(other_description, other_skills))
+            if similarity >= settings.OFFER_DUPLICATES["THRESHOLD"] and (best is None or similarity > best[1]):
+                best = (offer_id, similarity)
+        return best
+
+    def repost(offer):
+        words = offer.description.split()
+        for position in rng.sample(range(len(words)), EDITS):
+            words[position] = rng.choice(VOCABULARY)
+        return " ".join(words)
+
+    rng = random.Random(0)
+    with test_database() as connection:
+        print(f"database: {connection.vendor}")
+        company = Company.objects.create(name="Company", nit="1")
+        rows = []
+        created = []
+        for size in sorted(sizes):
+            offers = build_offers(size - len(created), [company], seed=size)
+            for offer in offers:
+                offer.description = vocabulary_text(rng, 60)
+            created += Offer.objects.bulk_create(offers, batch_size=1000)
+            index_offer_signatures(offers)
+
+            samples = {"compare all": [], "bands": []}
+            found = 0
+            false_positives = 0
+            for original in rng.sample(created, REPEAT):
+                description = repost(original)
+                for name, lookup in (("compare all", compare_all), ("bands", find_duplicate_offer)):
+                    start = time.perf_counter()
+                    duplicate = lookup(company.pk, description, original.skills)
+                    samples[name].append(time.perf_counter() - start)
+                    found += name == "bands" and duplicate is not None and duplicate[0] == original.pk
+                fresh = vocabulary_text(rng, 60)
+                false_positives += find_duplicate_offer(company.pk, fresh, original.skills) is not None
+            rows.append(
+                [
+                    size,
+                    f"{percentile(samples['compare all'], 50) * 1000:.1f}",
+                    f"{percentile(samples['bands'], 50) * 1000:.2f}",
+                    f"{percentile(samples['bands'], 95) * 1000:.2f}",
+                    f"{found / REPEAT:.0%}",
+                    f"{false_positives / REPEAT:.0%}",
+                ]
+            )
+        print_table(["offers", "compare all p50 ms", "bands p50 ms", "bands p95 ms", "found", "false"], rows)
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
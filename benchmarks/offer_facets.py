@@ -0,0 +1,72 @@
+"""
+Offer facets latency against a growing synthetic corpus, counted with GROUP BY or read from the buckets.
+
+Usage:
+    python -m benchmarks.offer_facets [size ...]
+
+For each corpus size the offers and their skills are inserted in the test database and the
+facet buckets are rebuilt. "group by" counts the salary bands, companies and skills over all
+the offers like a sidebar without the OfferFacet table, "buckets" reads them with
+get_offer_facets(). The GROUP BY grows with the number of offers, the buckets only with the
+number of bands, companies and skills. "create" is the cost of updating the buckets when one
+offer is created.
+"""
+import sys
+from decimal import Decimal
+
+from benchmarks.common import build_offers, percentile, print_table, setup_django, test_database, timed
+
+DEFAULT_SIZES = (1000, 10000, 50000)
+REPEAT = 20
+
+
+def main(sizes) -> None:
+    setup_django()
+    from django.db import transaction
+
+    from employment_portal.facets import (
+        change_offer_facets,
+        count_offer_facets,
+        facet_deltas,
+        get_offer_facets,
+        offer_facet_keys,
+        rebuild_offer_facets,
+    )
+    from employment_portal.models import Company, Offer
+    from employment_portal.skills import add_offers_skills
+
+    def create_offer():
+        # Rolled back, so the corpus doesn't grow with the samples.
+        with transaction.atomic():
+            offer = Offer.objects.create(title="T", description="D", salary=Decimal(4200), company=companies[0])
+            change_offer_facets(facet_deltas(set(), offer_facet_keys(offer, [1, 2, 3, 4])))
+            transaction.set_rollback(True)
+
+    with test_database() as connection:
+        print(f"database: {connection.vendor}")
+        companies = Company.objects.bulk_create(Company(name=f"Company {i}", nit=str(i)) for i in range(50))
+        rows = []
+        created = 0
+        for size in sorted(sizes):
+            offers = Offer.objects.bulk_create(build_offers(size - created, companies, seed=size), batch_size=1000)
+            add_offers_skills(offers)
+            rebuild_offer_facets()
+            created = size
+
+            group_by = timed(count_offer_facets, REPEAT)
+            buckets = timed(lambda: get_offer_facets(20), REPEAT)
+            create = timed(create_offer, REPEAT)
+            rows.append(
+                [
+                    size,
+                    f"{percentile(group_by, 50) * 1000:.2f}",
+                    f"{percentile(buckets, 50) * 1000:.2f}",
+                    f"{percentile(buckets, 95) * 1000:.2f}",
+                    f"{percentile(create, 50) * 1000:.2f}",
+                ]
+            )
+        print_table(["offers", "group by p50 ms", "buckets p50 ms", "buckets p95 ms", "create p50 ms"], rows)
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
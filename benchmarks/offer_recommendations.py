@@ -0,0 +1,123 @@
+"""
+Offer recommendation latency against a growing synthetic corpus.
+
+Usage:
+    python -m benchmarks.offer_recommendations [size ...]
+
+For each corpus size the offers are inserted in the test database and the index is built.
+Each sample recommends 10 offers for a random 30 word profile. The descriptions and profiles
+draw their words from a vocabulary of VOCABULARY words with Zipf frequencies, like natural
+text, so the postings of the frequent words grow with the number of offers:
+
+- "every posting" ranks every offer sharing a term with the profile, walking all the postings
+  of its terms, like scoring the profile against every offer.
+- "top" is OfferIndex.top() on an index keeping every posting (MAX_POSTINGS=0), which skips
+  the postings that can't change the top 10, with the same results ("exact" is the share of
+  samples where they match).
+- "pruned" keeps the settings.OFFER_RECOMMENDATIONS["MAX_POSTINGS"] postings with the highest
+  weights per term, "overlap" is the share of the exact top 10 it finds.
+"""
+import itertools
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from benchmarks.common import build_offers, percentile, print_table, random_text, setup_django, test_database, timed
+
+DEFAULT_SIZES = (10000, 50000, 100000)
+REPEAT = 20
+LIMIT = 10
+VOCABULARY = 20000
+
+
+def zipf_text(rng: random.Random, cum_weights: list, words: int) -> str:
+    return " ".join(f"w{rank}" for rank in rng.choices(range(VOCABULARY), cum_weights=cum_weights, k=words))
+
+
+def main(sizes) -> None:
+    setup_django()
+    from django.conf import settings
+    from django.test import override_settings
+    from django.utils import timezone
+
+    from employment_portal.models import Company, Offer
+    from employment_portal.recommendations import build_offer_index, offer_recommender
+
+    rng = random.Random(0)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(VOCABULARY)))
+    profiles = [f"{random_text(rng, 3)} {zipf_text(rng, cum_weights, 27)}" for _ in range(REPEAT)]
+
+    def recommend(results, limit):
+        profile = profiles[len(results) % REPEAT]
+        results.append([offer_id for offer_id, _ in offer_recommender.recommend(profile, limit)[:LIMIT]])
+
+    with test_database() as connection, tempfile.TemporaryDirectory() as directory:
+        print(f"database: {connection.vendor}")
+        companies = Company.objects.bulk_create(Company(name=f"Company {i}", nit=str(i)) for i in range(50))
+        rows = []
+        created = 0
+        for size in sorted(sizes):
+            offers = build_offers(size - created, companies, seed=size)
+            for offer in offers:
+                offer.description = zipf_text(rng, cum_weights, 40)
+            Offer.objects.bulk_create(offers, batch_size=1000)
+            # Offers changed just before the index is built are read again as changes, these aren't.
+            Offer.objects.update(updated_at=timezone.now() - timedelta(days=1))
+            created = size
+
+            samples = {}
+            results = {}
+            for name, max_postings, limit in (
+                ("every posting", 0, size),
+                ("top", 0, LIMIT),
+                ("pruned", settings.OFFER_RECOMMENDATIONS["MAX_POSTINGS"], LIMIT),
+            ):
+                options = {
+                    **settings.OFFER_RECOMMENDATIONS,
+                    "PATH": str(Path(directory) / f"{max_postings}.idx"),
+                    "MAX_POSTINGS": max_postings,
+                }
+                with override_settings(OFFER_RECOMMENDATIONS=options):
+                    start = time.perf_counter()
+                    build_offer_index(options["PATH"])
+                    samples[name, "build"] = time.perf_counter() - start
+                    offer_recommender.recommend("", LIMIT)
+                    results[name] = []
+                    samples[name] = timed(lambda: recommend(results[name], limit), REPEAT)
+
+            exact = sum(top == every for top, every in zip(results["top"], results["every posting"])) / REPEAT
+            overlap = sum(
+                len(set(pruned) & set(top)) for pruned, top in zip(results["pruned"], results["top"])
+            ) / sum(len(top) for top in results["top"])
+            rows.append(
+                [
+                    size,
+                    f"{samples['top', 'build']:.1f}",
+                    f"{percentile(samples['every posting'], 50) * 1000:.1f}",
+                    f"{percentile(samples['top'], 50) * 1000:.1f}",
+                    f"{percentile(samples['top'], 95) * 1000:.1f}",
+                    f"{exact:.0%}",
+                    f"{percentile(samples['pruned'], 50) * 1000:.1f}",
+                    f"{overlap:.0%}",
+                ]
+            )
+        print_table(
+            [
+                "offers",
+                "build s",
+                "every posting p50 ms",
+                "top p50 ms",
+                "top p95 ms",
+                "exact",
+                "pruned p50 ms",
+                "overlap",
+            ],
+            rows,
+        )
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,119 @@
+"""
+Logins per second per CPU core with the password hashing on the request threads and on the pool.
+
+Usage:
+    python -m benchmarks.password_hashing [--logins 60] [--concurrency 1 4 16] [--workers 0] [--queue 32]
+
+The WSGI application is served on a local threaded HTTP server, like in benchmarks.endpoints,
+with the login throttling disabled. Concurrent clients log in with the right password:
+- inline: settings.PASSWORD_HASHING disabled, every request thread hashes.
+- pool: the hashes run on the bounded pool of employment_portal.hashing.
+- outdated, inline / pool: the stored hashes use a quarter of the iterations of the hasher.
+  Inline, the first login of each user also rehashes before answering; on the pool the rehash
+  runs in the background when a worker is idle.
+
+Reports logins/s, logins/s per core, p50/p99 latency, 503 responses and the rehashed users.
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import percentile, print_table, setup_django, test_database
+
+
+def post_login(port: int, username: str, password: str) -> tuple:
+    headers = {"Content-Type": "application/json", "Host": "testserver"}
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    start = time.perf_counter()
+    try:
+        connection.request("POST", "/api/login/", json.dumps({"username": username, "password": password}), headers)
+        response = connection.getresponse()
+        response.read()
+        return time.perf_counter() - start, response.status
+    except (OSError, http.client.HTTPException):
+        return time.perf_counter() - start, 0
+    finally:
+        connection.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--logins", type=int, default=60, help="Logins per scenario.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Concurrent clients.")
+    parser.add_argument("--workers", type=int, default=0, help="MAX_WORKERS of the pool, 0 for the CPUs.")
+    parser.add_argument("--queue", type=int, default=32, help="MAX_QUEUE of the pool.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.hashers import get_hasher
+    from django.test import override_settings
+
+    from benchmarks.endpoints import start_server
+    from benchmarks.seed import PASSWORD, seed
+    from employment_portal.hashing import get_hashing_executor
+    from employment_portal.models import ApplicantUser
+
+    cores = os.cpu_count() or 1
+    hasher = get_hasher()
+    current_hash = hasher.encode(PASSWORD, hasher.salt())
+    outdated_hash = hasher.encode(PASSWORD, hasher.salt(), iterations=hasher.iterations // 4)
+    scenarios = [
+        ("inline", False, current_hash),
+        ("pool", True, current_hash),
+        ("outdated, inline", False, outdated_hash),
+        ("outdated, pool", True, outdated_hash),
+    ]
+    no_throttle = override_settings(AUTH_THROTTLE={**settings.AUTH_THROTTLE, "ENABLED": False})
+
+    with test_database() as connection, no_throttle:
+        data = seed(companies=1, offers=10, users=args.logins, postulations=0)
+        usernames = [user.username for user in data.users]
+        server = start_server()
+        port = server.server_address[1]
+        rows = []
+        try:
+            for concurrency in args.concurrency:
+                for name, enabled, encoded in scenarios:
+                    ApplicantUser.objects.update(password=encoded)
+                    hashing = {
+                        **settings.PASSWORD_HASHING,
+                        "ENABLED": enabled,
+                        "MAX_WORKERS": args.workers,
+                        "MAX_QUEUE": args.queue,
+                    }
+                    with override_settings(PASSWORD_HASHING=hashing):
+                        start = time.perf_counter()
+                        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                            results = list(executor.map(lambda username: post_login(port, username, PASSWORD), usernames))
+                        wall = time.perf_counter() - start
+                        executor = get_hashing_executor()
+                        if executor is not None:
+                            executor.shutdown(wait=True)
+                    latencies = [elapsed for elapsed, _ in results]
+                    rehashed = ApplicantUser.objects.exclude(password=encoded).count() if encoded == outdated_hash else 0
+                    rows.append(
+                        [
+                            name,
+                            concurrency,
+                            round(len(results) / wall, 2),
+                            round(len(results) / wall / cores, 2),
+                            round(percentile(latencies, 50) * 1000, 1),
+                            round(percentile(latencies, 99) * 1000, 1),
+                            sum(1 for _, status in results if status == 503),
+                            rehashed,
+                        ]
+                    )
+        finally:
+            server.shutdown()
+
+    print(f"database: {connection.vendor}, cores: {cores}, hasher: {hasher.algorithm}, logins: {args.logins}")
+    print_table(["hashing", "clients", "logins/s", "per core", "p50 ms", "p99 ms", "503", "rehashed"], rows)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
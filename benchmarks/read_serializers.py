@@ -0,0 +1,49 @@
+"""
+Offer list serialization with OfferSerializer versus its ValuesSerializer.
+
+Usage:
+    python -m benchmarks.read_serializers [size ...]
+
+For each size the same offers are read and serialized with OfferSerializer over model
+instances and with the ValuesSerializer over .values() rows (checking both return the same
+data). Reports the p50 time of each, query included, and the speedup.
+"""
+import sys
+
+from benchmarks.common import build_offers, percentile, print_table, setup_django, test_database, timed
+
+DEFAULT_SIZES = (100, 1000, 10000)
+REPEAT = 10
+
+
+def main(sizes) -> None:
+    setup_django()
+    from employment_portal.models import Company, Offer
+    from employment_portal.read_serializers import get_values_serializer
+    from employment_portal.serializers import OfferSerializer
+
+    with test_database() as connection:
+        print(f"database: {connection.vendor}")
+        companies = Company.objects.bulk_create(Company(name=f"Company {i}", nit=str(i)) for i in range(50))
+        Offer.objects.bulk_create(build_offers(max(sizes), companies), batch_size=1000)
+        values_serializer = get_values_serializer(OfferSerializer)
+
+        rows = []
+        for size in sorted(sizes):
+            queryset = Offer.objects.order_by("-created_at", "-id")[:size]
+
+            def model_serializer():
+                return OfferSerializer(queryset.all(), many=True).data
+
+            def values():
+                return values_serializer.many_to_representation(values_serializer.values(queryset.all()))
+
+            assert values() == model_serializer(), "the serializers don't return the same data"
+            model_ms = percentile(timed(model_serializer, REPEAT), 50) * 1000
+            values_ms = percentile(timed(values, REPEAT), 50) * 1000
+            rows.append([size, f"{model_ms:.2f}", f"{values_ms:.2f}", f"{model_ms / values_ms:.1f}x"])
+        print_table(["offers", "ModelSerializer p50 ms", "ValuesSerializer p50 ms", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,124 @@
+"""
+Routing of the API reads between the primary database and a read replica.
+
+Usage:
+    DJANGO_SETTINGS_MODULE=benchmarks.settings_replica_sqlite python -m benchmarks.replica_routing [--requests 200]
+
+The test database is seeded and copied to the replica, which then never receives the later
+writes, like a replica that stopped replaying. Each scenario runs through the full middleware
+stack and reports the queries sent to each database, the p50 latency and how many of the
+offers created by a writer could be read right after:
+- reads: a reader lists offers, every query goes to the replica.
+- writer: a client creates an offer then reads it, from the primary.
+- other reader: another client reads the same offers, from the replica that doesn't have them.
+- lagging replica: the replica lags more than MAX_LAG, every read goes to the primary.
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from benchmarks.common import percentile, print_table, setup_django, test_database
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connections
+    from django.test import Client, override_settings
+
+    from benchmarks.seed import seed
+    from employment_portal.db.routers import replica_lag_monitor, use_primary
+
+    replicas = settings.DATABASE_REPLICATION["REPLICAS"]
+    if len(replicas) != 1:
+        sys.exit("this benchmark needs exactly one replica, use benchmarks.settings_replica_sqlite")
+    replica = connections[replicas[0]]
+
+    with test_database() as connection, override_settings(OFFER_CACHE={**settings.OFFER_CACHE, "ENABLED": False}):
+        with use_primary():
+            data = seed(offers=500, postulations=500)
+        # "Replicate" the seeded database once, the replica misses every later write.
+        connection.close()
+        replica.close()
+        replica.settings_dict["NAME"] = replica.settings_dict["TEST"]["NAME"]
+        shutil.copyfile(connection.settings_dict["NAME"], replica.settings_dict["NAME"])
+
+        queries = Counter()
+
+        def count(alias):
+            def wrapper(execute, sql, params, many, context):
+                queries[alias] += 1
+                return execute(sql, params, many, context)
+
+            return wrapper
+
+        writer = Client(HTTP_AUTHORIZATION=f"Token {data.tokens[0].key}")
+        reader = Client(HTTP_AUTHORIZATION=f"Token {data.tokens[1].key}")
+        company = data.companies[0].id
+
+        def create_offer(index: int) -> int:
+            payload = {
+                "title": f"Replica Offer {index}",
+                "description": "Offer created by the replica routing benchmark",
+                "salary": "2500.00",
+                "company": company,
+                "skills": "Python, Django",
+            }
+            response = writer.post("/api/create-offer/", payload, content_type="application/json")
+            assert response.status_code == 201, response.content
+            return response.json()["id"]
+
+        def read(client) -> bool:
+            response = client.get("/api/offers/", {"page_size": 20})
+            assert response.status_code == 200, response.content
+            return False
+
+        def visible(client, offer_id: int) -> bool:
+            return client.get(f"/api/update-offer/{offer_id}/").status_code == 200
+
+        def run(scenario: str, request) -> list:
+            queries.clear()
+            latencies, seen = [], 0
+            with ExitStack() as stack:
+                for alias in (connection.alias, replica.alias):
+                    stack.enter_context(connections[alias].execute_wrapper(count(alias)))
+                for index in range(args.requests):
+                    start = time.perf_counter()
+                    seen += request(index)
+                    latencies.append(time.perf_counter() - start)
+            return [
+                scenario,
+                args.requests,
+                queries[connection.alias],
+                queries[replica.alias],
+                round(percentile(latencies, 50) * 1000, 2),
+                seen,
+            ]
+
+        created = []
+        rows = [
+            run("reads", lambda index: read(reader)),
+            run("writer", lambda index: created.append(create_offer(index)) or visible(writer, created[-1])),
+            run("other reader", lambda index: visible(reader, created[index])),
+        ]
+        replica_lag_monitor.reset()
+        with override_settings(DATABASE_REPLICATION={**settings.DATABASE_REPLICATION, "MAX_LAG": -1}):
+            rows.append(run("lagging replica", lambda index: visible(reader, created[index])))
+        replica_lag_monitor.reset()
+        replica.close()
+        os.remove(replica.settings_dict["NAME"])
+
+    print(f"database: {connection.vendor}, replica: {replica.alias}")
+    print_table(["scenario", "requests", "primary queries", "replica queries", "p50 ms", "new offers seen"], rows)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,47 @@
+"""
+Offer search latency against a growing synthetic corpus.
+
+Usage:
+    python -m benchmarks.search_offers [size ...]
+
+For each corpus size the offers are inserted in the test database, the search vectors
+are computed and a fixed set of queries is executed through search_offers. On PostgreSQL
+the p95 should stay flat as the corpus grows thanks to the GIN index, the SQLite fallback
+scans the table and grows linearly.
+"""
+import sys
+
+from benchmarks.common import build_offers, percentile, print_table, setup_django, test_database, timed
+
+DEFAULT_SIZES = (1000, 10000, 50000)
+QUERIES = ("python", "django postgres", "senior backend", "remote react", "kubernetes aws docker")
+PAGE_SIZE = 20
+REPEAT = 20
+
+
+def main(sizes) -> None:
+    setup_django()
+    from employment_portal.models import Company, Offer
+    from employment_portal.search import search_offers, update_offer_search_vector
+
+    with test_database() as connection:
+        print(f"database: {connection.vendor}")
+        companies = Company.objects.bulk_create(Company(name=f"Company {i}", nit=str(i)) for i in range(50))
+        rows = []
+        created = 0
+        for size in sorted(sizes):
+            Offer.objects.bulk_create(build_offers(size - created, companies, seed=size), batch_size=1000)
+            update_offer_search_vector(Offer.objects.filter(search_vector__isnull=True))
+            created = size
+
+            samples = []
+            for terms in QUERIES:
+                samples += timed(lambda: list(search_offers(Offer.objects.all(), terms)[:PAGE_SIZE]), REPEAT)
+            rows.append(
+                [size, f"{percentile(samples, 50) * 1000:.2f}", f"{percentile(samples, 95) * 1000:.2f}"]
+            )
+        print_table(["offers", "p50 ms", "p95 ms"], rows)
+
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
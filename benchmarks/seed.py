@@ -0,0 +1,67 @@
+"""
+Synthetic data seeding shared by the benchmarks.
+"""
+from dataclasses import dataclass
+
+from benchmarks.common import build_offers
+
+PASSWORD = "benchmark-password"
+
+
+@dataclass
+class SeededData:
+    companies: list
+    offers: list
+    users: list
+    tokens: list
+
+
+def seed(companies: int = 20, offers: int = 2000, users: int = 200, postulations: int = 5000) -> SeededData:
+    """
+    Insert synthetic companies, offers with their skills, users with tokens and postulations.
+
+    Every user can log in with the username "bench<index>" and PASSWORD, the first one is a staff user.
+    """
+    from django.contrib.auth.hashers import make_password
+    from rest_framework.authtoken.models import Token
+
+    from employment_portal.counters import reconcile_postulation_counts
+    from employment_portal.duplicates import index_offer_signatures
+    from employment_portal.facets import rebuild_offer_facets
+    from employment_portal.models import ApplicantUser, Company, Offer, Postulation
+    from employment_portal.search import update_offer_search_vector
+    from employment_portal.skills import add_offers_skills
+
+    created_companies = Company.objects.bulk_create(
+        Company(name=f"Company {index}", nit=f"bench-{index}") for index in range(companies)
+    )
+    created_offers = Offer.objects.bulk_create(build_offers(offers, created_companies), batch_size=1000)
+    add_offers_skills(created_offers)
+    index_offer_signatures(created_offers)
+    update_offer_search_vector(Offer.objects.all())
+
+    password = make_password(PASSWORD)
+    created_users = ApplicantUser.objects.bulk_create(
+        (
+            ApplicantUser(
+                username=f"bench{index}",
+                password=password,
+                identification_number=f"bench-{index}",
+                email=f"bench{index}@example.com",
+                is_staff=index == 0,
+            )
+            for index in range(users)
+        ),
+        batch_size=1000,
+    )
+    tokens = Token.objects.bulk_create(Token(user=user, key=Token.generate_key()) for user in created_users)
+    Postulation.objects.bulk_create(
+        (
+            Postulation(user=created_users[index % users], offer=created_offers[index % offers])
+            for index in range(postulations)
+        ),
+        batch_size=2000,
+    )
+    reconcile_postulation_counts()
+    rebuild_offer_facets()
+    return SeededData(created_companies, created_offers, created_users, tokens)
@@ -0,0 +1,30 @@
+"""
+Settings with a primary and a read replica stood in by two SQLite files:
+
+    DJANGO_SETTINGS_MODULE=benchmarks.settings_replica_sqlite python -m benchmarks.replica_routing
+
+SQLite doesn't replicate, the replica file is a copy of the primary taken by the caller, so
+it shows which reads the router sends to the replica and which ones see the latest writes.
+"""
+from benchmarks.settings_sqlite import *  # noqa: F401,F403
+from benchmarks.settings_sqlite import BASE_DIR, DATABASE_REPLICATION, DATABASES, MIDDLEWARE  # noqa: F401
+
+DATABASES = {
+    "default": DATABASES["default"],
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "benchmarks" / "benchmark_replica.sqlite3",
+        "OPTIONS": {"timeout": 30},
+        "TEST": {"NAME": BASE_DIR / "benchmarks" / "test_benchmark_replica.sqlite3"},
+    },
+}
+
+DATABASE_REPLICATION = {**DATABASE_REPLICATION, "REPLICAS": ["replica"]}
+
+# The replica pins need a cache shared by the processes, files stand in for Redis.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "benchmarks" / "benchmark_cache",
+    },
+}
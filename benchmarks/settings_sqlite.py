@@ -0,0 +1,20 @@
+"""
+Settings to run the benchmarks against SQLite:
+
+    DJANGO_SETTINGS_MODULE=benchmarks.settings_sqlite python -m benchmarks.endpoints
+
+The test database is a file so the load driver threads can share it.
+"""
+from focunti.settings import *  # noqa: F401,F403
+from focunti.settings import BASE_DIR, SECRET_KEY
+
+SECRET_KEY = SECRET_KEY or "benchmark-secret-key"
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "benchmarks" / "benchmark.sqlite3",
+        "OPTIONS": {"timeout": 30},
+        "TEST": {"NAME": BASE_DIR / "benchmarks" / "test_benchmark.sqlite3"},
+    }
+}
@@ -0,0 +1,58 @@
+"""
+Multi-skill offer filtering: normalized skill index versus substring scans.
+
+Usage:
+    python -m benchmarks.skill_filters [offers]
+
+Compares filter_offers_by_skills (indexed joins over OfferSkill) with the equivalent
+icontains filters over the free-text Offer.skills field, for AND and OR queries.
+"""
+import sys
+from functools import reduce
+from operator import and_, or_
+
+from benchmarks.common import build_offers, percentile, print_table, setup_django, test_database, timed
+
+DEFAULT_OFFERS = 20000
+SKILLS = ("python", "django", "postgres")
+REPEAT = 20
+
+
+def main(size: int) -> None:
+    setup_django()
+    from django.db.models import Q
+
+    from employment_portal.models import Company, Offer, OfferSkill, Skill
+    from employment_portal.skills import filter_offers_by_skills, parse_skills
+
+    with test_database() as connection:
+        print(f"database: {connection.vendor}, offers: {size}")
+        companies = Company.objects.bulk_create(Company(name=f"Company {i}", nit=str(i)) for i in range(50))
+        offers = Offer.objects.bulk_create(build_offers(size, companies), batch_size=1000)
+
+        names = {name for offer in offers for name in parse_skills(offer.skills)}
+        skills = {skill.name: skill.id for skill in Skill.objects.bulk_create(Skill(name=name) for name in names)}
+        OfferSkill.objects.bulk_create(
+            (OfferSkill(offer=offer, skill_id=skills[name]) for offer in offers for name in parse_skills(offer.skills)),
+            batch_size=5000,
+        )
+
+        queries = {
+            "index AND": lambda: list(filter_offers_by_skills(Offer.objects.all(), SKILLS, "all")[:20]),
+            "index OR": lambda: list(filter_offers_by_skills(Offer.objects.all(), SKILLS, "any")[:20]),
+            "icontains AND": lambda: list(
+                Offer.objects.filter(reduce(and_, (Q(skills__icontains=name) for name in SKILLS)))[:20]
+            ),
+            "icontains OR": lambda: list(
+                Offer.objects.filter(reduce(or_, (Q(skills__icontains=name) for name in SKILLS)))[:20]
+            ),
+        }
+        rows = []
+        for label, query in queries.items():
+            samples = timed(query, REPEAT)
+            rows.append([label, f"{percentile(samples, 50) * 1000:.2f}", f"{percentile(samples, 95) * 1000:.2f}"])
+        print_table(["query", "p50 ms", "p95 ms"], rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_OFFERS)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class EmploymentPortalConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'employment_portal'
+
+    def ready(self):
+        from . import signals  # noqa: F401
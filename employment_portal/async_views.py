@@ -0,0 +1,170 @@
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .authentication import aauthenticate
+from .filters import filter_offers
+from .models import Company, Offer
+from .pagination import OfferCursorPagination, OfferSearchPagination
+from .read_serializers import get_values_serializer
+from .renderers import ORJSONRenderer
+from .search import search_offers
+from .serializers import CompanySerializer, OfferFilterSerializer, OfferSearchFilterSerializer, OfferSerializer
+
+
+class AsyncAPIView(View):
+    """
+    Base view for the async read endpoints.
+
+    DRF views are synchronous, so under ASGI each request holds a worker thread for its whole
+    duration. These views are native Django async views: the request is authenticated with
+    aauthenticate(), the query parameters are validated with the DRF serializers, the rows are
+    read with the async ORM and the response is rendered with ORJSONRenderer, so the JSON
+    bodies and error responses are the ones of the DRF endpoints. Under WSGI they still work,
+    Django runs them in an event loop of the request thread.
+
+    Attributes:
+    - query_budget (int): Maximum number of queries of a request, see RequestMetricsMiddleware.
+
+    Methods:
+    - dispatch(request): Authenticates the request and calls the async handler of its method.
+    - handle_exception(request, exc): Builds the error response of a DRF APIException.
+    - render(data, status): Builds the JSON response.
+
+    """
+
+    http_method_names = ["get", "options"]
+    query_budget = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            credentials = await aauthenticate(request)
+            if credentials is None:
+                raise exceptions.NotAuthenticated()
+            request.user, request.auth = credentials
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.handle_exception(request, exc)
+
+    def handle_exception(self, request, exc) -> HttpResponse:
+        status_code = exc.status_code
+        auth_header = None
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            # Same as DRF: 401 with the scheme of the first authentication class, 403 without one.
+            auth_header = self.get_authenticate_header(request)
+            if auth_header is None:
+                status_code = 403
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {"detail": exc.detail}
+        response = self.render(data, status_code)
+        if auth_header:
+            response["WWW-Authenticate"] = auth_header
+        return response
+
+    def get_authenticate_header(self, request):
+        authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        return authentication_classes[0]().authenticate_header(request) if authentication_classes else None
+
+    def render(self, data, status: int = 200) -> HttpResponse:
+        return HttpResponse(ORJSONRenderer().render(data), status=status, content_type="application/json")
+
+
+class AsyncOfferListView(AsyncAPIView):
+    """
+    Async version of OfferListView.
+
+    Supported HTTP methods:
+    - GET: Lists Offers newest first, with the filters and cursor pagination of OfferListView.
+
+    Pages are read with the async ORM and serialized by the ValuesSerializer of OfferSerializer.
+    Unlike OfferListView they aren't cached and carry no ETag.
+
+    Attributes:
+    - serializer_class (Serializer): The serializer whose JSON shape is returned.
+    - pagination_class (Pagination): The keyset pagination used to split the results in pages.
+    - filter_serializer_class (Serializer): The serializer used to validate the query parameters.
+
+    """
+
+    serializer_class = OfferSerializer
+    pagination_class = OfferCursorPagination
+    filter_serializer_class = OfferFilterSerializer
+    query_budget = 2
+
+    def get_filter_params(self, request) -> dict:
+        filters = self.filter_serializer_class(data=request.GET)
+        filters.is_valid(raise_exception=True)
+        return filters.validated_data
+
+    def get_queryset(self, params: dict):
+        return filter_offers(Offer.objects.all(), params)
+
+    async def get(self, request):
+        values_serializer = get_values_serializer(self.serializer_class)
+        queryset = values_serializer.values(self.get_queryset(self.get_filter_params(request)))
+        paginator = self.pagination_class()
+        page_queryset = paginator.get_page_queryset(queryset, Request(request))
+        page = paginator.set_page([row async for row in page_queryset])
+        return self.render(paginator.get_paginated_response(values_serializer.many_to_representation(page)).data)
+
+
+class AsyncOfferSearchView(AsyncOfferListView):
+    """
+    Async version of OfferSearchView.
+
+    Supported HTTP methods:
+    - GET: Lists the Offers matching the 'q' search terms, most relevant first, with the
+        filters and page number pagination of OfferSearchView.
+
+    """
+
+    pagination_class = OfferSearchPagination
+    filter_serializer_class = OfferSearchFilterSerializer
+
+    def get_queryset(self, params: dict):
+        return search_offers(super().get_queryset(params), params["q"])
+
+
+class AsyncObjectView(AsyncAPIView):
+    """
+    Base view returning one object read with the async ORM.
+
+    Supported HTTP methods:
+    - GET: Returns the object identified by 'pk', or 404 when it doesn't exist.
+
+    Attributes:
+    - model (Model): The model of the object.
+    - serializer_class (Serializer): The serializer whose JSON shape is returned.
+
+    """
+
+    model = None
+    serializer_class = None
+    query_budget = 2
+
+    async def get(self, request, pk):
+        values_serializer = get_values_serializer(self.serializer_class)
+        try:
+            row = await values_serializer.values(self.model.objects.filter(pk=pk)).aget()
+        except self.model.DoesNotExist:
+            raise exceptions.NotFound()
+        return self.render(values_serializer.to_representation(row))
+
+
+class AsyncOfferDetailView(AsyncObjectView):
+    """
+    Async view returning an Offer.
+    """
+
+    model = Offer
+    serializer_class = OfferSerializer
+
+
+class AsyncCompanyDetailView(AsyncObjectView):
+    """
+    Async view returning a Company.
+    """
+
+    model = Company
+    serializer_class = CompanySerializer
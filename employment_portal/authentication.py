@@ -0,0 +1,308 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, TokenAuthentication, get_authorization_header
+from rest_framework.settings import api_settings
+
+from .tokens import ACCESS_TOKEN, InvalidSignedToken, decode_token
+
+
+class LocalTokenCache:
+    """
+    Bounded in-process LRU cache with a time to live for every entry.
+
+    The cache of each process only sees its own deletions. With a revocations cache, delete() and
+    clear() also move a generation stored in that Django cache, and every process clears its
+    entries when it sees the generation move, which it checks at most every check_interval
+    seconds: a deleted token or a deactivated user is then refused by all the processes after
+    check_interval seconds instead of after the timeout of the entries.
+
+    Attributes:
+    - max_size (int): Maximum number of entries, the least recently used one is evicted first.
+    - timeout (int): Seconds an entry stays valid after it is stored.
+    - revocations (str): Alias of the Django cache shared by the processes holding the generation, None for none.
+    - check_interval (float): Seconds between two reads of the generation.
+    """
+
+    generation_key = "auth-token-local-generation"
+
+    def __init__(self, max_size: int, timeout: int, revocations: str = None, check_interval: float = 1):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.revocations = revocations
+        self.check_interval = check_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self._checked_at = None
+
+    def _check_due(self) -> bool:
+        if self.revocations is None:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return False
+            self._checked_at = now
+        return True
+
+    def _set_generation(self, generation) -> None:
+        with self._lock:
+            if generation != self._generation:
+                # Another process revoked an entry, which may be any of ours.
+                self._entries.clear()
+                self._generation = generation
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return value
+
+    def get(self, key):
+        if self._check_due():
+            self._set_generation(caches[self.revocations].get(self.generation_key))
+        return self._get(key)
+
+    async def aget(self, key):
+        # The entries are in memory, only reading the generation may wait for the revocations cache.
+        if self._check_due():
+            self._set_generation(await caches[self.revocations].aget(self.generation_key))
+        return self._get(key)
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _revoke(self) -> None:
+        if self.revocations is None:
+            return
+        # Again when the transaction commits, for a process that read the revoked row before the commit.
+        caches[self.revocations].set(self.generation_key, time.time_ns(), None)
+        transaction.on_commit(lambda: caches[self.revocations].set(self.generation_key, time.time_ns(), None))
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+        self._revoke()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self._revoke()
+
+
+class SharedTokenCache:
+    """
+    Token cache stored in one of the Django cache backends (settings.CACHES), shared by all the processes.
+
+    Token keys are hashed before being used as cache keys, so the cache store never holds usable tokens.
+    Entries are stored with the generation of the token cache, read in the same round trip, and
+    clear() moves to a new generation: the other entries of the Django cache are kept.
+
+    Attributes:
+    - alias (str): The alias of the Django cache.
+    - timeout (int): Seconds an entry stays valid after it is stored.
+    """
+
+    key_prefix = "auth-token:"
+    generation_key = "auth-token-generation"
+
+    def __init__(self, alias: str, timeout: int):
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def make_key(self, key: str) -> str:
+        return self.key_prefix + hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        cache_key = self.make_key(key)
+        values = self.cache.get_many([cache_key, self.generation_key])
+        entry = values.get(cache_key)
+        # Entries stored before the last clear() belong to an older generation.
+        if entry is None or entry[0] != values.get(self.generation_key):
+            return None
+        return entry[1]
+
+    async def aget(self, key):
+        cache_key = self.make_key(key)
+        values = await self.cache.aget_many([cache_key, self.generation_key])
+        entry = values.get(cache_key)
+        if entry is None or entry[0] != values.get(self.generation_key):
+            return None
+        return entry[1]
+
+    def set(self, key, value) -> None:
+        generation = self.cache.get(self.generation_key)
+        if generation is None:
+            # An evicted generation restarts from a new unique value, never from an old one.
+            self.cache.add(self.generation_key, time.time_ns(), None)
+            generation = self.cache.get(self.generation_key)
+        self.cache.set(self.make_key(key), (generation, value), self.timeout)
+
+    def delete(self, key) -> None:
+        self.cache.delete(self.make_key(key))
+
+    def clear(self) -> None:
+        self.cache.set(self.generation_key, time.time_ns(), None)
+
+
+_token_cache = None
+
+
+def get_token_cache():
+    """
+    Return the token cache configured in settings.TOKEN_AUTH_CACHE, built on first use.
+    """
+    global _token_cache
+    if _token_cache is None:
+        config = settings.TOKEN_AUTH_CACHE
+        if config["BACKEND"] == "local":
+            _token_cache = LocalTokenCache(
+                config["MAX_SIZE"],
+                config["TIMEOUT"],
+                config["REVOCATION_BACKEND"] or None,
+                config["REVOCATION_CHECK_INTERVAL"],
+            )
+        else:
+            _token_cache = SharedTokenCache(config["BACKEND"], config["TIMEOUT"])
+    return _token_cache
+
+
+def reset_token_cache() -> None:
+    global _token_cache
+    _token_cache = None
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement of TokenAuthentication that caches the token to user resolution.
+
+    A cache hit authenticates the request without any database query. Entries are removed
+    when their token is deleted and when their user is saved (e.g. deactivated) or deleted,
+    see signals.py; with the local backend the other processes drop them within
+    REVOCATION_CHECK_INTERVAL seconds (see LocalTokenCache). Changes made with QuerySet.update()
+    don't send signals and are only picked up when the entry expires (settings.TOKEN_AUTH_CACHE["TIMEOUT"]).
+    """
+
+    def authenticate_credentials(self, key):
+        token_cache = get_token_cache()
+        credentials = token_cache.get(key)
+        if credentials is None:
+            credentials = super().authenticate_credentials(key)
+            token_cache.set(key, credentials)
+        return self.copy_credentials(credentials)
+
+    def copy_credentials(self, credentials):
+        # Every request gets its own copies, so changes made to request.user don't leak between requests.
+        user, token = credentials
+        return copy.copy(user), copy.copy(token)
+
+    async def aauthenticate(self, request):
+        """
+        Async version of authenticate() for async views. The token cache is read with its async
+        API (Django's async cache methods for a shared cache), only a cache miss or an invalid
+        header runs the synchronous authentication in a thread.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 2:
+            try:
+                key = auth[1].decode()
+            except UnicodeError:
+                key = None
+            credentials = await get_token_cache().aget(key) if key is not None else None
+            if credentials is not None:
+                return self.copy_credentials(credentials)
+        return await sync_to_async(self.authenticate)(request)
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Stateless authentication with the signed access tokens issued by the login view.
+
+    Clients send "Authorization: Bearer <access token>". The token is verified with
+    settings.SIGNED_TOKEN (APP_SECRET_KEY / APP_ALGORITHM) and the user is rebuilt from its
+    claims, so no database query runs on the request path. request.user is therefore an
+    unsaved instance holding only the id, username and staff status of the user; deactivated
+    users and revoked staff keep their access until their access token expires, the refresh
+    view reads the user again.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed("Invalid bearer header.")
+
+        try:
+            claims = decode_token(auth[1].decode("ascii"), ACCESS_TOKEN)
+        except (InvalidSignedToken, UnicodeError) as exc:
+            raise exceptions.AuthenticationFailed(str(exc) or "Invalid token.")
+
+        user = get_user_model()(
+            pk=claims["user_id"], username=claims["username"], is_staff=claims.get("is_staff") is True
+        )
+        return user, claims
+
+    def authenticate_header(self, request) -> str:
+        return self.keyword
+
+    async def aauthenticate(self, request):
+        return self.authenticate(request)
+
+
+def signed_tokens_enabled() -> bool:
+    """
+    Return True when settings.REST_FRAMEWORK authenticates with signed tokens.
+    """
+    return any(issubclass(cls, SignedTokenAuthentication) for cls in api_settings.DEFAULT_AUTHENTICATION_CLASSES)
+
+
+async def aauthenticate(request):
+    """
+    Authenticate a Django request with settings.REST_FRAMEWORK authentication classes, for async views.
+
+    Classes with an 'aauthenticate' coroutine are awaited, the others run in a thread.
+
+    Returns:
+    - The (user, auth) pair of the first class that authenticates the request, or None without credentials.
+
+    Raises:
+    - AuthenticationFailed: When the credentials are invalid.
+    """
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        authenticator = authentication_class()
+        if hasattr(authenticator, "aauthenticate"):
+            result = await authenticator.aauthenticate(request)
+        else:
+            result = await sync_to_async(authenticator.authenticate)(request)
+        if result is not None:
+            return result
+    return None
@@ -0,0 +1,191 @@
+import hashlib
+import heapq
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from rest_framework import status
+from rest_framework.response import Response
+
+from .db.routers import replication_lag_window
+from .instrumentation import timed_section
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_VERSION_KEY = "offers:version"
+COMPANY_VERSION_KEY = "offers:version:company:{}"
+
+# Response headers stored with the cached pages, so conditional requests can be answered from the cache.
+CACHED_HEADERS = ("ETag", "Last-Modified")
+
+
+class CacheStats:
+    """
+    Hit and miss counters of the offer read cache in this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_ratio": self.hits / total if total else 0.0}
+
+
+offer_cache_stats = CacheStats()
+
+
+def get_offer_cache():
+    return caches[settings.OFFER_CACHE["BACKEND"]]
+
+
+def _get_version(key: str) -> int:
+    cache = get_offer_cache()
+    version = cache.get(key)
+    if version is None:
+        # A version evicted from the cache restarts from a new unique value, never from an old one.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_versions(keys: list) -> None:
+    cache = get_offer_cache()
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def bump_offer_cache_versions(*company_ids) -> None:
+    """
+    Invalidate the cached offer pages of the companies and the pages not filtered by company.
+
+    The versions are bumped right away and again when the current transaction commits, so a
+    page read by another request before the commit can't stay cached with the new version.
+    With read replicas they are bumped once more when the replicas may have caught up, for the
+    pages read from a replica that didn't replay the write yet.
+    """
+    keys = [GLOBAL_VERSION_KEY] + [COMPANY_VERSION_KEY.format(pk) for pk in set(company_ids) if pk is not None]
+    _bump_versions(keys)
+    transaction.on_commit(lambda: _bump_versions(keys))
+    lag_window = replication_lag_window()
+    if lag_window:
+        transaction.on_commit(lambda: delayed_version_bumps.schedule(keys, lag_window))
+
+
+class DelayedVersionBumps:
+    """
+    Bump offer versions after a delay, on one background thread per process.
+
+    Due times are rounded up to RESOLUTION seconds and the keys due at the same time are merged,
+    so a burst of writes costs one bump per key and tick instead of one thread per write. The
+    thread sleeps until the earliest due time.
+
+    Methods:
+    - schedule(keys, delay): Bumps the versions of the keys in at least 'delay' seconds.
+    - pending(): Returns the number of due times waiting.
+
+    """
+
+    RESOLUTION = 0.1
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._heap = []
+        self._keys = {}
+        self._thread = None
+
+    def schedule(self, keys: list, delay: float) -> None:
+        due = math.ceil((time.monotonic() + delay) / self.RESOLUTION) * self.RESOLUTION
+        with self._condition:
+            if due not in self._keys:
+                self._keys[due] = set()
+                heapq.heappush(self._heap, due)
+            self._keys[due].update(keys)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="offer-cache-bumps", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._heap)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._heap or self._heap[0] > time.monotonic():
+                    self._condition.wait(self._heap[0] - time.monotonic() if self._heap else None)
+                keys = self._keys.pop(heapq.heappop(self._heap))
+            try:
+                _bump_versions(sorted(keys))
+            except Exception:
+                # The cached pages then expire with OFFER_CACHE["TIMEOUT"], the thread keeps serving.
+                logger.warning("The offer cache versions couldn't be bumped.", exc_info=True)
+
+
+delayed_version_bumps = DelayedVersionBumps()
+
+
+def offer_cache_key(request, company_id=None) -> str:
+    """
+    Key of a cached offer page, made of the requested URL and the version it depends on.
+    """
+    # Pages filtered by company only hold offers of that company, so writes to other companies keep them.
+    key = COMPANY_VERSION_KEY.format(company_id) if company_id is not None else GLOBAL_VERSION_KEY
+    version = _get_version(key)
+    url = request.build_absolute_uri(request.path) + "?" + "&".join(sorted(request.GET.urlencode().split("&")))
+    return f"offers:page:{hashlib.sha256(url.encode()).hexdigest()}:{version}"
+
+
+class OfferCacheMixin:
+    """
+    List view mixin serving offer pages from settings.OFFER_CACHE.
+
+    The cached value is the serialized page, so a hit runs neither the queryset nor the
+    serializer. Pages are keyed by their URL (filters and cursor) and by the offer version of
+    the filtered company, or the global one, bumped by every offer write (see signals.py).
+    Responses carry an X-Cache header with HIT or MISS, the lookup time is reported in the
+    "cache" section of the request metrics and hits and misses are counted in offer_cache_stats.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not settings.OFFER_CACHE["ENABLED"]:
+            return super().list(request, *args, **kwargs)
+
+        cache = get_offer_cache()
+        with timed_section("cache"):
+            key = offer_cache_key(request, self.get_filter_params().get("company"))
+            entry = cache.get(key)
+        offer_cache_stats.record(entry is not None)
+        if entry is not None:
+            data, headers = entry
+            # The cached validators answer conditional requests without reading the database.
+            response = Response(data, headers=headers)
+            response = get_conditional_response(request, etag=headers.get("ETag"), response=response)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+            cache.set(key, (response.data, headers), settings.OFFER_CACHE["TIMEOUT"])
+        response["X-Cache"] = "MISS"
+        return response
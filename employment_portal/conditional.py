@@ -0,0 +1,107 @@
+import hashlib
+
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:32]
+
+
+def offer_etag(offer) -> str:
+    """
+    Strong ETag of an offer, it changes whenever the offer is saved or its postulation count changes.
+    """
+    return f'"{_digest(offer.pk, offer.updated_at.isoformat(), offer.postulation_count)}"'
+
+
+def page_validators(rows: list, has_next: bool) -> tuple:
+    """
+    Weak ETag and last modification time of a page of offers read with .values().
+
+    The ETag covers the id, updated_at and postulation count (which changes without touching
+    updated_at) of every offer of the page and whether a next page follows, so it changes when
+    an offer of the page is saved, when one is added or deleted and when the page boundary moves,
+    without reading more than the page itself.
+    """
+    parts = [(row["id"], row["updated_at"].isoformat(), row["postulation_count"]) for row in rows]
+    last_modified = max((row["updated_at"] for row in rows), default=None)
+    return f'W/"{_digest(*parts, has_next)}"', last_modified
+
+
+def set_validators(response, etag: str, last_modified=None):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+def conditional_response(request, etag: str, last_modified=None):
+    """
+    Return the 304 or 412 response the request preconditions call for, or None to handle it normally.
+
+    Preconditions are evaluated on the ETag only. Last-Modified is sent for information, but
+    postulation counts and deleted offers change a response without moving updated_at, so
+    If-Modified-Since and If-Unmodified-Since alone can't tell whether it changed.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+class ConditionalListMixin:
+    """
+    List view mixin answering If-None-Match with 304 Not Modified before the page is serialized.
+
+    The validators are computed from the rows of the page being served (see page_validators()),
+    so a request costs the page query and no aggregate over the filtered offers. It works with
+    the pages read by ValuesListMixin.
+    """
+
+    def get_page_response(self, page: list, serialize):
+        etag, last_modified = page_validators(page, self.paginator.has_next)
+        response = conditional_response(self.request, etag, last_modified)
+        if response is not None:
+            return response
+        return set_validators(super().get_page_response(page, serialize), etag, last_modified)
+
+
+class ConditionalObjectMixin:
+    """
+    Retrieve and update view mixin for offers with ETag and Last-Modified validators.
+
+    GET answers If-None-Match with 304 Not Modified without running the serializer, and PUT
+    and PATCH answer a stale If-Match with 412 Precondition Failed before validating the
+    payload, so concurrent clients can't overwrite each other's changes. The offer is read with
+    SELECT ... FOR UPDATE in the transaction of the update, so a concurrent update sending the
+    same If-Match waits for it to commit and then gets 412 instead of overwriting it.
+    """
+
+    def get_object(self):
+        if not hasattr(self, "_object"):
+            self._object = super().get_object()
+        return self._object
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # The schema generator calls it without a request.
+        method = getattr(self.request, "method", None)
+        return queryset.select_for_update() if method in ("PUT", "PATCH") else queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        offer = self.get_object()
+        response = conditional_response(request, offer_etag(offer), offer.updated_at)
+        if response is not None:
+            return response
+        return set_validators(super().retrieve(request, *args, **kwargs), offer_etag(offer), offer.updated_at)
+
+    @transaction.atomic
+    def update(self, request, *args, **kwargs):
+        offer = self.get_object()
+        response = conditional_response(request, offer_etag(offer), offer.updated_at)
+        if response is not None:
+            return response
+        response = super().update(request, *args, **kwargs)
+        return set_validators(response, offer_etag(offer), offer.updated_at)
@@ -0,0 +1,82 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Greatest
+
+from .caching import bump_offer_cache_versions
+from .models import Company, Offer, Postulation
+
+
+def change_postulation_counts(offer_id: int, company_id: int, delta: int) -> None:
+    """
+    Add delta to the postulation counters of the offer and its company.
+
+    The counters are changed with F() expressions, so concurrent postulations don't lose
+    updates, and never go below zero if they drifted.
+    """
+    value = Greatest(F("postulation_count") + delta, 0)
+    Offer.objects.filter(pk=offer_id).update(postulation_count=value)
+    Company.objects.filter(pk=company_id).update(postulation_count=value)
+
+
+def subtract_postulations(postulations) -> None:
+    """
+    Subtract the postulations of a queryset, before they are deleted, from the counters of their offers and companies.
+
+    Each counter is decremented by its number of postulations in the queryset with a correlated
+    subquery, so the cost is three queries whatever the number of postulations. Deletion
+    signals on Postulation would make Django load the postulations of every deleted offer,
+    company or user and delete them one by one, the counters are therefore decremented by
+    Postulation.delete() and by the pre_delete receivers of users and offers (see signals.py).
+    Deleting postulations with QuerySet.delete() leaves the counters to reconcile_postulation_counts().
+    """
+    company_ids = list(postulations.order_by().values_list("offer__company_id", flat=True).distinct())
+    for model, lookup in ((Offer, "offer_id"), (Company, "offer__company_id")):
+        count = postulations.filter(**{lookup: OuterRef("pk")}).order_by().values(lookup).annotate(total=Count("id"))
+        model.objects.filter(pk__in=postulations.values(lookup)).update(
+            postulation_count=Greatest(F("postulation_count") - Subquery(count.values("total")), 0)
+        )
+    bump_offer_cache_versions(*company_ids)
+
+
+def _reconcile(model, count_lookup: str, batch_size: int) -> int:
+    fixed = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            # The rows are locked before their postulations are counted, so a postulation
+            # incrementing one of them meanwhile waits for the batch and isn't overwritten.
+            batch = list(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .select_for_update()
+                .values_list("pk", "postulation_count")[:batch_size]
+            )
+            if not batch:
+                return fixed
+            last_pk = batch[-1][0]
+
+            pks = [pk for pk, _ in batch]
+            actual = dict(
+                Postulation.objects.filter(**{f"{count_lookup}__in": pks})
+                .order_by()
+                .values_list(count_lookup)
+                .annotate(total=Count("id"))
+            )
+            drifted = [
+                model(pk=pk, postulation_count=actual.get(pk, 0)) for pk, count in batch if actual.get(pk, 0) != count
+            ]
+            model.objects.bulk_update(drifted, ["postulation_count"])
+            fixed += len(drifted)
+
+
+def reconcile_postulation_counts(batch_size: int = 1000) -> tuple:
+    """
+    Repair the postulation counters that drifted from the real number of postulations.
+
+    Offers and companies are walked by primary key in batches, each batch is locked, compared
+    with one grouped COUNT over its postulations and only the drifted rows are updated.
+
+    Returns:
+    - A tuple with the number of fixed offers and the number of fixed companies.
+    """
+    return _reconcile(Offer, "offer_id", batch_size), _reconcile(Company, "offer__company_id", batch_size)
@@ -0,0 +1,244 @@
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class PoolClosed(Exception):
+    pass
+
+
+class PoolStats:
+    """
+    Counters of a connection pool since the process started.
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.timeouts = 0
+        self.errors = 0
+        self.discarded = 0
+
+    def as_dict(self) -> dict:
+        stats = dict(vars(self))
+        stats["wait_time"] = round(stats["wait_time"], 4)
+        return stats
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of database connections with a maximum size.
+
+    Checking out waits up to 'timeout' seconds for a connection when all of them are in use and
+    raises PoolTimeout after that. Idle connections are reused newest first; a connection idle
+    for more than 'health_check_interval' seconds is checked before being reused, and one older
+    than 'max_lifetime' seconds is closed and replaced. Returned connections are reset by
+    'reset' (rollback of an open transaction, session reset...) and closed when that fails.
+    The creation time of a connection is stored on it, as 'pool_created_at'. Once the pool is
+    closed, checkouts raise PoolClosed and the connections still in use are closed when returned.
+
+    Attributes:
+    - connect (callable): Opens a new connection, which must accept new attributes.
+    - max_size (int): Maximum number of connections open at the same time.
+    - timeout (float): Seconds a checkout waits for a free connection.
+    - health_check_interval (float): Idle seconds after which a connection is checked.
+    - max_lifetime (float): Seconds after which a connection is replaced, 0 for no limit.
+    - check (callable): Raises if a connection is no longer usable.
+    - reset (callable): Brings a returned connection back to a clean state.
+    - stats (PoolStats): The counters of the pool.
+    - closed (bool): Whether close() was called.
+    """
+
+    def __init__(
+        self,
+        connect,
+        max_size: int,
+        timeout: float,
+        health_check_interval: float,
+        max_lifetime: float,
+        check,
+        reset,
+        log_interval: float = 0,
+        name: str = "default",
+    ):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.max_lifetime = max_lifetime
+        self.check = check
+        self.reset = reset
+        self.log_interval = log_interval
+        self.name = name
+        self.stats = PoolStats()
+        self.closed = False
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._logged_at = time.monotonic()
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def checkout(self):
+        """
+        Return an open connection, waiting for one to be returned when the pool is full.
+        """
+        if self.closed:
+            raise PoolClosed(f"The connection pool '{self.name}' is closed.")
+        if not self._slots.acquire(blocking=False):
+            start = time.monotonic()
+            acquired = self._slots.acquire(timeout=self.timeout)
+            waited = time.monotonic() - start
+            with self._lock:
+                self.stats.waits += 1
+                self.stats.wait_time += waited
+                if not acquired:
+                    self.stats.timeouts += 1
+            if not acquired:
+                logger.error("Connection pool %s exhausted, no connection freed in %ss.", self.name, self.timeout)
+                raise PoolTimeout(f"No connection of the pool '{self.name}' was freed in {self.timeout} seconds.")
+            logger.warning("Connection pool %s full, waited %.1f ms for a connection.", self.name, waited * 1000)
+
+        try:
+            connection = self._reuse_idle() or self._open()
+        except Exception:
+            self._slots.release()
+            with self._lock:
+                self.stats.errors += 1
+            logger.exception("Connection pool %s failed to open a connection.", self.name)
+            raise
+        with self._lock:
+            self.stats.checkouts += 1
+        self._log_stats()
+        return connection
+
+    def checkin(self, connection) -> None:
+        """
+        Give back a connection obtained with checkout().
+        """
+        try:
+            if self._expired(connection):
+                self._discard(connection)
+                return
+            try:
+                self.reset(connection)
+            except Exception:
+                self._discard(connection)
+                return
+            with self._lock:
+                if not self.closed:
+                    self._idle.append((connection, time.monotonic()))
+                    return
+            # Returned after close(), nothing would reuse or close it.
+            self._close(connection)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """
+        Close the idle connections, the ones in use are closed when they are returned.
+        """
+        with self._lock:
+            self.closed = True
+            idle, self._idle = list(self._idle), deque()
+        for connection, _ in idle:
+            self._close(connection)
+
+    def _reuse_idle(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection, idle_since = self._idle.pop()
+            if self._expired(connection):
+                self._discard(connection)
+                continue
+            if time.monotonic() - idle_since > self.health_check_interval:
+                try:
+                    self.check(connection)
+                except Exception:
+                    logger.warning("Connection pool %s discarded a broken connection.", self.name)
+                    self._discard(connection)
+                    continue
+            return connection
+
+    def _open(self):
+        connection = self.connect()
+        connection.pool_created_at = time.monotonic()
+        with self._lock:
+            self.stats.created += 1
+        return connection
+
+    def _expired(self, connection) -> bool:
+        created_at = getattr(connection, "pool_created_at", 0)
+        return bool(self.max_lifetime) and time.monotonic() - created_at > self.max_lifetime
+
+    def _discard(self, connection) -> None:
+        with self._lock:
+            self.stats.discarded += 1
+        self._close(connection)
+
+    def _close(self, connection) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _log_stats(self) -> None:
+        if not self.log_interval or time.monotonic() - self._logged_at < self.log_interval:
+            return
+        self._logged_at = time.monotonic()
+        stats = {**self.stats.as_dict(), "idle": self.idle, "max_size": self.max_size}
+        logger.info(
+            "Connection pool %s: %s",
+            self.name,
+            " ".join(f"{key}={value}" for key, value in stats.items()),
+            extra={"pool_stats": stats},
+        )
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, factory) -> ConnectionPool:
+    """
+    Return the pool of the process registered under key, created with factory() on first use.
+    """
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = factory()
+        return pool
+
+
+def get_pool_stats() -> dict:
+    """
+    Return the statistics of every pool of the process by name.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: {**pool.stats.as_dict(), "idle": pool.idle, "max_size": pool.max_size} for pool in pools}
+
+
+def close_pools() -> None:
+    """
+    Close the pools of the process. The connections still in use are closed when they are
+    returned, the next connections come from new pools.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,110 @@
+"""
+PostgreSQL backend taking its connections from a process-wide ConnectionPool.
+
+Use it as the ENGINE of a database and configure the pool with a "POOL" dict in the same
+settings.DATABASES entry (see focunti/settings.py). Django opens a connection for each
+request and closes it when the request finishes (CONN_MAX_AGE = 0): with this backend
+opening checks a connection out of the pool and closing gives it back, so requests skip the
+TCP, authentication and SSL setup and each process never holds more than MAX_SIZE
+connections. Each request context (thread under WSGI, task under ASGI) checks out its own
+connection and returns it at the end of the request, so the pool works the same under ASGI.
+"""
+import psycopg2
+import psycopg2.extras
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base, creation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from psycopg2 import extensions
+
+from employment_portal.db.pool import ConnectionPool, close_pools, get_pool
+from employment_portal.instrumentation import timed_section
+
+POOL_DEFAULTS = {
+    "MAX_SIZE": 10,
+    "TIMEOUT": 30,
+    "HEALTH_CHECK_INTERVAL": 30,
+    "MAX_LIFETIME": 3600,
+    "RESET_QUERY": "DISCARD ALL",
+    "LOG_INTERVAL": 60,
+}
+
+
+class PooledConnection(extensions.connection):
+    """
+    psycopg2 connection accepting the attributes the pool stores on it, such as its creation time.
+    """
+
+
+def open_connection(conn_params: dict, isolation_level=None):
+    """
+    Open a psycopg2 connection the way the PostgreSQL backend of Django does.
+    """
+    connection = psycopg2.connect(**conn_params, connection_factory=PooledConnection)
+    if isolation_level is not None:
+        connection.isolation_level = IsolationLevel(isolation_level)
+    # Same as Django, JSONField decodes the jsonb values itself.
+    psycopg2.extras.register_default_jsonb(conn_or_curs=connection, loads=lambda x: x)
+    return connection
+
+
+def check_connection(connection) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+
+
+def reset_connection(connection, reset_query: str) -> None:
+    if connection.closed:
+        raise ConnectionError("The connection is closed.")
+    if connection.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+        connection.rollback()
+    if reset_query:
+        # DISCARD ALL can't run in a transaction block.
+        autocommit = connection.autocommit
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(reset_query)
+        connection.autocommit = autocommit
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would keep the test database from being dropped.
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_pool(self, conn_params: dict) -> ConnectionPool:
+        options = {**POOL_DEFAULTS, **self.settings_dict.get("POOL", {})}
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        key = (self.alias, tuple(sorted((name, str(value)) for name, value in conn_params.items())))
+        return get_pool(
+            key,
+            lambda: ConnectionPool(
+                connect=lambda: open_connection(conn_params, isolation_level),
+                max_size=options["MAX_SIZE"],
+                timeout=options["TIMEOUT"],
+                health_check_interval=options["HEALTH_CHECK_INTERVAL"],
+                max_lifetime=options["MAX_LIFETIME"],
+                check=check_connection,
+                reset=lambda connection: reset_connection(connection, options["RESET_QUERY"]),
+                log_interval=options["LOG_INTERVAL"],
+                name=f"{self.alias}:{conn_params.get('database') or conn_params.get('dbname')}",
+            ),
+        )
+
+    def get_new_connection(self, conn_params):
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        try:
+            self.isolation_level = IsolationLevel(isolation_level or IsolationLevel.READ_COMMITTED)
+        except ValueError:
+            raise ImproperlyConfigured(f"Invalid transaction isolation level {isolation_level} specified.")
+        self.pool = self.get_pool(conn_params)
+        with timed_section("pool"):
+            return self.pool.checkout()
+
+    def _close(self):
+        if self.connection is not None:
+            self.pool.checkin(self.connection)
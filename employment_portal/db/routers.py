@@ -0,0 +1,245 @@
+"""
+Routing of the reads to the read replicas and of the writes to the primary database.
+
+The replicas are listed in settings.DATABASE_REPLICATION["REPLICAS"], each one being the
+alias of a settings.DATABASES entry that replicates "default". Reads go to the primary instead
+of a replica when:
+- The request already wrote, or runs inside a transaction of the primary.
+- The requester wrote less than STICKY_SECONDS ago, so they always read their own writes.
+- No replica is usable: every replica lags more than MAX_LAG seconds or can't be reached.
+"""
+import asyncio
+import hashlib
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = DEFAULT_DB_ALIAS
+
+STICKY_KEY = "db:primary:{}"
+
+# Seconds of replay the replica is behind, 0 when it replayed everything it received.
+POSTGRESQL_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+# Cache backends local to a process, the pins stored in them aren't seen by the other processes.
+LOCAL_CACHE_BACKENDS = (LocMemCache, DummyCache)
+
+_routing_state = ContextVar("routing_state", default=None)
+
+
+class RoutingState:
+    """
+    Routing state of one request: whether it must read from the primary and whether it wrote.
+    """
+
+    def __init__(self, use_primary: bool = False):
+        self.use_primary = use_primary
+        self.wrote = False
+
+
+def in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def get_replicas() -> list:
+    return settings.DATABASE_REPLICATION["REPLICAS"]
+
+
+def replication_lag_window() -> float:
+    """
+    Seconds a replica may be behind the primary and still serve reads, 0 without replicas.
+    """
+    return settings.DATABASE_REPLICATION["MAX_LAG"] if get_replicas() else 0
+
+
+@contextmanager
+def use_primary():
+    """
+    Send every read of the block to the primary database.
+    """
+    token = _routing_state.set(RoutingState(use_primary=True))
+    try:
+        yield
+    finally:
+        _routing_state.reset(token)
+
+
+class ReplicaLagMonitor:
+    """
+    Measure the replication lag of the replicas, at most once every LAG_CHECK_INTERVAL seconds per replica.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lags = {}
+
+    def measure(self, alias: str):
+        """
+        Return the lag of the replica in seconds, or None when it can't be reached.
+        """
+        connection = connections[alias]
+        try:
+            if connection.vendor != "postgresql":
+                # SQLite and the other stand-ins have no replication to measure.
+                return 0.0
+            with connection.cursor() as cursor:
+                cursor.execute(POSTGRESQL_LAG_QUERY)
+                return float(cursor.fetchone()[0])
+        except Exception:
+            logger.warning("Replica %s can't be reached, reading from the primary.", alias, exc_info=True)
+            return None
+
+    def lag(self, alias: str):
+        now = time.monotonic()
+        with self._lock:
+            checked_at, lag = self._lags.get(alias, (None, None))
+            if checked_at is not None and now - checked_at < settings.DATABASE_REPLICATION["LAG_CHECK_INTERVAL"]:
+                return lag
+            # Other threads keep the previous value while this one measures.
+            self._lags[alias] = (now, lag)
+        if in_event_loop():
+            # Async views route their queries on the event loop, where no query can run: the lag
+            # is measured on a thread and the previous value, None at first, is used meanwhile.
+            threading.Thread(target=self._measure_in_thread, args=(alias, now), daemon=True).start()
+            return lag
+        return self._store(alias, now, self.measure(alias))
+
+    def _store(self, alias: str, checked_at: float, lag):
+        with self._lock:
+            self._lags[alias] = (checked_at, lag)
+        if lag is not None and lag > settings.DATABASE_REPLICATION["MAX_LAG"]:
+            logger.warning("Replica %s lags %.1f seconds, reading from the primary.", alias, lag)
+        return lag
+
+    def _measure_in_thread(self, alias: str, checked_at: float) -> None:
+        try:
+            self._store(alias, checked_at, self.measure(alias))
+        finally:
+            for connection in connections.all(initialized_only=True):
+                connection.close()
+
+    def usable_replicas(self) -> list:
+        max_lag = settings.DATABASE_REPLICATION["MAX_LAG"]
+        return [alias for alias in get_replicas() if (lag := self.lag(alias)) is not None and lag <= max_lag]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._lags.clear()
+
+
+replica_lag_monitor = ReplicaLagMonitor()
+
+
+class PrimaryReplicaRouter:
+    """
+    Database router sending the writes and migrations to the primary and the reads to a random usable replica.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if (state is not None and (state.use_primary or state.wrote)) or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        replicas = replica_lag_monitor.usable_replicas()
+        return random.choice(replicas) if replicas else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {PRIMARY, *get_replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+def requester_key(request) -> str:
+    """
+    Identify the requester by their credentials: the Authorization header, the session cookie or the IP address.
+    """
+    identity = (
+        request.META.get("HTTP_AUTHORIZATION")
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        or request.META.get("REMOTE_ADDR", "")
+    )
+    return STICKY_KEY.format(hashlib.sha256(identity.encode()).hexdigest())
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Read-your-writes consistency for the requests routed by PrimaryReplicaRouter.
+
+    When a request writes, its requester is pinned to the primary for STICKY_SECONDS, long
+    enough for the replicas to catch up: their next requests (e.g. the offer listing after
+    creating an offer or applying to one) read from the primary. The pins are stored in the
+    CACHE_BACKEND cache, which must be shared by the processes of the project: a local memory
+    or dummy cache raises ImproperlyConfigured. The middleware isn't used without replicas.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not get_replicas():
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        alias = settings.DATABASE_REPLICATION["CACHE_BACKEND"]
+        self.cache = caches[alias]
+        if isinstance(self.cache, LOCAL_CACHE_BACKENDS):
+            raise ImproperlyConfigured(
+                f"The '{alias}' cache isn't shared between processes, the replica pins need a shared cache "
+                "(e.g. set CACHE_BACKEND and CACHE_LOCATION to a Redis or Memcached server)."
+            )
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        key = requester_key(request)
+        state = RoutingState(use_primary=bool(self.cache.get(key)))
+        token = _routing_state.set(state)
+        try:
+            return self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+            if state.wrote:
+                self.cache.set(key, True, settings.DATABASE_REPLICATION["STICKY_SECONDS"])
+
+    async def __acall__(self, request):
+        key = requester_key(request)
+        state = RoutingState(use_primary=bool(await self.cache.aget(key)))
+        token = _routing_state.set(state)
+        try:
+            return await self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+            if state.wrote:
+                await self.cache.aset(key, True, settings.DATABASE_REPLICATION["STICKY_SECONDS"])
@@ -0,0 +1,251 @@
+"""
+Near-duplicate offers: offers of the same company whose description and skills are almost the same.
+
+Comparing a new offer with every offer of its company costs O(offers). Instead the MinHash
+signature of the shingles of every offer (the word n-grams of its description and its skills)
+is cut into settings.OFFER_DUPLICATES["BANDS"] bands of "ROWS" values, and each band is stored
+as an OfferSignatureBand row holding a hash of the company and the band values. The offers
+sharing a band with a new offer are found through the index of OfferSignatureBand.bucket and
+confirmed by the Jaccard similarity of their shingles. Two offers whose shingles have a
+Jaccard similarity s share a band with probability 1 - (1 - s ** ROWS) ** BANDS, over 99.9%
+for s = 0.8 with the default 16 bands of 4 rows, and 1% for s = 0.2.
+
+The bands are written by the serializers creating and updating offers and deleted with their
+offer. The views lock the company (see lock_company_offers) around the check and the save, so
+two near-identical offers posted at the same time can't both miss each other.
+rebuild_offer_signatures() indexes the existing offers, and is needed again after changing
+BANDS, ROWS or SHINGLE_SIZE.
+"""
+import hashlib
+import random
+import re
+import struct
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Company, Offer, OfferSignatureBand
+from .skills import parse_skills
+
+WORDS = re.compile(r"\w+")
+
+# Largest Mersenne prime under 2**64, the hash functions are (a * x + b) % MERSENNE_PRIME.
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Seed of the hash function coefficients, changing it requires rebuilding the bands.
+MINHASH_SEED = 1337
+
+# Offers compared with a new offer at most, the oldest ones sharing a band. A company reposting
+# the same offer many times would otherwise make every check compare with all the reposts.
+MAX_CANDIDATES = 100
+
+# Values of an IN clause of find_duplicate_offers(), below the parameter limits of the databases.
+QUERY_CHUNK_SIZE = 5000
+
+FLAG = "flag"
+REJECT = "reject"
+
+
+def offer_shingles(description: str, skills: str) -> set:
+    """
+    Return the shingles of an offer: the lowercase word n-grams of its description and its skills.
+
+    For example with n=3, "Build our Python APIs" and "Python, Django" give
+    {"build our python", "our python apis", "skill:python", "skill:django"}.
+    """
+    size = settings.OFFER_DUPLICATES["SHINGLE_SIZE"]
+    words = WORDS.findall((description or "").lower())
+    shingles = {" ".join(words[start : start + size]) for start in range(max(len(words) - size + 1, 1))}
+    shingles.discard("")
+    return shingles | {f"skill:{name}" for name in parse_skills(skills)}
+
+
+def jaccard(first: set, second: set) -> float:
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+@lru_cache(maxsize=None)
+def _hash_coefficients(count: int) -> tuple:
+    rng = random.Random(MINHASH_SEED)
+    return tuple((rng.randrange(1, MERSENNE_PRIME), rng.randrange(MERSENNE_PRIME)) for _ in range(count))
+
+
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little") % MERSENNE_PRIME
+
+
+def minhash(shingles: set) -> list:
+    """
+    Return the MinHash signature of the shingles, BANDS * ROWS values, or [] without shingles.
+    """
+    if not shingles:
+        return []
+    hashes = [_shingle_hash(shingle) for shingle in shingles]
+    count = settings.OFFER_DUPLICATES["BANDS"] * settings.OFFER_DUPLICATES["ROWS"]
+    return [min((a * value + b) % MERSENNE_PRIME for value in hashes) for a, b in _hash_coefficients(count)]
+
+
+def band_buckets(company_id: int, signature: list) -> list:
+    """
+    Return the bucket of each band of the signature, a signed 64 bits hash of the company, the band and its values.
+    """
+    rows = settings.OFFER_DUPLICATES["ROWS"]
+    band_format = struct.Struct(f"<qq{rows}Q")
+    buckets = []
+    for band in range(len(signature) // rows):
+        packed = band_format.pack(company_id, band, *signature[band * rows : (band + 1) * rows])
+        buckets.append(int.from_bytes(hashlib.blake2b(packed, digest_size=8).digest(), "little", signed=True))
+    return buckets
+
+
+def offer_buckets(company_id: int, description: str, skills: str) -> list:
+    return band_buckets(company_id, minhash(offer_shingles(description, skills)))
+
+
+def find_duplicate_offer(company_id: int, description: str, skills: str, exclude=None, older_than=None):
+    """
+    Return the offer of the company most similar to the description and skills, with one query.
+
+    Only the MAX_CANDIDATES oldest offers sharing a band are compared.
+
+    Parameters:
+    - company_id: The company of the offer.
+    - description, skills: The text of the offer.
+    - exclude: The id of an offer not to compare with, the offer itself when it is updated.
+    - older_than: Only compare with the offers of a smaller id, the ones created before it.
+
+    Returns:
+    - An (offer id, similarity) tuple, the oldest offer on ties, or None when no offer
+        reaches settings.OFFER_DUPLICATES["THRESHOLD"].
+    """
+    shingles = offer_shingles(description, skills)
+    buckets = band_buckets(company_id, minhash(shingles))
+    if not buckets:
+        return None
+    # A subquery rather than a join, so the offers are found from the bucket index and not by
+    # scanning the offers of the company.
+    matching = OfferSignatureBand.objects.filter(bucket__in=buckets).values("offer_id")
+    candidates = Offer.objects.filter(pk__in=matching, company_id=company_id)
+    if exclude is not None:
+        candidates = candidates.exclude(pk=exclude)
+    if older_than is not None:
+        candidates = candidates.filter(pk__lt=older_than)
+    rows = candidates.order_by("pk").values_list("pk", "description", "skills")[:MAX_CANDIDATES]
+    return _most_similar(shingles, ((row[0], offer_shingles(row[1], row[2])) for row in rows))
+
+
+def find_duplicate_offers(offers: list, compare_duplicates: bool = True) -> list:
+    """
+    Batch version of find_duplicate_offer() for new offers, comparing each one with the offers
+    of its company and with the previous offers of the list, with two queries.
+
+    Parameters:
+    - offers: The (company id, description, skills) of each new offer.
+    - compare_duplicates: Whether an offer is compared with the previous offers of the list found
+        to be near-duplicates, False when they won't be created.
+
+    Returns:
+    - For each offer None, an (offer id, None) tuple of the existing offer it nearly duplicates,
+        or a (None, position) tuple of a previous offer of the list. Existing offers come first.
+    """
+    shingles = [offer_shingles(description, skills) for _, description, skills in offers]
+    buckets = [band_buckets(company_id, minhash(item)) for (company_id, _, _), item in zip(offers, shingles)]
+    offer_ids = defaultdict(set)
+    all_buckets = list({bucket for item_buckets in buckets for bucket in item_buckets})
+    for start in range(0, len(all_buckets), QUERY_CHUNK_SIZE):
+        bands = OfferSignatureBand.objects.filter(bucket__in=all_buckets[start : start + QUERY_CHUNK_SIZE])
+        for bucket, offer_id in bands.values_list("bucket", "offer_id"):
+            offer_ids[bucket].add(offer_id)
+    existing = {}
+    all_offer_ids = sorted(set().union(*offer_ids.values()))
+    for start in range(0, len(all_offer_ids), QUERY_CHUNK_SIZE):
+        rows = Offer.objects.filter(pk__in=all_offer_ids[start : start + QUERY_CHUNK_SIZE])
+        for offer_id, company_id, description, skills in rows.values_list("pk", "company_id", "description", "skills"):
+            existing[offer_id] = (company_id, offer_shingles(description, skills))
+
+    previous = defaultdict(list)
+    duplicates = []
+    for position, ((company_id, _, _), item_shingles, item_buckets) in enumerate(zip(offers, shingles, buckets)):
+        candidates = sorted({offer_id for bucket in item_buckets for offer_id in offer_ids.get(bucket, ())})
+        # Bands whose offer was deleted meanwhile have no row.
+        candidates = [offer_id for offer_id in candidates if existing.get(offer_id, (None,))[0] == company_id]
+        candidates = candidates[:MAX_CANDIDATES]
+        best = _most_similar(item_shingles, ((offer_id, existing[offer_id][1]) for offer_id in candidates))
+        if best is not None:
+            duplicates.append((best[0], None))
+        else:
+            earlier = sorted({index for bucket in item_buckets for index in previous[bucket]})
+            earlier = [index for index in earlier if offers[index][0] == company_id][:MAX_CANDIDATES]
+            best = _most_similar(item_shingles, ((index, shingles[index]) for index in earlier))
+            duplicates.append(None if best is None else (None, best[0]))
+        if best is None or compare_duplicates:
+            for bucket in item_buckets:
+                previous[bucket].append(position)
+    return duplicates
+
+
+def _most_similar(shingles: set, candidates) -> tuple:
+    # The first candidate on ties, the oldest one.
+    best = None
+    for key, candidate_shingles in candidates:
+        similarity = jaccard(shingles, candidate_shingles)
+        if similarity >= settings.OFFER_DUPLICATES["THRESHOLD"] and (best is None or similarity > best[1]):
+            best = (key, similarity)
+    return best
+
+
+def lock_company_offers(*company_ids: int) -> None:
+    """
+    Lock the company rows until the current transaction ends, so the duplicate checks and saves of
+    the offers of a company run one after the other. Rows are locked in id order, so concurrent
+    requests locking several companies can't deadlock.
+    """
+    companies = Company.objects.select_for_update().filter(pk__in=company_ids).order_by("pk")
+    list(companies.values_list("pk", flat=True))
+
+
+def index_offer_signatures(offers: list) -> None:
+    """
+    Store the bands of newly created offers, with one query.
+    """
+    OfferSignatureBand.objects.bulk_create(
+        [
+            OfferSignatureBand(offer=offer, bucket=bucket)
+            for offer in offers
+            for bucket in offer_buckets(offer.company_id, offer.description, offer.skills)
+        ],
+        batch_size=1000,
+    )
+
+
+def reindex_offer_signature(offer) -> None:
+    """
+    Replace the bands of an updated offer.
+    """
+    OfferSignatureBand.objects.filter(offer=offer).delete()
+    index_offer_signatures([offer])
+
+
+@transaction.atomic
+def rebuild_offer_signatures(batch_size: int = 1000) -> int:
+    """
+    Replace the bands of every offer, for the offers created before the bands existed or after a change of settings.
+
+    Returns:
+    - The number of indexed offers.
+    """
+    OfferSignatureBand.objects.all().delete()
+    batch = []
+    indexed = 0
+    for offer in Offer.objects.only("company_id", "description", "skills").order_by("pk").iterator(batch_size):
+        batch.append(offer)
+        if len(batch) == batch_size:
+            index_offer_signatures(batch)
+            indexed += len(batch)
+            batch = []
+    index_offer_signatures(batch)
+    return indexed + len(batch)
@@ -0,0 +1,25 @@
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler as drf_exception_handler
+
+from .hashing import HashingBusy
+
+
+class ServiceBusy(APIException):
+    status_code = 503
+    default_detail = "Too many password checks in progress, try again later."
+    default_code = "hashing_busy"
+
+    def __init__(self, wait: int, detail=None, code=None):
+        super().__init__(detail, code)
+        # Sent in the Retry-After header by the DRF exception handler.
+        self.wait = wait
+
+
+def exception_handler(exc, context):
+    """
+    DRF exception handler answering the domain exceptions of the application, e.g. HashingBusy
+    with 503 Service Unavailable and a Retry-After header, and the others as DRF does.
+    """
+    if isinstance(exc, HashingBusy):
+        exc = ServiceBusy(exc.wait)
+    return drf_exception_handler(exc, context)
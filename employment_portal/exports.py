@@ -0,0 +1,74 @@
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+
+# Exported column name and the field path it is read from, joined in the same query.
+POSTULATION_EXPORT_FIELDS = (
+    ("postulation_id", "id"),
+    ("offer_id", "offer_id"),
+    ("offer_title", "offer__title"),
+    ("user_id", "user_id"),
+    ("username", "user__username"),
+    ("first_name", "user__first_name"),
+    ("last_name", "user__last_name"),
+    ("email", "user__email"),
+    ("phone_number", "user__phone_number"),
+)
+
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """
+    File-like object that returns what is written instead of buffering it, for csv.writer.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, fields=POSTULATION_EXPORT_FIELDS):
+    """
+    Iterate the queryset as tuples of the export fields.
+
+    Related fields are read through joins of a single query, and rows are fetched in chunks
+    of EXPORT_CHUNK_SIZE (with a server-side cursor on PostgreSQL) so memory stays flat.
+    """
+    return queryset.values_list(*(path for _, path in fields)).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def stream_csv(rows, fields=POSTULATION_EXPORT_FIELDS):
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in fields])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(rows, fields=POSTULATION_EXPORT_FIELDS):
+    names = [name for name, _ in fields]
+    for row in rows:
+        yield json.dumps(dict(zip(names, row)), ensure_ascii=False) + "\n"
+
+
+def export_response(queryset, export_format: str, filename: str) -> StreamingHttpResponse:
+    """
+    Build a streaming response exporting the queryset as CSV or NDJSON.
+
+    Parameters:
+    - queryset: The queryset to export, ordered as it should be written.
+    - export_format: "csv" or "ndjson".
+    - filename: The name of the downloaded file, without extension.
+
+    Returns:
+    - A StreamingHttpResponse that writes the rows as they are read from the database.
+    """
+    stream = stream_csv if export_format == "csv" else stream_ndjson
+    response = StreamingHttpResponse(stream(export_rows(queryset)), content_type=EXPORT_CONTENT_TYPES[export_format])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{export_format}"'
+    return response
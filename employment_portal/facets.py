@@ -0,0 +1,171 @@
+"""
+Precomputed offer facets: the salary band histogram and the number of offers per company and per skill.
+
+Counting them with GROUP BY over the offers on every page view costs O(offers). Instead the
+OfferFacet table keeps one row per bucket, whose count is changed incrementally by the
+serializers creating and updating offers and when an offer is deleted, so reading the facets
+costs O(buckets). rebuild_offer_facets() recounts every bucket from the offers, after a change
+of settings.OFFER_FACETS["SALARY_BAND_WIDTH"] or to repair counts that drifted.
+"""
+import math
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from django.db.models.functions import Floor
+
+from .models import Company, Offer, OfferFacet, OfferSkill, Skill
+
+
+def salary_band(salary) -> int:
+    return math.floor(salary / settings.OFFER_FACETS["SALARY_BAND_WIDTH"])
+
+
+def skill_facet_keys(skill_ids) -> set:
+    return {(OfferFacet.SKILL, skill_id) for skill_id in skill_ids}
+
+
+def offer_facet_keys(offer, skill_ids) -> set:
+    """
+    Return the (facet, key) buckets the offer with these skills is counted in.
+    """
+    keys = {(OfferFacet.SALARY, salary_band(offer.salary)), (OfferFacet.COMPANY, offer.company_id)}
+    return keys | skill_facet_keys(skill_ids)
+
+
+def get_offer_facet_keys(offer_id: int) -> set:
+    """
+    Return the buckets of an offer as stored, an instance in memory may be stale.
+    """
+    offer = Offer.objects.only("salary", "company_id").filter(pk=offer_id).first()
+    if offer is None:
+        return set()
+    return offer_facet_keys(offer, OfferSkill.objects.filter(offer_id=offer_id).values_list("skill_id", flat=True))
+
+
+def facet_deltas(previous: set, current: set) -> Counter:
+    """
+    Return the count changes of the buckets when an offer moves from the previous buckets to the current ones.
+    """
+    deltas = Counter(current)
+    deltas.subtract(previous)
+    return deltas
+
+
+def change_offer_facets(deltas: Counter) -> None:
+    """
+    Add the deltas to the counts of their (facet, key) buckets, with two queries whatever their number.
+
+    The missing buckets are created with a count of 0 and the counts are then changed with one
+    UPDATE of F() expressions, so concurrent changes don't lose updates.
+    """
+    deltas = {bucket: delta for bucket, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    OfferFacet.objects.bulk_create(
+        [OfferFacet(facet=facet, key=key) for (facet, key), delta in deltas.items() if delta > 0],
+        ignore_conflicts=True,
+    )
+    groups = defaultdict(list)
+    for (facet, key), delta in deltas.items():
+        groups[facet, delta].append(key)
+    conditions = [Q(facet=facet, key__in=keys) for (facet, _), keys in groups.items()]
+    OfferFacet.objects.filter(Q(*conditions, _connector=Q.OR)).update(
+        offer_count=F("offer_count")
+        + Case(
+            *[When(condition, then=Value(delta)) for condition, (_, delta) in zip(conditions, groups)],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    )
+
+
+def count_offer_facets() -> Counter:
+    """
+    Count the offers of every bucket with GROUP BY, in O(offers).
+    """
+    width = settings.OFFER_FACETS["SALARY_BAND_WIDTH"]
+    counts = Counter()
+    bands = Offer.objects.annotate(band=Floor(F("salary") / width)).order_by().values_list("band")
+    for band, total in bands.annotate(total=Count("id")):
+        counts[OfferFacet.SALARY, int(band)] += total
+    for company_id, total in Offer.objects.order_by().values_list("company_id").annotate(total=Count("id")):
+        counts[OfferFacet.COMPANY, company_id] = total
+    for skill_id, total in OfferSkill.objects.order_by().values_list("skill_id").annotate(total=Count("id")):
+        counts[OfferFacet.SKILL, skill_id] = total
+    return counts
+
+
+def company_offer_facet_deltas(company_id: int) -> Counter:
+    """
+    Return the count changes of the buckets when every offer of the company is deleted, with one
+    GROUP BY over its offers and one over their skills instead of two queries per offer.
+    """
+    width = settings.OFFER_FACETS["SALARY_BAND_WIDTH"]
+    deltas = Counter()
+    offers = Offer.objects.filter(company_id=company_id).order_by()
+    for band, total in offers.annotate(band=Floor(F("salary") / width)).values_list("band").annotate(total=Count("id")):
+        deltas[OfferFacet.SALARY, int(band)] -= total
+        deltas[OfferFacet.COMPANY, company_id] -= total
+    skills = OfferSkill.objects.filter(offer__company_id=company_id).order_by().values_list("skill_id")
+    for skill_id, total in skills.annotate(total=Count("id")):
+        deltas[OfferFacet.SKILL, skill_id] -= total
+    return deltas
+
+
+@transaction.atomic
+def rebuild_offer_facets() -> int:
+    """
+    Recount every bucket from the offers and fix the stored ones that drifted.
+
+    Returns:
+    - The number of created, updated and deleted buckets.
+    """
+    counts = count_offer_facets()
+    stored = {
+        (facet, key): (pk, count)
+        for pk, facet, key, count in OfferFacet.objects.values_list("pk", "facet", "key", "offer_count")
+    }
+    created = [
+        OfferFacet(facet=facet, key=key, offer_count=count)
+        for (facet, key), count in counts.items()
+        if (facet, key) not in stored
+    ]
+    drifted = [
+        OfferFacet(pk=pk, offer_count=counts[bucket])
+        for bucket, (pk, count) in stored.items()
+        if bucket in counts and counts[bucket] != count
+    ]
+    stale = [pk for bucket, (pk, _) in stored.items() if bucket not in counts]
+    OfferFacet.objects.bulk_create(created, batch_size=1000)
+    OfferFacet.objects.bulk_update(drifted, ["offer_count"], batch_size=1000)
+    OfferFacet.objects.filter(pk__in=stale).delete()
+    return len(created) + len(drifted) + len(stale)
+
+
+def get_offer_facets(limit: int) -> dict:
+    """
+    Read the facets from the stored buckets, with three queries.
+
+    Returns:
+    - A dict with the salary bands in order, and the 'limit' companies and skills with the most offers.
+    """
+    buckets = defaultdict(list)
+    for facet, key, count in OfferFacet.objects.filter(offer_count__gt=0).values_list("facet", "key", "offer_count"):
+        buckets[facet].append((key, count))
+
+    def top(facet, model):
+        most = sorted(buckets[facet], key=lambda bucket: (-bucket[1], bucket[0]))[:limit]
+        names = dict(model.objects.filter(pk__in=[key for key, _ in most]).values_list("pk", "name"))
+        return [{"id": key, "name": names[key], "count": count} for key, count in most if key in names]
+
+    width = settings.OFFER_FACETS["SALARY_BAND_WIDTH"]
+    return {
+        "salary": [
+            {"min": band * width, "max": (band + 1) * width, "count": count}
+            for band, count in sorted(buckets[OfferFacet.SALARY])
+        ],
+        "companies": top(OfferFacet.COMPANY, Company),
+        "skills": top(OfferFacet.SKILL, Skill),
+    }
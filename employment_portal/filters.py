@@ -0,0 +1,16 @@
+from .skills import filter_offers_by_skills
+
+
+def filter_offers(queryset, params: dict):
+    """
+    Apply the offer listing filters validated by OfferFilterSerializer to an Offer queryset.
+    """
+    if "company" in params:
+        queryset = queryset.filter(company_id=params["company"])
+    if "salary_min" in params:
+        queryset = queryset.filter(salary__gte=params["salary_min"])
+    if "salary_max" in params:
+        queryset = queryset.filter(salary__lte=params["salary_max"])
+    if params.get("skills"):
+        queryset = filter_offers_by_skills(queryset, params["skills"], params["skills_match"])
+    return queryset
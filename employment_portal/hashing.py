@@ -0,0 +1,260 @@
+"""
+Password hashing on a bounded pool of worker threads.
+
+Hashing a password (PBKDF2 by default) is deliberately slow and CPU bound. The login and
+registration endpoints run it here instead of on the request thread (see
+ApplicantUserLoginSerializer and ApplicantUserSerializer): at most MAX_WORKERS hashes run at the
+same time and MAX_QUEUE more wait for a worker, so a burst of logins or registrations can't make
+every request thread of every process compete for the CPU. A request that finds the queue full
+waits up to QUEUE_TIMEOUT seconds for a place, after which HashingBusy is raised: the DRF
+exception handler (see exceptions.py) answers it with 503 Service Unavailable and a Retry-After
+header. ApplicantUser.set_password() and check_password() are left to Django, so the admin,
+createsuperuser, changepassword and the other callers hash inline and never wait for the pool.
+Async callers await the hash with arun() and averify_password() instead of blocking the event
+loop. The hashers of django.contrib.auth (PBKDF2 through OpenSSL, bcrypt, Argon2) release the
+GIL, so the threads hash in parallel.
+
+When the hasher parameters change (PASSWORD_HASHERS, iterations), Django rehashes the password
+of a user on their next login, on the request thread. Here the rehash is opportunistic: it
+runs in the background only when a worker is idle, and is otherwise left to a later login.
+"""
+import asyncio
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, is_password_usable, make_password
+from django.db import connections
+
+
+class HashingBusy(Exception):
+    """
+    Raised when the queue of the hashing executor stays full, 'wait' is the number of seconds
+    after which a place is expected to be free.
+    """
+
+    def __init__(self, wait: float):
+        self.wait = max(1, math.ceil(wait))
+        super().__init__(f"Too many password checks in progress, try again in {self.wait} seconds.")
+
+
+class HashingStats:
+    """
+    Counters of a hashing executor since the process started.
+    """
+
+    def __init__(self):
+        self.hashed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.rehash_skipped = 0
+
+    def as_dict(self) -> dict:
+        return dict(vars(self))
+
+
+class HashingExecutor:
+    """
+    Thread pool running password hashes, with a bounded queue.
+
+    Attributes:
+    - max_workers (int): Hashes running at the same time.
+    - max_queue (int): Hashes waiting for a worker, beyond them run() waits or fails.
+    - queue_timeout (float): Seconds run() waits for a place in the queue before raising HashingBusy.
+    - stats (HashingStats): The counters of the executor.
+
+    Methods:
+    - run(func, *args): Runs func(*args) on a worker and returns its result.
+    - arun(func, *args): Async version of run(), the event loop isn't blocked while it waits.
+    - submit_if_idle(func, *args): Runs func(*args) in the background if a worker is idle.
+    - pending(): Returns the number of hashes running or queued.
+    - shutdown(wait): Stops the workers.
+
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, queue_timeout: float):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.stats = HashingStats()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="password-hashing")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def pending(self) -> int:
+        return self._pending
+
+    def _acquire(self, timeout: float) -> bool:
+        if not self._slots.acquire(timeout=timeout):
+            return False
+        with self._lock:
+            self._pending += 1
+        return True
+
+    def _release(self, future=None) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def _reject(self) -> HashingBusy:
+        self.stats.rejected += 1
+        # A place frees up once the running hashes are done.
+        return HashingBusy(self.queue_timeout or 1)
+
+    def _submit(self, func, *args):
+        # The caller holds a place, it is given back when the future is done.
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        self.stats.hashed += 1
+        return future
+
+    def run(self, func, *args):
+        if not self._acquire(self.queue_timeout):
+            raise self._reject()
+        return self._submit(func, *args).result()
+
+    async def arun(self, func, *args):
+        # Only a full queue is waited for on a thread, the hash itself is awaited on the loop.
+        if not self._acquire(0):
+            if not await sync_to_async(self._acquire, thread_sensitive=False)(self.queue_timeout):
+                raise self._reject()
+        return await asyncio.wrap_future(self._submit(func, *args))
+
+    def submit_if_idle(self, func, *args):
+        """
+        Run func(*args) in the background and return its future, or None when no worker is idle.
+        """
+        with self._lock:
+            idle = self._pending < self.max_workers
+        if not idle or not self._acquire(0):
+            return None
+        future = self._executor.submit(func, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_hashing_executor():
+    """
+    Return the executor configured in settings.PASSWORD_HASHING, None when it is disabled.
+    """
+    global _executor
+    config = settings.PASSWORD_HASHING
+    if not config["ENABLED"]:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = HashingExecutor(
+                    config["MAX_WORKERS"] or os.cpu_count() or 1, config["MAX_QUEUE"], config["QUEUE_TIMEOUT"]
+                )
+    return _executor
+
+
+def reset_hashing_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+
+def hash_password(raw_password) -> str:
+    """
+    make_password() on the hashing executor, None gives an unusable password without hashing.
+    """
+    executor = get_hashing_executor()
+    if executor is None or raw_password is None:
+        return make_password(raw_password)
+    return executor.run(make_password, raw_password)
+
+
+def verify_password(raw_password, user) -> bool:
+    """
+    Check the raw password against the one of the user on the hashing executor.
+
+    When the stored hash is outdated, the user is rehashed in the background (see schedule_rehash).
+    """
+    encoded = user.password
+    executor = get_hashing_executor()
+    if executor is None:
+        # The inline behaviour of AbstractBaseUser.check_password().
+        def setter(raw_password):
+            user.password = make_password(raw_password)
+            user.save(update_fields=["password"])
+
+        return check_password(raw_password, encoded, setter)
+    if raw_password is None or not is_password_usable(encoded):
+        return False
+    outdated = []
+    if not executor.run(check_password, raw_password, encoded, outdated.append):
+        return False
+    if outdated and settings.PASSWORD_HASHING["REHASH"]:
+        schedule_rehash(type(user), user.pk, encoded, raw_password)
+    return True
+
+
+async def averify_password(raw_password, user) -> bool:
+    """
+    Async version of verify_password(), the password is checked without blocking the event loop.
+    """
+    encoded = user.password
+    executor = get_hashing_executor()
+    if executor is None:
+        # The inline check may save the rehashed password.
+        return await sync_to_async(verify_password)(raw_password, user)
+    if raw_password is None or not is_password_usable(encoded):
+        return False
+    outdated = []
+    if not await executor.arun(check_password, raw_password, encoded, outdated.append):
+        return False
+    if outdated and settings.PASSWORD_HASHING["REHASH"]:
+        schedule_rehash(type(user), user.pk, encoded, raw_password)
+    return True
+
+
+def schedule_rehash(model, pk, encoded: str, raw_password: str) -> bool:
+    """
+    Rehash the password of a user in the background if a hashing worker is idle.
+
+    Returns False when the rehash was skipped, the next login of the user tries again.
+    """
+    executor = get_hashing_executor()
+    if executor is None:
+        return False
+    if executor.submit_if_idle(_run_rehash, executor.stats, model, pk, encoded, raw_password) is None:
+        executor.stats.rehash_skipped += 1
+        return False
+    return True
+
+
+def rehash_password(model, pk, encoded: str, raw_password: str) -> bool:
+    """
+    Store a new hash of the password, unless it was changed since 'encoded' was read.
+    """
+    updated = model._default_manager.filter(pk=pk, password=encoded).update(password=make_password(raw_password))
+    return updated == 1
+
+
+def _run_rehash(stats: HashingStats, model, pk, encoded: str, raw_password: str) -> None:
+    try:
+        if rehash_password(model, pk, encoded, raw_password):
+            stats.rehashed += 1
+    finally:
+        # The worker threads outlive the request, don't leave their connections open.
+        for connection in connections.all(initialized_only=True):
+            connection.close()
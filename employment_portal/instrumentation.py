@@ -0,0 +1,167 @@
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+_current_metrics = ContextVar("request_metrics", default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestMetrics:
+    """
+    Counters of one request: number of queries, database time and time of named sections.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.sections = {}
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+    @property
+    def total_time(self) -> float:
+        return time.perf_counter() - self.started_at
+
+
+def get_request_metrics():
+    """
+    Return the metrics of the request being handled, or None outside of RequestMetricsMiddleware.
+    """
+    return _current_metrics.get()
+
+
+@contextmanager
+def timed_section(name: str):
+    """
+    Add the time spent in the block to the named section of the current request metrics.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.sections[name] = metrics.sections.get(name, 0.0) + time.perf_counter() - start
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin that adds the time spent building 'data' to the "serializer" section.
+    """
+
+    @property
+    def data(self):
+        with timed_section("serializer"):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+def get_query_budget(view_func):
+    view_class = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+    return getattr(view_class, "query_budget", None)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record the queries, database time and serializer time of every request.
+
+    The metrics are returned in a Server-Timing header and logged by the
+    'employment_portal.instrumentation' logger. Views can declare a 'query_budget', the
+    maximum number of queries a request may run; exceeding it logs a warning, or raises
+    QueryBudgetExceeded when settings.QUERY_BUDGET_ENFORCE is True (always in the tests, see
+    QueryBudgetTestRunner).
+    Queries of streamed responses run after the view returns and aren't counted. The middleware
+    is sync and async capable, so it doesn't force async views of an ASGI stack into a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            with self.record_queries(metrics):
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.process_metrics(request, response, metrics)
+
+    async def __acall__(self, request):
+        # Under ASGI the async ORM runs its queries in a thread that shares the connections of
+        # this context, so they are recorded by the same wrappers.
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        try:
+            with self.record_queries(metrics):
+                response = await self.get_response(request)
+        finally:
+            _current_metrics.reset(token)
+        return self.process_metrics(request, response, metrics)
+
+    @contextmanager
+    def record_queries(self, metrics: RequestMetrics):
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(metrics.record_query))
+            yield
+
+    def process_metrics(self, request, response, metrics: RequestMetrics):
+        response["Server-Timing"] = self.server_timing(metrics)
+        self.log(request, response, metrics)
+        resolver_match = getattr(request, "resolver_match", None)
+        budget = get_query_budget(resolver_match.func) if resolver_match else None
+        if budget is not None and metrics.queries > budget:
+            message = f"{request.method} {request.path} ran {metrics.queries} queries, its budget is {budget}."
+            if settings.QUERY_BUDGET_ENFORCE:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def server_timing(self, metrics: RequestMetrics) -> str:
+        entries = [f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"']
+        entries += [f"{name};dur={duration * 1000:.2f}" for name, duration in metrics.sections.items()]
+        entries.append(f"total;dur={metrics.total_time * 1000:.2f}")
+        return ", ".join(entries)
+
+    def log(self, request, response, metrics: RequestMetrics) -> None:
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": metrics.queries,
+            "db_ms": round(metrics.db_time * 1000, 2),
+            **{f"{name}_ms": round(duration * 1000, 2) for name, duration in metrics.sections.items()},
+            "total_ms": round(metrics.total_time * 1000, 2),
+        }
+        logger.info(" ".join(f"{key}={value}" for key, value in fields.items()), extra={"request_metrics": fields})
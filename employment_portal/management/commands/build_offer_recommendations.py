@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from employment_portal.recommendations import build_offer_index
+
+
+class Command(BaseCommand):
+    help = "Vectorize every offer and write the inverted index mapped by the offer recommendation view."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Path of the index, settings.OFFER_RECOMMENDATIONS['PATH'] by default.")
+
+    def handle(self, *args, **options):
+        path = options["output"] or settings.OFFER_RECOMMENDATIONS["PATH"]
+        header = build_offer_index(path)
+        self.stdout.write(
+            f"Wrote the index of {header['offers']} offers, {len(header['terms'])} terms "
+            f"and {header['postings']} postings to {path}."
+        )
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from employment_portal.openapi import FINGERPRINT_FIELD, generate_schema, write_schema
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema once and write it to the artifact served by the schema views."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Path of the schema, settings.OPENAPI_SCHEMA['PATH'] by default.")
+
+    def handle(self, *args, **options):
+        path = options["output"] or settings.OPENAPI_SCHEMA["PATH"]
+        schema = generate_schema()
+        write_schema(path, schema)
+        self.stdout.write(f"Wrote the OpenAPI schema of {len(schema['paths'])} paths to {path}.")
+        self.stdout.write(f"URL conf fingerprint: {schema[FINGERPRINT_FIELD]}")
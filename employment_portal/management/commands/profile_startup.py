@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from employment_portal.startup import profile_startup
+
+PHASES = ("interpreter", "setup", "application", "first_request", "total", "second_request")
+
+
+class Command(BaseCommand):
+    help = "Profile the cold start of a worker: import cost per module and time to the first response."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--app", choices=["wsgi", "asgi"], default="wsgi", help="Application to start.")
+        parser.add_argument("--path", default="/api/offers/", help="Path of the first request.")
+        parser.add_argument("--top", type=int, default=20, help="Number of packages and modules listed.")
+
+    def handle(self, *args, **options):
+        profile = profile_startup(options["app"], options["path"])
+        self.stdout.write(f"Cold start of focunti.{options['app']}, first request GET {options['path']}:")
+        for phase in PHASES:
+            self.stdout.write(f"  {phase:<16}{profile[phase] * 1000:>10.1f} ms")
+        self.stdout.write(f"  {'status':<16}{profile['status']:>10}")
+
+        self.stdout.write("\nImport time by package (self time of its modules):")
+        for package, seconds in list(profile["packages"].items())[: options["top"]]:
+            self.stdout.write(f"  {seconds * 1000:>8.1f} ms  {package}")
+
+        self.stdout.write("\nSlowest top-level imports (including what they import):")
+        imports = sorted((item for item in profile["imports"] if item[3] == 0), key=lambda item: item[2], reverse=True)
+        for module, _, cumulative, _ in imports[: options["top"]]:
+            self.stdout.write(f"  {cumulative * 1000:>8.1f} ms  {module}")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from employment_portal.facets import rebuild_offer_facets
+
+
+class Command(BaseCommand):
+    help = "Recount the offer facets (salary bands, companies, skills) from the offers and fix the drifted buckets."
+
+    def handle(self, *args, **options):
+        fixed = rebuild_offer_facets()
+        self.stdout.write(f"Fixed {fixed} facet buckets.")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from employment_portal.duplicates import rebuild_offer_signatures
+
+
+class Command(BaseCommand):
+    help = "Index the MinHash signature bands of every offer, used to find near-duplicate offers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Offers read and indexed per batch.")
+
+    def handle(self, *args, **options):
+        indexed = rebuild_offer_signatures(options["batch_size"])
+        self.stdout.write(f"Indexed the signature bands of {indexed} offers.")
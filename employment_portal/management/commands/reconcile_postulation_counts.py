@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from employment_portal.counters import reconcile_postulation_counts
+
+
+class Command(BaseCommand):
+    help = "Repair the denormalized postulation counters of offers and companies in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows compared per batch.")
+
+    def handle(self, *args, **options):
+        offers, companies = reconcile_postulation_counts(options["batch_size"])
+        self.stdout.write(f"Fixed {offers} offers and {companies} companies.")
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from employment_portal.outbox import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Send the queued emails of the outbox in batches over a reused mail server connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, help="Emails sent per batch.")
+        parser.add_argument("--loop", action="store_true", help="Keep polling the outbox instead of exiting.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds to wait when the outbox is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_queued_emails(options["batch_size"])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} emails, {failed} failed.")
+            if not options["loop"]:
+                return
+            if not sent and not failed:
+                time.sleep(options["interval"])
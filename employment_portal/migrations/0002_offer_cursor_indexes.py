@@ -0,0 +1,21 @@
+# Generated by Django 4.2.3 on 2026-10-18 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employment_portal', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['created_at', 'id'], name='offer_created_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['company', 'created_at', 'id'], name='offer_company_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.3 on 2026-10-18 07:20
+
+from django.conf import settings
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    config = settings.OFFER_SEARCH_CONFIG
+    schema_editor.execute(
+        "UPDATE employment_portal_offer SET search_vector = "
+        "setweight(to_tsvector(%s::regconfig, coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector(%s::regconfig, coalesce(skills, '')), 'B') || "
+        "setweight(to_tsvector(%s::regconfig, coalesce(description, '')), 'C')",
+        params=[config, config, config],
+    )
+    schema_editor.execute(
+        "CREATE INDEX offer_search_vector_gin ON employment_portal_offer USING gin (search_vector)"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS offer_search_vector_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employment_portal', '0002_offer_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
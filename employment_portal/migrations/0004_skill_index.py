@@ -0,0 +1,38 @@
+# Generated by Django 4.2.3 on 2026-10-18 07:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employment_portal', '0003_offer_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OfferSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offer_skills', to='employment_portal.offer')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offer_skills', to='employment_portal.skill')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='skill_set',
+            field=models.ManyToManyField(blank=True, related_name='offers', through='employment_portal.OfferSkill', to='employment_portal.skill'),
+        ),
+        migrations.AddConstraint(
+            model_name='offerskill',
+            constraint=models.UniqueConstraint(fields=('skill', 'offer'), name='unique_offer_skill'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+import re
+
+from django.db import migrations
+
+SKILL_SEPARATORS = re.compile(r"[,;\n|]+")
+
+
+def parse_skills(text):
+    names = []
+    for part in SKILL_SEPARATORS.split(text or ""):
+        name = " ".join(part.split()).lower()[:100]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def populate_offer_skills(apps, schema_editor):
+    Offer = apps.get_model("employment_portal", "Offer")
+    Skill = apps.get_model("employment_portal", "Skill")
+    OfferSkill = apps.get_model("employment_portal", "OfferSkill")
+
+    skill_ids = {}
+    offer_skills = []
+    for offer_id, skills in Offer.objects.values_list("id", "skills").iterator(chunk_size=2000):
+        for name in parse_skills(skills):
+            if name not in skill_ids:
+                skill_ids[name] = Skill.objects.get_or_create(name=name)[0].id
+            offer_skills.append(OfferSkill(offer_id=offer_id, skill_id=skill_ids[name]))
+        if len(offer_skills) >= 2000:
+            OfferSkill.objects.bulk_create(offer_skills, ignore_conflicts=True)
+            offer_skills = []
+    OfferSkill.objects.bulk_create(offer_skills, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employment_portal', '0004_skill_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_offer_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.3 on 2026-10-18 07:31
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_postulation_counts(apps, schema_editor):
+    Company = apps.get_model("employment_portal", "Company")
+    Offer = apps.get_model("employment_portal", "Offer")
+    Postulation = apps.get_model("employment_portal", "Postulation")
+
+    offer_counts = (
+        Postulation.objects.filter(offer=OuterRef("pk")).order_by().values("offer").annotate(total=Count("id")).values("total")
+    )
+    Offer.objects.update(postulation_count=Coalesce(Subquery(offer_counts), 0))
+    company_counts = (
+        Postulation.objects.filter(offer__company=OuterRef("pk"))
+        .order_by()
+        .values("offer__company")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    Company.objects.update(postulation_count=Coalesce(Subquery(company_counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employment_portal', '0006_outbox_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='postulation_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='offer',
+            name='postulation_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_postulation_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.3 on 2026-10-18 08:37
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import Floor
+
+
+def populate_offer_facets(apps, schema_editor):
+    Offer = apps.get_model("employment_portal", "Offer")
+    OfferSkill = apps.get_model("employment_portal", "OfferSkill")
+    OfferFacet = apps.get_model("employment_portal", "OfferFacet")
+
+    counts = {}
+    width = settings.OFFER_FACETS["SALARY_BAND_WIDTH"]
+    bands = Offer.objects.annotate(band=Floor(F("salary") / width)).order_by().values_list("band")
+    for band, total in bands.annotate(total=Count("id")):
+        counts["salary", int(band)] = counts.get(("salary", int(band)), 0) + total
+    for company_id, total in Offer.objects.order_by().values_list("company_id").annotate(total=Count("id")):
+        counts["company", company_id] = total
+    for skill_id, total in OfferSkill.objects.order_by().values_list("skill_id").annotate(total=Count("id")):
+        counts["skill", skill_id] = total
+    OfferFacet.objects.bulk_create(
+        [OfferFacet(facet=facet, key=key, offer_count=total) for (facet, key), total in counts.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employment_portal', '0007_postulation_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('salary', 'Salary band'), ('company', 'Company'), ('skill', 'Skill')], max_length=10)),
+                ('key', models.BigIntegerField()),
+                ('offer_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='offerfacet',
+            constraint=models.UniqueConstraint(fields=('facet', 'key'), name='unique_offer_facet'),
+        ),
+        migrations.RunPython(populate_offer_facets, migrations.RunPython.noop),
+    ]
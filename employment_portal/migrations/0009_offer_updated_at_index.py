@@ -0,0 +1,17 @@
+# Generated by Django 4.2.3 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employment_portal', '0008_offer_facets'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='offer',
+            index=models.Index(fields=['updated_at'], name='offer_updated_at_idx'),
+        ),
+    ]
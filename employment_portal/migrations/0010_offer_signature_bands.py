@@ -0,0 +1,27 @@
+# Generated by Django 4.2.3 on 2026-10-18 09:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employment_portal', '0009_offer_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offer',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='employment_portal.offer'),
+        ),
+        migrations.CreateModel(
+            name='OfferSignatureBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(db_index=True)),
+                ('offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='signature_bands', to='employment_portal.offer')),
+            ],
+        ),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser, Permission, Group
 
 
@@ -18,6 +20,15 @@ class ApplicantUser(AbstractUser):
 class Company(models.Model):
     name = models.CharField(max_length=100)
     nit = models.CharField(max_length=20, unique=True)
+    # Denormalized number of postulations to the offers of the company, see counters.py.
+    postulation_count = models.PositiveIntegerField(default=0, editable=False)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Skill(models.Model):
+    name = models.CharField(max_length=100, unique=True)
 
     def __str__(self) -> str:
         return self.name
@@ -29,16 +40,118 @@ class Offer(models.Model):
     salary = models.DecimalField(max_digits=10, decimal_places=2)
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="offers")
     skills = models.TextField()
+    # Normalized copy of the free-text skills, kept in sync by OfferSerializer (see skills.py).
+    skill_set = models.ManyToManyField(Skill, through="OfferSkill", related_name="offers", blank=True)
+    # Denormalized number of postulations to the offer, see counters.py.
+    postulation_count = models.PositiveIntegerField(default=0, editable=False)
+    # Older offer of the same company this one nearly duplicates when it was created (see duplicates.py).
+    duplicate_of = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.SET_NULL, related_name="duplicates", editable=False
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Weighted title > skills > description vector, only filled on PostgreSQL (see search.py).
+    # Its GIN index is created by migration 0003 on PostgreSQL only, so it is not declared in Meta.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="offer_created_at_id_idx"),
+            models.Index(fields=["company", "created_at", "id"], name="offer_company_created_id_idx"),
+            # Offers changed since the recommendation index was built (see recommendations.py).
+            models.Index(fields=["updated_at"], name="offer_updated_at_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.title
 
 
+class OfferSkill(models.Model):
+    offer = models.ForeignKey(Offer, on_delete=models.CASCADE, related_name="offer_skills")
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="offer_skills")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["skill", "offer"], name="unique_offer_skill"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.offer_id} - {self.skill_id}"
+
+
+class OfferSignatureBand(models.Model):
+    """
+    Hash of the company and of a band of the MinHash signature of an offer, kept up to date by duplicates.py.
+    """
+
+    offer = models.ForeignKey(Offer, on_delete=models.CASCADE, related_name="signature_bands")
+    bucket = models.BigIntegerField(db_index=True)
+
+    def __str__(self) -> str:
+        return f"{self.offer_id} - {self.bucket}"
+
+
+class OfferFacet(models.Model):
+    """
+    Number of offers in a salary band, of a company or requiring a skill, kept up to date by facets.py.
+    """
+
+    SALARY = "salary"
+    COMPANY = "company"
+    SKILL = "skill"
+    FACET_CHOICES = [(SALARY, "Salary band"), (COMPANY, "Company"), (SKILL, "Skill")]
+
+    facet = models.CharField(max_length=10, choices=FACET_CHOICES)
+    # The salary band index (salary // band width), the company id or the skill id.
+    key = models.BigIntegerField()
+    offer_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["facet", "key"], name="unique_offer_facet"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.facet} {self.key}: {self.offer_count}"
+
+
 class Postulation(models.Model):
     user = models.ForeignKey(ApplicantUser, on_delete=models.CASCADE, related_name="postulations")
     offer = models.ForeignKey(Offer, on_delete=models.CASCADE, related_name="postulations")
 
     def __str__(self) -> str:
         return f"{self.user.username} - {self.offer.title}"
+
+    def delete(self, *args, **kwargs):
+        # Not a delete signal, which would slow down the cascade deletions (see counters.py).
+        from .counters import subtract_postulations
+
+        with transaction.atomic():
+            subtract_postulations(Postulation.objects.filter(pk=self.pk))
+            return super().delete(*args, **kwargs)
+
+
+class OutboxEmail(models.Model):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (SENT, "Sent"), (FAILED, "Failed")]
+
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipient_list = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_status_next_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.subject} - {self.status}"
@@ -0,0 +1,180 @@
+"""
+OpenAPI schema of the API, generated once instead of on every request.
+
+drf_yasg introspects every view and serializer each time the schema is requested. Here the
+schema is built once, by the build_openapi_schema management command at deploy time (written
+to settings.OPENAPI_SCHEMA["PATH"]) or on the first request when there is no artifact, and
+kept in memory with its JSON and YAML renderings. The schema records a fingerprint of the URL
+conf it was built from; when the URL conf changes, a stale artifact or in-memory copy is
+rebuilt.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.urls import URLPattern, URLResolver, get_resolver
+from drf_yasg import openapi
+from drf_yasg.codecs import yaml_sane_dump
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.renderers import _SpecRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+logger = logging.getLogger(__name__)
+
+API_INFO = openapi.Info(
+    title="Your API",
+    default_version="v1",
+    description="Your API description",
+    terms_of_service="https://www.yourapp.com/terms/",
+    contact=openapi.Contact(email="contact@yourapp.com"),
+    license=openapi.License(name="Your License"),
+)
+
+# Vendor extension of the schema holding the fingerprint of the URL conf it was built from.
+FINGERPRINT_FIELD = "x-urlconf-fingerprint"
+
+
+def _describe_patterns(patterns, prefix: str = ""):
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from _describe_patterns(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern):
+            callback = pattern.callback
+            view_class = getattr(callback, "cls", None) or getattr(callback, "view_class", None) or callback
+            serializer_class = getattr(view_class, "serializer_class", None)
+            yield f"{route} {view_class.__module__}.{view_class.__qualname__} {serializer_class!r}"
+
+
+def urlconf_fingerprint(urlconf=None) -> str:
+    """
+    Hash of the routes of the URL conf with their views and serializers.
+    """
+    described = "\n".join(_describe_patterns(get_resolver(urlconf).url_patterns))
+    return hashlib.sha256(described.encode()).hexdigest()[:32]
+
+
+def generate_schema() -> OrderedDict:
+    """
+    Introspect the views and return the schema, as served to anonymous users.
+
+    The schema is built without a request, so it has no "host" and clients use the host it
+    was downloaded from.
+    """
+    generator = OpenAPISchemaGenerator(API_INFO, version="")
+    schema = generator.get_schema(request=None, public=True).as_odict()
+    schema[FINGERPRINT_FIELD] = urlconf_fingerprint()
+    return schema
+
+
+def write_schema(path, schema: OrderedDict) -> None:
+    """
+    Write the schema as JSON, atomically so the serving processes never read a partial file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "w", encoding="utf-8") as artifact:
+        json.dump(schema, artifact, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def read_schema(path):
+    try:
+        with open(path, encoding="utf-8") as artifact:
+            return json.load(artifact, object_pairs_hook=OrderedDict)
+    except FileNotFoundError:
+        return None
+
+
+class SchemaCache:
+    """
+    Schema of the process with its renderings by format, rebuilt when the URL conf changes.
+
+    Methods:
+    - get_schema(): Returns the schema, from the cache, the artifact or the generator.
+    - render(format): Returns the schema rendered as ".json", ".yaml" or "openapi".
+    - clear(): Forgets the schema.
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._schema = None
+        self._renderings = {}
+
+    def get_schema(self) -> OrderedDict:
+        return self._current()[0]
+
+    def _current(self) -> tuple:
+        fingerprint = urlconf_fingerprint()
+        with self._lock:
+            if self._schema is None or self._schema[FINGERPRINT_FIELD] != fingerprint:
+                self._schema = self._load(fingerprint)
+                self._renderings = {}
+            # A schema and its renderings are replaced together, never mixed.
+            return self._schema, self._renderings
+
+    def _load(self, fingerprint: str) -> OrderedDict:
+        path = settings.OPENAPI_SCHEMA["PATH"]
+        schema = read_schema(path) if path else None
+        if schema is not None and schema.get(FINGERPRINT_FIELD) == fingerprint:
+            return schema
+        if schema is not None:
+            logger.warning("The OpenAPI schema %s doesn't match the URL conf, it is generated again.", path)
+        return generate_schema()
+
+    def render(self, format: str) -> bytes:
+        schema, renderings = self._current()
+        rendering = renderings.get(format)
+        if rendering is None:
+            if format == ".yaml":
+                rendering = yaml_sane_dump(schema, binary=True)
+            else:
+                rendering = json.dumps(schema, ensure_ascii=False).encode()
+            renderings[format] = rendering
+        return rendering
+
+    def clear(self) -> None:
+        with self._lock:
+            self._schema = None
+            self._renderings = {}
+
+
+schema_cache = SchemaCache()
+
+
+@receiver(setting_changed)
+def clear_schema_cache(*, setting, **kwargs):
+    if setting in ("ROOT_URLCONF", "OPENAPI_SCHEMA"):
+        schema_cache.clear()
+
+
+_SchemaView = get_schema_view(API_INFO, public=True, permission_classes=(permissions.AllowAny,))
+
+
+class SchemaView(_SchemaView):
+    """
+    drf_yasg schema view serving the schema of schema_cache.
+
+    Supported HTTP methods:
+    - GET: Returns the schema in JSON or YAML, or the Swagger UI and ReDoc pages. The pages
+        are rendered by drf_yasg, they load the schema from the same URL with ?format=openapi.
+
+    """
+
+    def get(self, request, version="", format=None):
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, _SpecRenderer):
+            return super().get(request, version, format)
+        return HttpResponse(schema_cache.render(renderer.format), content_type=renderer.media_type)
@@ -0,0 +1,115 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(subject: str, message: str, from_email: str, recipient_list: list) -> OutboxEmail:
+    """
+    Store an email in the outbox to be sent by the send_queued_emails command.
+    """
+    return OutboxEmail.objects.create(
+        subject=subject, message=message, from_email=from_email, recipient_list=list(recipient_list)
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """
+    Exponential backoff between attempts, capped by settings.EMAIL_OUTBOX["MAX_BACKOFF"].
+    """
+    config = settings.EMAIL_OUTBOX
+    return timedelta(seconds=min(config["RETRY_BACKOFF"] * 2 ** (attempts - 1), config["MAX_BACKOFF"]))
+
+
+def _record_failure(email: OutboxEmail, exc: Exception) -> None:
+    email.attempts += 1
+    email.last_error = str(exc)
+    logger.warning("Sending outbox email %s failed on attempt %s: %s", email.pk, email.attempts, exc)
+    if email.attempts >= settings.EMAIL_OUTBOX["MAX_ATTEMPTS"]:
+        email.status = OutboxEmail.FAILED
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+
+
+def claim_queued_emails(batch_size: int) -> list:
+    """
+    Claim a batch of due emails for this worker, in a short transaction.
+
+    The batch is locked with SELECT ... FOR UPDATE SKIP LOCKED where the database supports it and
+    its next attempt is moved settings.EMAIL_OUTBOX["LEASE"] seconds ahead before the locks are
+    released, so the other workers skip it while it is sent. A worker that stops before recording
+    the results leaves the emails to be sent again once the lease is over.
+    """
+    lease_until = timezone.now() + timedelta(seconds=settings.EMAIL_OUTBOX["LEASE"])
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.PENDING, next_attempt_at__lte=timezone.now())
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if emails:
+            OutboxEmail.objects.filter(pk__in=[email.pk for email in emails]).update(next_attempt_at=lease_until)
+    for email in emails:
+        email.next_attempt_at = lease_until
+    return emails
+
+
+def send_queued_emails(batch_size: int = None) -> tuple:
+    """
+    Send a batch of due emails of the outbox over a single mail server connection.
+
+    The batch is claimed in a first transaction (see claim_queued_emails), sent outside of any
+    transaction and the results are stored in a second one, so no row lock or transaction stays
+    open while waiting for the mail server and several workers can run at the same time. A failed
+    email is retried later with an exponential backoff and marked as failed after
+    settings.EMAIL_OUTBOX["MAX_ATTEMPTS"] attempts.
+
+    Parameters:
+    - batch_size: Maximum number of emails to send, settings.EMAIL_OUTBOX["BATCH_SIZE"] by default.
+
+    Returns:
+    - A tuple with the number of sent emails and the number of failed attempts.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX["BATCH_SIZE"]
+    sent = failed = 0
+    emails = claim_queued_emails(batch_size)
+    if not emails:
+        return sent, failed
+
+    connection = get_connection()
+    try:
+        # Opened once, every email of the batch is sent over the same connection.
+        connection.open()
+    except Exception as exc:
+        for email in emails:
+            _record_failure(email, exc)
+        failed = len(emails)
+    else:
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject, email.message, email.from_email, email.recipient_list, connection=connection
+                )
+                try:
+                    message.send()
+                except Exception as exc:
+                    _record_failure(email, exc)
+                    failed += 1
+                else:
+                    email.attempts += 1
+                    email.status = OutboxEmail.SENT
+                    email.sent_at = timezone.now()
+                    sent += 1
+        finally:
+            connection.close()
+
+    with transaction.atomic():
+        OutboxEmail.objects.bulk_update(emails, ["attempts", "status", "next_attempt_at", "last_error", "sent_at"])
+    return sent, failed
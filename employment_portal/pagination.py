@@ -0,0 +1,183 @@
+import base64
+import binascii
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class SizedPagination(BasePagination):
+    """
+    Base pagination that lets the client pick the page size within an upper bound.
+
+    Attributes:
+    - page_size (int): Default number of items per page.
+    - max_page_size (int): Upper bound for the page size requested by the client.
+    - page_size_query_param (str): Query parameter used to request a page size.
+    """
+
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+
+class OfferCursorPagination(SizedPagination):
+    """
+    Keyset (cursor) pagination over Offer ordered by newest first.
+
+    The position of the last row of a page is encoded as an opaque cursor holding its
+    (created_at, id) pair. The next page is fetched with a range condition on those two
+    columns, so every page is a bounded scan of the (created_at, id) index no matter how
+    deep the client has browsed, and no COUNT(*) is ever executed.
+
+    Attributes:
+    - cursor_query_param (str): Query parameter holding the cursor.
+    - ordering (tuple): Ordering applied to the queryset, must match the cursor fields.
+    """
+
+    cursor_query_param = "cursor"
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Return the queryset of the requested page, async views evaluate it and pass the rows to set_page().
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if cursor is not None:
+            created_at, pk = cursor
+            # The redundant created_at__lte bound lets the database use it as an index condition,
+            # the OR only filters the rows sharing the boundary timestamp.
+            queryset = queryset.filter(created_at__lte=created_at).filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+        # Fetch one extra row to know whether there is a next page without counting.
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, results: list) -> list:
+        self.has_next = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        # Pages read with .values() hold dicts instead of instances.
+        created_at, pk = (last["created_at"], last["id"]) if isinstance(last, dict) else (last.created_at, last.pk)
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(created_at, pk))
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(OrderedDict([("next", self.get_next_link()), ("results", data)]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def encode_cursor(self, created_at, pk) -> str:
+        raw = f"{created_at.isoformat()}|{pk}"
+        return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode("ascii")).decode("ascii")
+            created_at, pk = raw.rsplit("|", 1)
+            created_at = parse_datetime(created_at)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+
+class OfferSearchPagination(SizedPagination):
+    """
+    Page number pagination for ranked search results that never counts the matches.
+
+    Search results are ordered by relevance, so they can't be walked with a keyset cursor.
+    Each page fetches one extra row to know whether a next page exists instead of running
+    a COUNT(*) over all the matching offers.
+
+    Attributes:
+    - page_query_param (str): Query parameter holding the page number, starting at 1.
+    """
+
+    page_query_param = "page"
+    invalid_page_message = "Invalid page"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Return the queryset of the requested page, async views evaluate it and pass the rows to set_page().
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message)
+
+        offset = (self.page_number - 1) * self.page_size
+        return queryset[offset : offset + self.page_size + 1]
+
+    def set_page(self, results: list) -> list:
+        self.has_next = len(results) > self.page_size
+        return results[: self.page_size]
+
+    def get_page_link(self, page_number):
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.page_query_param, page_number)
+
+    def get_paginated_response(self, data) -> Response:
+        next_link = self.get_page_link(self.page_number + 1) if self.has_next else None
+        previous_link = self.get_page_link(self.page_number - 1) if self.page_number > 1 else None
+        return Response(OrderedDict([("next", next_link), ("previous", previous_link), ("results", data)]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,26 @@
+import io
+
+import orjson
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser reading UTF-8 request bodies with orjson.
+
+    Bodies in other charsets and the ones orjson rejects are handed to JSONParser, so the
+    accepted payloads and the error messages stay the same. Integers beyond 64 bits are
+    read as floats.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        body = stream.read()
+        if encoding.lower().replace("-", "") == "utf8":
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,133 @@
+from functools import lru_cache
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .instrumentation import timed_section
+
+# Fields whose representation of a .values() value is the value itself.
+IDENTITY_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField)
+
+UNSUPPORTED_FIELDS = (
+    serializers.RelatedField,
+    serializers.ManyRelatedField,
+    serializers.SerializerMethodField,
+    serializers.BaseSerializer,
+)
+
+
+def _constant(converter):
+    return lambda: converter
+
+
+def _datetime_converter(field):
+    """
+    Converter factory of an ISO 8601 DateTimeField. DRF looks up the current timezone for every
+    value, here it is looked up once per batch and aware values are formatted directly.
+    """
+
+    def factory():
+        field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+        if field_timezone is None:
+            return field.to_representation
+
+        def convert(value):
+            if value.tzinfo is None:
+                return field.to_representation(value)
+            text = value.astimezone(field_timezone).isoformat()
+            return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+        return convert
+
+    return factory
+
+
+def _converter_factory(field):
+    """
+    Return a callable building the converter of the field for a batch of rows, the converter
+    is None when the value read with .values() is already the representation.
+    """
+    if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+        return _constant(None)
+    if isinstance(field, IDENTITY_FIELDS):
+        return _constant(None)
+    if isinstance(field, UNSUPPORTED_FIELDS):
+        raise ImproperlyConfigured(f"{field.__class__.__name__} '{field.field_name}' can't be read from .values().")
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if isinstance(field, serializers.DateTimeField) and output_format and output_format.lower() == ISO_8601:
+        return _datetime_converter(field)
+    return _constant(field.to_representation)
+
+
+class ValuesSerializer:
+    """
+    Read-only counterpart of a ModelSerializer that works on .values() rows instead of model instances.
+
+    The fields of the serializer are compiled once into (name, source, converter factory)
+    triples: the rows are read with .values() on the sources, and only the fields whose
+    representation differs from the database value (decimals, datetimes...) go through their
+    converter. The result has the same keys, order and values as the ModelSerializer output,
+    without building a model instance and running every Field for each row.
+
+    Only plain model fields and primary key relations are supported.
+    """
+
+    def __init__(self, serializer_class):
+        self.fields = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if len(field.source_attrs) != 1:
+                raise ImproperlyConfigured(f"Field '{name}' with source '{field.source}' can't be read from .values().")
+            self.fields.append((name, field.source_attrs[0], _converter_factory(field)))
+        self.sources = [source for _, source, _ in self.fields]
+
+    def values(self, queryset):
+        """
+        Return the queryset rows as dicts of the sources of the fields.
+        """
+        return queryset.values(*self.sources)
+
+    def get_converters(self) -> list:
+        return [(name, source, factory()) for name, source, factory in self.fields]
+
+    def to_representation(self, row, converters=None) -> dict:
+        return {
+            name: row[source] if converter is None or row[source] is None else converter(row[source])
+            for name, source, converter in converters or self.get_converters()
+        }
+
+    def many_to_representation(self, rows) -> list:
+        with timed_section("serializer"):
+            converters = self.get_converters()
+            return [self.to_representation(row, converters) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def get_values_serializer(serializer_class) -> ValuesSerializer:
+    return ValuesSerializer(serializer_class)
+
+
+class ValuesListMixin:
+    """
+    List view mixin that reads the page with .values() and serializes it with the ValuesSerializer
+    of 'serializer_class', instead of model instances and the ModelSerializer.
+
+    Methods:
+    - get_page_response(page, serialize): Returns the response of the page rows, serialize()
+        turns them into their representation. Mixins can answer without serializing the page.
+
+    """
+
+    def list(self, request, *args, **kwargs):
+        values_serializer = get_values_serializer(self.get_serializer_class())
+        queryset = values_serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_page_response(page, values_serializer.many_to_representation)
+        return Response(values_serializer.many_to_representation(queryset))
+
+    def get_page_response(self, page: list, serialize):
+        return self.get_paginated_response(serialize(page))
@@ -0,0 +1,533 @@
+"""
+Offer recommendations: the offers whose title, skills and description are the most similar to the
+profile description of an applicant, by TF-IDF cosine similarity.
+
+Scoring the profile against every offer on each request costs O(offers * terms). Instead the
+weighted vectors of the offers are precomputed by build_offer_index(), at deploy time with the
+build_offer_recommendations management command, and stored in settings.OFFER_RECOMMENDATIONS["PATH"]
+with their inverted index (for every term, the offers containing it from the highest weight) as
+flat arrays that the processes map in memory instead of reading. A request only walks the
+postings of the terms of the profile, and skips those of the frequent terms once they can't
+change the top offers (see OfferIndex.top()).
+settings.OFFER_RECOMMENDATIONS["MAX_POSTINGS"] optionally caps the postings of every term, which
+bounds the cost of a request at the price of missing some offers.
+
+Offers created or updated after the index was built are read by their updated_at, vectorized
+with the document frequencies of the index and kept in memory on top of it, each process
+fetching every CHANGES_INTERVAL seconds only the offers changed since it last did. Deleted
+offers are dropped when the recommended offers are fetched. Rebuilding the index folds the
+changes in and refreshes the document frequencies, a process rebuilds it in the background
+once it holds more than MAX_CHANGES changed offers. The rebuilding process holds a file lock
+next to the index, the other processes skip the rebuild and load the new file.
+"""
+import array
+import bisect
+import fcntl
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from operator import itemgetter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connections
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Offer
+
+logger = logging.getLogger(__name__)
+
+TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOP_WORDS = frozenset(
+    "a an and are as at be been but by for from has have i in is it its of on or our that the their "
+    "this to was we were will with you your".split()
+)
+
+# A skill counts as much as this many occurrences of a word in the title or description.
+SKILL_WEIGHT = 2
+
+# Offers changed this long before the last one seen are read again, a transaction may commit
+# an offer with an updated_at older than offers committed before it.
+CHANGES_OVERLAP = timedelta(seconds=5)
+
+# Layout of the index file: MAGIC, the length of the JSON header, the header padded to 8
+# bytes, then the offer ids (int64), the term offsets (int64), the rows (int32) and weights
+# (float32) of the postings. The arrays are in the byte order of the machine that built them.
+MAGIC = b"OFRIDX01"
+HEADER_LENGTH = struct.Struct("=Q")
+
+
+def tokenize(text: str) -> list:
+    """
+    Split a text into lowercase terms, without stop words.
+
+    For example "Senior Python/Django developer, C++ and Node.js." gives
+    ["senior", "python", "django", "developer", "c++", "node.js"].
+    """
+    return [term for term in TOKEN.findall((text or "").lower()) if term not in STOP_WORDS]
+
+
+def offer_terms(title: str, skills: str, description: str) -> Counter:
+    """
+    Return the term frequencies of an offer, its skills counting SKILL_WEIGHT times.
+    """
+    terms = Counter(tokenize(title))
+    terms.update(tokenize(description))
+    for term in tokenize(skills):
+        terms[term] += SKILL_WEIGHT
+    return terms
+
+
+def inverse_document_frequency(document_frequency: int, documents: int) -> float:
+    return math.log((1 + documents) / (1 + document_frequency)) + 1
+
+
+def weigh(terms: Counter, idf) -> dict:
+    """
+    Return the L2 normalized TF-IDF vector of the term frequencies, with sublinear term frequencies.
+
+    Parameters:
+    - terms: The term frequencies.
+    - idf: A function returning the inverse document frequency of a term.
+    """
+    return normalize({term: (1 + math.log(frequency)) * idf(term) for term, frequency in terms.items() if frequency})
+
+
+def normalize(vector: dict) -> dict:
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+
+def _iter_offer_terms(queryset):
+    for offer_id, title, skills, description in queryset.values_list(
+        "id", "title", "skills", "description"
+    ).iterator(chunk_size=2000):
+        yield offer_id, offer_terms(title, skills, description)
+
+
+def build_offer_index(path) -> dict:
+    """
+    Vectorize every offer and write the index to path.
+
+    The offers are read twice, for the document frequencies and for the weights, so the
+    memory used is that of the postings and not of the term frequencies of every offer.
+
+    Returns:
+    - The header of the index, with the number of offers, terms and postings.
+    """
+    built_at = timezone.now()
+    offers = Offer.objects.order_by("id")
+    document_frequencies = Counter()
+    documents = 0
+    for _, terms in _iter_offer_terms(offers):
+        document_frequencies.update(terms.keys())
+        documents += 1
+
+    vocabulary = sorted(document_frequencies)
+    term_indexes = {term: index for index, term in enumerate(vocabulary)}
+    idf = [inverse_document_frequency(document_frequencies[term], documents) for term in vocabulary]
+    offer_ids = array.array("q")
+    vector_offsets = array.array("q", [0])
+    vector_terms = array.array("i")
+    vector_weights = array.array("f")
+    # Row of each vector position, and the vector positions of each term.
+    vector_rows = array.array("i")
+    term_positions = [array.array("q") for _ in vocabulary]
+    for offer_id, terms in _iter_offer_terms(offers):
+        # Offers created between the two reads may have terms outside of the vocabulary, they
+        # are left to the changes read after loading the index, like every offer changed after built_at.
+        if any(term not in term_indexes for term in terms):
+            continue
+        row = len(offer_ids)
+        offer_ids.append(offer_id)
+        vector = weigh(terms, lambda term: idf[term_indexes[term]])
+        # By term index, so that the weight of a term is found by bisection.
+        for index, weight in sorted((term_indexes[term], weight) for term, weight in vector.items()):
+            term_positions[index].append(len(vector_terms))
+            vector_rows.append(row)
+            vector_terms.append(index)
+            vector_weights.append(weight)
+        vector_offsets.append(len(vector_terms))
+
+    # Postings of each term, from the highest weight.
+    max_postings = settings.OFFER_RECOMMENDATIONS["MAX_POSTINGS"] or None
+    posting_offsets = array.array("q", [0])
+    posting_rows = array.array("i")
+    posting_weights = array.array("f")
+    for positions in term_positions:
+        positions = sorted(positions, key=vector_weights.__getitem__, reverse=True)[:max_postings]
+        posting_rows.extend(vector_rows[position] for position in positions)
+        posting_weights.extend(vector_weights[position] for position in positions)
+        posting_offsets.append(len(posting_rows))
+
+    header = {
+        "built_at": built_at.isoformat(),
+        "byteorder": sys.byteorder,
+        "documents": documents,
+        "offers": len(offer_ids),
+        "vector_terms": len(vector_terms),
+        "postings": len(posting_rows),
+        "pruned": len(posting_rows) < len(vector_terms),
+        "terms": vocabulary,
+        "idf": idf,
+    }
+    arrays = (offer_ids, vector_offsets, vector_terms, vector_weights, posting_offsets, posting_rows, posting_weights)
+    write_offer_index(path, header, arrays)
+    return header
+
+
+def write_offer_index(path, header: dict, arrays: tuple) -> None:
+    """
+    Write the index, atomically so the serving processes never map a partial file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    encoded = json.dumps(header, ensure_ascii=False).encode()
+    encoded += b" " * (-len(encoded) % 8)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    with os.fdopen(fd, "wb") as index_file:
+        index_file.write(MAGIC)
+        index_file.write(HEADER_LENGTH.pack(len(encoded)))
+        index_file.write(encoded)
+        for values in arrays:
+            values.tofile(index_file)
+    os.replace(temp_path, path)
+
+
+class OfferIndex:
+    """
+    Vectors of the offers and their inverted index, mapped in memory from the index file.
+
+    Attributes:
+    - built_at: When the index started reading the offers.
+    - offer_ids: Offer id of each row.
+    - term_indexes: Index of each term of the vocabulary.
+
+    Methods:
+    - idf(term): Returns the inverse document frequency of a term, the highest one for unknown terms.
+    - top(query, limit, excluded): Returns the (row, score) of the rows the most similar to the query.
+
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as index_file:
+            self._map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an offer index.")
+        start = len(MAGIC) + HEADER_LENGTH.size
+        (length,) = HEADER_LENGTH.unpack_from(self._map, len(MAGIC))
+        header = json.loads(self._map[start : start + length])
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was built on a machine of another byte order.")
+        self.built_at = datetime.fromisoformat(header["built_at"])
+        self.term_indexes = {term: index for index, term in enumerate(header["terms"])}
+        self._idf = header["idf"]
+        self._default_idf = inverse_document_frequency(0, header["documents"])
+        self._pruned = header["pruned"]
+
+        view = memoryview(self._map)
+        position = start + length
+        arrays = []
+        for code, count in (
+            ("q", header["offers"]),
+            ("q", header["offers"] + 1),
+            ("i", header["vector_terms"]),
+            ("f", header["vector_terms"]),
+            ("q", len(self._idf) + 1),
+            ("i", header["postings"]),
+            ("f", header["postings"]),
+        ):
+            size = struct.calcsize(code) * count
+            arrays.append(view[position : position + size].cast(code))
+            position += size
+        (
+            self.offer_ids,
+            self._vector_offsets,
+            self._vector_terms,
+            self._vector_weights,
+            self._posting_offsets,
+            self._posting_rows,
+            self._posting_weights,
+        ) = arrays
+
+    def idf(self, term: str) -> float:
+        index = self.term_indexes.get(term)
+        return self._default_idf if index is None else self._idf[index]
+
+    def top(self, query: dict, limit: int, excluded=frozenset()) -> list:
+        """
+        Return the (row, score) of the limit rows the most similar to the query, the last rows first on ties,
+        without the rows of excluded offers.
+
+        The postings of the query terms are walked from the term whose contribution has the
+        highest upper bound, its query weight times its first posting weight. Once the bounds of
+        the terms left add up to less than the limit-th score, a row not seen yet can't make it,
+        so the postings left are skipped and the rows seen that may still make it are completed
+        with the weights of their vectors. The long postings of frequent terms, whose idf is
+        low, are the ones skipped. On an index with pruned postings the bounds are approximate,
+        the rows found are scored exactly but rows only in the pruned postings are missed.
+        """
+        offsets, rows, weights = self._posting_offsets, self._posting_rows, self._posting_weights
+        query_terms = {}
+        bounds = []
+        for term, query_weight in query.items():
+            index = self.term_indexes.get(term)
+            if index is not None and offsets[index] < offsets[index + 1]:
+                query_terms[index] = query_weight
+                bounds.append((query_weight * weights[offsets[index]], index))
+        bounds.sort(reverse=True)
+
+        remaining = sum(bound for bound, _ in bounds)
+        scores = defaultdict(float)
+        for walked, (bound, index) in enumerate(bounds):
+            if remaining < self._kth_score(scores, limit, excluded):
+                break
+            query_weight = query_terms[index]
+            start, end = offsets[index], offsets[index + 1]
+            for row, weight in zip(rows[start:end], weights[start:end]):
+                scores[row] += query_weight * weight
+            remaining -= bound
+        else:
+            walked = len(bounds)
+            remaining = 0
+
+        offer_ids = self.offer_ids
+        if not remaining and not self._pruned:
+            if excluded:
+                scores = {row: score for row, score in scores.items() if offer_ids[row] not in excluded}
+            return heapq.nlargest(limit, scores.items(), key=itemgetter(1, 0))
+
+        # The seen rows from the highest partial score, completed with the weights of the terms
+        # left in their vectors until the partial score plus the bounds left can't reach the
+        # limit-th score. The postings of a pruned index miss weights, its rows are scored again.
+        if self._pruned:
+            skipped = [(index, query_terms[index]) for _, index in bounds]
+        else:
+            skipped = [(index, query_terms[index]) for _, index in bounds[walked:]]
+        threshold = self._kth_score(scores, limit, excluded) - remaining
+        candidates = sorted(
+            (
+                (score, row)
+                for row, score in scores.items()
+                if score >= threshold and offer_ids[row] not in excluded
+            ),
+            reverse=True,
+        )
+        top = []
+        for partial, row in candidates:
+            if len(top) == limit and partial + remaining < top[0][0]:
+                break
+            score = self._complete_score(row, 0.0 if self._pruned else partial, skipped)
+            if len(top) < limit:
+                heapq.heappush(top, (score, row))
+            elif (score, row) > top[0]:
+                heapq.heapreplace(top, (score, row))
+        return [(row, score) for score, row in sorted(top, reverse=True)]
+
+    def _kth_score(self, scores: dict, limit: int, excluded) -> float:
+        if len(scores) < limit:
+            return 0.0
+        if excluded:
+            offer_ids = self.offer_ids
+            values = (score for row, score in scores.items() if offer_ids[row] not in excluded)
+        else:
+            values = scores.values()
+        kth = heapq.nlargest(limit, values)
+        return kth[-1] if len(kth) == limit else 0.0
+
+    def _complete_score(self, row: int, score: float, query_terms: list) -> float:
+        start, end = self._vector_offsets[row], self._vector_offsets[row + 1]
+        terms = self._vector_terms
+        for index, query_weight in query_terms:
+            position = bisect.bisect_left(terms, index, start, end)
+            if position < end and terms[position] == index:
+                score += query_weight * self._vector_weights[position]
+        return score
+
+
+def _index_file_id(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+@contextmanager
+def _rebuild_lock(path):
+    """
+    Exclusive lock of the processes rebuilding the index at path, yields False when another one holds it.
+    """
+    with open(f"{path}.lock", "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class OfferRecommender:
+    """
+    Index of the process with the offers changed since it was built, reloaded when its file changes.
+
+    Without an index file nothing is recommended until the build_offer_recommendations command
+    writes one. Once more than settings.OFFER_RECOMMENDATIONS["MAX_CHANGES"] offers changed since
+    the index was built, it is rebuilt in a background thread, by one process at a time. The
+    changed offers are replaced, never modified, when changes are read, so the requests score
+    a snapshot of them without holding the lock.
+
+    Methods:
+    - recommend(text, limit): Returns the (offer id, score) of the offers most similar to the text.
+    - clear(): Forgets the index and the changes.
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self._reset(None, None)
+        self._loaded = False
+
+    def _load(self):
+        path = settings.OFFER_RECOMMENDATIONS["PATH"]
+        file_id = _index_file_id(path)
+        with self._lock:
+            if self._loaded and file_id == self._file_id:
+                return self._index
+        # Logged once per missing or invalid file, the requests meanwhile get no recommendations.
+        index = None
+        if file_id is None:
+            logger.error("There is no offer index at %s, run the build_offer_recommendations command.", path)
+        else:
+            try:
+                index = OfferIndex(path)
+            except (OSError, ValueError) as error:
+                logger.error("%s Run the build_offer_recommendations command.", error)
+        with self._lock:
+            # An index replaced here stays mapped until the requests using it are done.
+            self._reset(index, file_id)
+            self._loaded = True
+            return index
+
+    def _reset(self, index, file_id) -> None:
+        self._index = index
+        self._file_id = file_id
+        self._changed_at = index.built_at if index is not None else None
+        self._changes_read_at = None
+        self._changed = {}
+        self._changed_postings = {}
+
+    def _read_changes(self, index: OfferIndex) -> None:
+        options = settings.OFFER_RECOMMENDATIONS
+        now = time.monotonic()
+        with self._lock:
+            if index is not self._index:
+                return
+            if self._changes_read_at is not None and now - self._changes_read_at < options["CHANGES_INTERVAL"]:
+                return
+            self._changes_read_at = now
+            since = self._changed_at - CHANGES_OVERLAP
+        changes = Offer.objects.filter(updated_at__gte=since).values_list(
+            "id", "title", "skills", "description", "updated_at"
+        )
+        changes = list(changes)
+        with self._lock:
+            if index is not self._index or not changes:
+                return
+            # New maps, copying only the postings of the changed terms: the requests scoring the
+            # previous ones keep them unchanged.
+            changed, changed_postings, copied = dict(self._changed), dict(self._changed_postings), set()
+
+            def postings(term):
+                if term not in copied:
+                    copied.add(term)
+                    changed_postings[term] = dict(changed_postings.get(term, {}))
+                return changed_postings[term]
+
+            for offer_id, title, skills, description, updated_at in changes:
+                for term in changed.pop(offer_id, ()):
+                    postings(term).pop(offer_id, None)
+                vector = weigh(offer_terms(title, skills, description), index.idf)
+                changed[offer_id] = vector
+                for term, weight in vector.items():
+                    postings(term)[offer_id] = weight
+                self._changed_at = max(self._changed_at, updated_at)
+            self._changed, self._changed_postings = changed, changed_postings
+            rebuild = len(changed) > options["MAX_CHANGES"] and not self._rebuilding
+            self._rebuilding = self._rebuilding or rebuild
+            file_id = self._file_id
+        if rebuild:
+            logger.info("%s offers changed since the offer index was built, it is rebuilt.", len(changed))
+            threading.Thread(
+                target=self._rebuild_thread, args=(options["PATH"], file_id), name="offer-index-rebuild", daemon=True
+            ).start()
+
+    def _rebuild(self, path, file_id) -> None:
+        try:
+            with _rebuild_lock(path) as locked:
+                # Skipped when another process is rebuilding it or already replaced the loaded file.
+                if locked and _index_file_id(path) == file_id:
+                    build_offer_index(path)
+        except Exception:
+            logger.exception("The offer index couldn't be rebuilt.")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def _rebuild_thread(self, path, file_id) -> None:
+        try:
+            self._rebuild(path, file_id)
+        finally:
+            # The connections of the thread aren't closed at the end of a request.
+            connections.close_all()
+
+    def recommend(self, text: str, limit: int) -> list:
+        index = self._load()
+        if index is None:
+            return []
+        self._read_changes(index)
+        # The terms of the profile with the highest weights, the others barely change the ranking.
+        query = weigh(Counter(tokenize(text)), index.idf)
+        max_terms = settings.OFFER_RECOMMENDATIONS["MAX_QUERY_TERMS"]
+        query = normalize(dict(heapq.nlargest(max_terms, query.items(), key=itemgetter(1))))
+        with self._lock:
+            changed, changed_postings = (self._changed, self._changed_postings) if index is self._index else ({}, {})
+        offer_ids = index.offer_ids
+        scores = {offer_ids[row]: score for row, score in index.top(query, limit, changed)}
+        for term, query_weight in query.items():
+            for offer_id, weight in changed_postings.get(term, {}).items():
+                scores[offer_id] = scores.get(offer_id, 0) + query_weight * weight
+        return heapq.nlargest(limit, scores.items(), key=itemgetter(1, 0))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset(None, None)
+            self._loaded = False
+
+
+offer_recommender = OfferRecommender()
+
+
+@receiver(setting_changed)
+def clear_offer_recommender(*, setting, **kwargs):
+    if setting == "OFFER_RECOMMENDATIONS":
+        offer_recommender.clear()
@@ -0,0 +1,42 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    # Decimals and the types orjson doesn't know (lazy strings, timedeltas, querysets...) are
+    # converted exactly like DRF's encoder does.
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer writing the compact responses with orjson.
+
+    The output is byte for byte the one of JSONRenderer: compact separators, UTF-8 text,
+    escaped U+2028/U+2029, datetimes ending in "Z" in UTC, UUIDs as strings and Decimals
+    converted by DRF's encoder. The only differences are floats in exponent notation,
+    written 1e20 instead of 1e+20, and NaN or infinity, written null instead of failing;
+    the API doesn't render floats (Decimals are serialized as strings).
+
+    Indented responses (e.g. "application/json; indent=4") and integers beyond 64 bits are
+    rendered by JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer, these separators are invalid in JavaScript strings.
+        if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+            content = content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return content
@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+# Field weights of the offer search vector, title ranks above skills and skills above description.
+SEARCH_FIELD_WEIGHTS = (("title", "A"), ("skills", "B"), ("description", "C"))
+
+# Scores used by the fallback ranking when the database has no full-text search.
+FALLBACK_FIELD_SCORES = (("title", 3), ("skills", 2), ("description", 1))
+
+
+def full_text_search_enabled(queryset) -> bool:
+    """
+    Return True when the database behind the queryset supports PostgreSQL full-text search.
+    """
+    return connections[queryset.db].vendor == "postgresql"
+
+
+def offer_search_vector() -> SearchVector:
+    """
+    Build the weighted search vector expression for Offer.
+    """
+    config = settings.OFFER_SEARCH_CONFIG
+    vector = None
+    for field, weight in SEARCH_FIELD_WEIGHTS:
+        part = SearchVector(field, weight=weight, config=config)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def update_offer_search_vector(queryset) -> None:
+    """
+    Recompute the stored search vector of the offers in the queryset.
+
+    It is a single UPDATE computed by the database, and a no-op on databases
+    without full-text search, where the fallback search reads the text columns directly.
+    """
+    if not full_text_search_enabled(queryset):
+        return
+    queryset.update(search_vector=offer_search_vector())
+
+
+def search_offers(queryset, terms: str):
+    """
+    Filter the offers matching the search terms and order them by relevance.
+
+    On PostgreSQL the terms are parsed as a web search query and matched against the
+    GIN indexed search vector, ranked with ts_rank. On other databases every word has to
+    appear in the title, skills or description and the rank is the sum of the field scores.
+
+    Parameters:
+    - queryset: The Offer queryset to search in.
+    - terms: The search terms as typed by the user.
+
+    Returns:
+    - The queryset annotated with 'rank' and ordered by rank, newest first on ties.
+    """
+    if full_text_search_enabled(queryset):
+        query = SearchQuery(terms, config=settings.OFFER_SEARCH_CONFIG, search_type="websearch")
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=SearchRank(F("search_vector"), query))
+            .order_by("-rank", "-id")
+        )
+
+    words = terms.split()
+    rank = Value(0)
+    for word in words:
+        match = Q()
+        for field, score in FALLBACK_FIELD_SCORES:
+            lookup = Q(**{f"{field}__icontains": word})
+            match |= lookup
+            rank += Case(When(lookup, then=Value(score)), default=Value(0), output_field=IntegerField())
+        queryset = queryset.filter(match)
+    return queryset.annotate(rank=rank).order_by("-rank", "-id")
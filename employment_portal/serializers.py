@@ -1,10 +1,33 @@
+from collections import Counter
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
+from rest_framework.authtoken.serializers import AuthTokenSerializer
+from rest_framework.settings import api_settings
+from .caching import bump_offer_cache_versions
+from .duplicates import (
+    FLAG,
+    REJECT,
+    find_duplicate_offers,
+    index_offer_signatures,
+    lock_company_offers,
+    reindex_offer_signature,
+)
+from .facets import change_offer_facets, facet_deltas, offer_facet_keys, skill_facet_keys
+from .hashing import hash_password, verify_password
+from .instrumentation import TimedListSerializer, TimedSerializerMixin
 from .models import ApplicantUser, Company, Offer, Postulation
+from .search import update_offer_search_vector
+from .skills import add_offers_skills, parse_skills, sync_offer_skills
 
 
-class ApplicantUserSerializer(serializers.ModelSerializer):
+class ApplicantUserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ApplicantUser
+        list_serializer_class = TimedListSerializer
         fields = [
             "id",
             "username",
@@ -20,24 +43,248 @@ class ApplicantUserSerializer(serializers.ModelSerializer):
     extra_kwargs = {"password": {"write_only": True}}
 
     def create(self, validated_data):
+        # What create_user() does, with the password hashed on the bounded pool of employment_portal.hashing.
         password = validated_data.pop("password")
-        user = ApplicantUser.objects.create_user(password=password, **validated_data)
+        user = ApplicantUser(**validated_data)
+        user.username = ApplicantUser.normalize_username(user.username)
+        user.email = ApplicantUser.objects.normalize_email(user.email)
+        user.password = hash_password(password)
+        user.save()
         return user
 
 
-class CompanySerializer(serializers.ModelSerializer):
+class ApplicantUserLoginSerializer(AuthTokenSerializer):
+    """
+    AuthTokenSerializer checking the password on the bounded pool of employment_portal.hashing.
+
+    authenticate() goes through the authentication backends, which check it inline on the
+    request thread: they still do for the admin login, the other logins and the management
+    commands, only the login endpoint is served by the pool.
+    """
+
+    def validate(self, attrs):
+        username, password = attrs.get("username"), attrs.get("password")
+        try:
+            user = ApplicantUser._default_manager.get_by_natural_key(username)
+        except ApplicantUser.DoesNotExist:
+            # Hash anyway as ModelBackend does, so the response time doesn't tell unknown usernames apart.
+            hash_password(password)
+            user = None
+        if user is None or not verify_password(password, user) or not user.is_active:
+            raise serializers.ValidationError(_("Unable to log in with provided credentials."), code="authorization")
+        attrs["user"] = user
+        return attrs
+
+
+class CompanySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Company
-        fields = ["id", "name", "nit"]
+        list_serializer_class = TimedListSerializer
+        fields = ["id", "name", "nit", "postulation_count"]
 
 
-class OfferSerializer(serializers.ModelSerializer):
+class OfferSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Offer
-        fields = ["id", "title", "description", "salary", "company", "skills", "created_at", "updated_at"]
+        list_serializer_class = TimedListSerializer
+        fields = [
+            "id",
+            "title",
+            "description",
+            "salary",
+            "company",
+            "skills",
+            "postulation_count",
+            "duplicate_of",
+            "created_at",
+            "updated_at",
+        ]
+
+    # Without a savepoint when the view already runs in a transaction, an error rolls the request back anyway.
+    @transaction.atomic(savepoint=False)
+    def create(self, validated_data):
+        offer = super().create(validated_data)
+        # A new offer has no stored skills yet.
+        skill_ids = add_offers_skills([offer])[offer.pk]
+        change_offer_facets(facet_deltas(set(), offer_facet_keys(offer, skill_ids)))
+        index_offer_signatures([offer])
+        return offer
 
+    @transaction.atomic(savepoint=False)
+    def update(self, instance, validated_data):
+        previous = offer_facet_keys(instance, [])
+        offer = super().update(instance, validated_data)
+        current = offer_facet_keys(offer, [])
+        if "skills" in validated_data:
+            stored_ids = list(offer.offer_skills.values_list("skill_id", flat=True))
+            previous |= skill_facet_keys(stored_ids)
+            current |= skill_facet_keys(sync_offer_skills(offer, stored_ids))
+        change_offer_facets(facet_deltas(previous, current))
+        if validated_data.keys() & {"description", "skills", "company"}:
+            reindex_offer_signature(offer)
+        return offer
 
-class PostulationSerializer(serializers.ModelSerializer):
+
+class PostulationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Postulation
+        list_serializer_class = TimedListSerializer
         fields = ["id", "user", "offer"]
+
+
+class PreloadedCompanyField(serializers.PrimaryKeyRelatedField):
+    """
+    Company reference resolved from the companies preloaded in the serializer context,
+    so validating many offers doesn't run one query per offer.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        company = self.context["companies"].get(pk)
+        if company is None:
+            self.fail("does_not_exist", pk_value=data)
+        return company
+
+
+class OfferBulkListSerializer(TimedListSerializer):
+    """
+    List serializer that creates the valid offers of a payload and reports the invalid ones.
+
+    All the referenced companies are loaded with a single query before validating the items.
+    Items that fail validation don't fail the whole payload, their errors are kept in
+    'item_errors' together with their position in the payload. The valid offers are inserted
+    with bulk_create in batches of settings.OFFER_BULK_CREATE_BATCH_SIZE inside one transaction.
+
+    Like OfferCreateView, the companies of the offers are locked and each offer is checked for
+    a near-duplicate among the offers of its company and the previous offers of the payload
+    (see duplicates.py): near-duplicates are created with 'duplicate_of' set or reported in
+    'item_errors', depending on settings.OFFER_DUPLICATES["ACTION"].
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            message = self.error_messages["not_a_list"].format(input_type=type(data).__name__)
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code="not_a_list")
+        if self.max_length is not None and len(data) > self.max_length:
+            message = self.error_messages["max_length"].format(max_length=self.max_length)
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code="max_length")
+
+        company_ids = set()
+        for item in data:
+            try:
+                company_ids.add(int(item["company"]))
+            except (TypeError, ValueError, KeyError):
+                continue
+        self._context = {**self.context, "companies": Company.objects.in_bulk(company_ids)}
+
+        validated = []
+        self.item_errors = []
+        self.item_indexes = []
+        for index, item in enumerate(data):
+            try:
+                validated.append(self.child.run_validation(item))
+                self.item_indexes.append(index)
+            except serializers.ValidationError as exc:
+                self.item_errors.append({"index": index, "errors": exc.detail})
+        return validated
+
+    def check_duplicates(self, validated_data: list) -> tuple:
+        """
+        Return the offers to create, with 'duplicate_of_id' set on the near-duplicates of existing
+        offers, and the position of the earlier offer of the list each other near-duplicate repeats.
+        """
+        action = settings.OFFER_DUPLICATES["ACTION"]
+        if action not in (FLAG, REJECT):
+            return validated_data, {}
+        lock_company_offers(*{attrs["company"].pk for attrs in validated_data})
+        duplicates = find_duplicate_offers(
+            [(attrs["company"].pk, attrs["description"], attrs["skills"]) for attrs in validated_data],
+            compare_duplicates=action == FLAG,
+        )
+        kept, positions, repeated = [], {}, {}
+        for position, (attrs, duplicate) in enumerate(zip(validated_data, duplicates)):
+            if duplicate is not None and action == REJECT:
+                offer_id, earlier = duplicate
+                original = f"offer {offer_id}" if offer_id is not None else f"item {self.item_indexes[earlier]}"
+                error = serializers.ValidationError(
+                    {"description": [f"Near-duplicate of {original} of the same company."]}, code="duplicate"
+                )
+                self.item_errors.append({"index": self.item_indexes[position], "errors": error.detail})
+                continue
+            positions[position] = len(kept)
+            if duplicate is not None and duplicate[0] is not None:
+                attrs = {**attrs, "duplicate_of_id": duplicate[0]}
+            elif duplicate is not None:
+                repeated[len(kept)] = positions[duplicate[1]]
+            kept.append(attrs)
+        self.item_errors.sort(key=itemgetter("index"))
+        return kept, repeated
+
+    @transaction.atomic
+    def create(self, validated_data):
+        validated_data, repeated = self.check_duplicates(validated_data)
+        if not validated_data:
+            return []
+        offers = Offer.objects.bulk_create(
+            [Offer(**attrs) for attrs in validated_data], batch_size=settings.OFFER_BULK_CREATE_BATCH_SIZE
+        )
+        if repeated:
+            # The earlier offers of the payload only have an id once they are inserted.
+            for position, earlier in repeated.items():
+                offers[position].duplicate_of_id = offers[earlier].pk
+            Offer.objects.bulk_update([offers[position] for position in repeated], ["duplicate_of"])
+        offer_skill_ids = add_offers_skills(offers)
+        deltas = Counter()
+        for offer in offers:
+            deltas.update(offer_facet_keys(offer, offer_skill_ids[offer.pk]))
+        change_offer_facets(deltas)
+        index_offer_signatures(offers)
+        update_offer_search_vector(Offer.objects.filter(pk__in=[offer.pk for offer in offers]))
+        # bulk_create doesn't send post_save, so the cached offer pages are invalidated here.
+        bump_offer_cache_versions(*(offer.company_id for offer in offers))
+        return offers
+
+
+class OfferBulkSerializer(OfferSerializer):
+    company = PreloadedCompanyField(queryset=Company.objects.all())
+
+    class Meta(OfferSerializer.Meta):
+        list_serializer_class = OfferBulkListSerializer
+
+
+class OfferFilterSerializer(serializers.Serializer):
+    company = serializers.IntegerField(required=False, min_value=1)
+    salary_min = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    salary_max = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    skills = serializers.CharField(required=False, max_length=500)
+    skills_match = serializers.ChoiceField(choices=["all", "any"], default="all")
+
+    def validate(self, attrs):
+        salary_min = attrs.get("salary_min")
+        salary_max = attrs.get("salary_max")
+        if salary_min is not None and salary_max is not None and salary_min > salary_max:
+            raise serializers.ValidationError({"salary_min": "Must be less than or equal to salary_max."})
+        if "skills" in attrs:
+            attrs["skills"] = parse_skills(attrs["skills"])
+        return attrs
+
+
+class OfferSearchFilterSerializer(OfferFilterSerializer):
+    q = serializers.CharField(max_length=200)
+
+
+class OfferFacetsFilterSerializer(serializers.Serializer):
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=100)
+
+
+class OfferRecommendationFilterSerializer(serializers.Serializer):
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=100)
+
+
+class PostulationExportSerializer(serializers.Serializer):
+    export_format = serializers.ChoiceField(choices=["csv", "ndjson"], default="csv")
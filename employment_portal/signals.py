@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import get_token_cache, reset_token_cache
+from .caching import bump_offer_cache_versions
+from .counters import change_postulation_counts, subtract_postulations
+from .facets import change_offer_facets, company_offer_facet_deltas, facet_deltas, get_offer_facet_keys
+from .hashing import reset_hashing_executor
+from .models import Company, Offer, Postulation
+from .throttling import reset_bucket_store
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    get_token_cache().delete(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_saved_user_tokens(sender, instance, created, **kwargs):
+    if created:
+        return
+    for key in Token.objects.filter(user=instance).values_list("key", flat=True):
+        get_token_cache().delete(key)
+
+
+@receiver(setting_changed)
+def reset_token_cache_on_setting_change(setting, **kwargs):
+    if setting in ("TOKEN_AUTH_CACHE", "CACHES"):
+        reset_token_cache()
+
+
+@receiver(setting_changed)
+def reset_bucket_store_on_setting_change(setting, **kwargs):
+    if setting in ("AUTH_THROTTLE", "CACHES"):
+        reset_bucket_store()
+
+
+@receiver(setting_changed)
+def reset_hashing_executor_on_setting_change(setting, **kwargs):
+    if setting == "PASSWORD_HASHING":
+        reset_hashing_executor()
+
+
+@receiver(post_save, sender=Postulation)
+def increment_postulation_counts(sender, instance, created, **kwargs):
+    if created:
+        change_postulation_counts(instance.offer_id, instance.offer.company_id, 1)
+        bump_offer_cache_versions(instance.offer.company_id)
+
+
+# No delete signal on Postulation, it would disable the fast cascade deletion of the postulations
+# of offers, companies and users (see subtract_postulations()).
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def subtract_deleted_user_postulations(sender, instance, **kwargs):
+    subtract_postulations(Postulation.objects.filter(user=instance))
+
+
+def deleted_with_company(origin) -> bool:
+    """
+    Whether an offer is deleted in the cascade of its company, whose receivers then do the
+    work of its offers with a few queries for all of them.
+    """
+    return getattr(origin, "model", type(origin)) is Company
+
+
+@receiver(pre_delete, sender=Offer)
+def subtract_deleted_offer_postulations(sender, instance, origin=None, **kwargs):
+    # The counter of a company being deleted doesn't matter.
+    if not deleted_with_company(origin):
+        subtract_postulations(Postulation.objects.filter(offer=instance))
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+def invalidate_cached_offer_pages(sender, instance, origin=None, **kwargs):
+    if not deleted_with_company(origin):
+        bump_offer_cache_versions(instance.company_id)
+
+
+@receiver(pre_delete, sender=Offer)
+def decrement_offer_facets(sender, instance, origin=None, **kwargs):
+    # Before the deletion, while the skills of the offer are still stored.
+    if not deleted_with_company(origin):
+        change_offer_facets(facet_deltas(get_offer_facet_keys(instance.pk), set()))
+
+
+@receiver(pre_delete, sender=Company)
+def decrement_deleted_company_offer_facets(sender, instance, **kwargs):
+    change_offer_facets(company_offer_facet_deltas(instance.pk))
+
+
+@receiver(post_delete, sender=Company)
+def invalidate_deleted_company_offer_pages(sender, instance, **kwargs):
+    bump_offer_cache_versions(instance.pk)
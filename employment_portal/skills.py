@@ -0,0 +1,92 @@
+import re
+
+from django.db.models import Count
+
+from .models import OfferSkill, Skill
+
+# Separators accepted between the skills of the free-text Offer.skills field.
+SKILL_SEPARATORS = re.compile(r"[,;\n|]+")
+
+SKILL_NAME_MAX_LENGTH = Skill._meta.get_field("name").max_length
+
+
+def normalize_skill(name: str) -> str:
+    return " ".join(name.split()).lower()[:SKILL_NAME_MAX_LENGTH]
+
+
+def parse_skills(text: str) -> list:
+    """
+    Split a free-text skills value into unique normalized skill names, keeping their order.
+
+    For example "Python, Django;  django REST" gives ["python", "django", "django rest"].
+    """
+    names = []
+    for part in SKILL_SEPARATORS.split(text or ""):
+        name = normalize_skill(part)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def sync_offer_skills(offer, stored_ids=None) -> list:
+    """
+    Rebuild the normalized skills of the offer from its free-text skills field and return their ids.
+
+    Callers that already read the stored skill ids of the offer pass them as 'stored_ids', only
+    the removed and added skills are then written, without reading them again.
+    """
+    names = parse_skills(offer.skills)
+    Skill.objects.bulk_create([Skill(name=name) for name in names], ignore_conflicts=True)
+    skill_ids = list(Skill.objects.filter(name__in=names).values_list("id", flat=True))
+    if stored_ids is None:
+        offer.skill_set.set(skill_ids)
+        return skill_ids
+    removed, added = set(stored_ids) - set(skill_ids), set(skill_ids) - set(stored_ids)
+    if removed:
+        OfferSkill.objects.filter(offer=offer, skill_id__in=removed).delete()
+    if added:
+        OfferSkill.objects.bulk_create([OfferSkill(offer=offer, skill_id=skill_id) for skill_id in added])
+    return skill_ids
+
+
+def add_offers_skills(offers: list) -> dict:
+    """
+    Create the normalized skills of newly created offers with a constant number of queries.
+
+    Returns:
+    - A dict with the skill ids of each offer, by offer id.
+    """
+    offer_names = [(offer, parse_skills(offer.skills)) for offer in offers]
+    names = {name for _, offer_skill_names in offer_names for name in offer_skill_names}
+    Skill.objects.bulk_create([Skill(name=name) for name in names], ignore_conflicts=True)
+    skill_ids = dict(Skill.objects.filter(name__in=names).values_list("name", "id"))
+    OfferSkill.objects.bulk_create(
+        [
+            OfferSkill(offer=offer, skill_id=skill_ids[name])
+            for offer, offer_skill_names in offer_names
+            for name in offer_skill_names
+        ]
+    )
+    return {offer.pk: [skill_ids[name] for name in offer_skill_names] for offer, offer_skill_names in offer_names}
+
+
+def filter_offers_by_skills(queryset, names: list, match: str = "all"):
+    """
+    Filter the offers requiring the given skills.
+
+    The skills are resolved through the (skill, offer) unique index of OfferSkill,
+    never by scanning the free-text field.
+
+    Parameters:
+    - queryset: The Offer queryset to filter.
+    - names: The skill names, they are normalized before matching.
+    - match: "all" to require every skill, "any" to require at least one of them.
+
+    Returns:
+    - The filtered queryset.
+    """
+    names = list({normalize_skill(name) for name in names} - {""})
+    offer_skills = OfferSkill.objects.filter(skill__name__in=names)
+    if match == "all":
+        offer_skills = offer_skills.values("offer_id").annotate(matched=Count("skill_id")).filter(matched=len(names))
+    return queryset.filter(id__in=offer_skills.values("offer_id"))
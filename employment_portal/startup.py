@@ -0,0 +1,124 @@
+"""
+Profiling of the cold start of a worker process.
+
+profile_startup() starts a fresh interpreter with "python -X importtime" that sets Django up,
+imports the WSGI or ASGI application of the project and sends it one request, like a new
+worker of an autoscaled deployment receiving its first request. It returns the duration of
+each phase and the import cost of every module, read from the -X importtime report.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# Runs in the profiled process, measures its phases and prints them as JSON on the last line.
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+from importlib import import_module
+application = import_module("focunti." + sys.argv[1]).application
+application_done = time.perf_counter()
+
+def wsgi_request(path):
+    from wsgiref.util import setup_testing_defaults
+    environ = {"PATH_INFO": path, "HTTP_HOST": "localhost"}
+    setup_testing_defaults(environ)
+    status = []
+    b"".join(application(environ, lambda code, headers, exc_info=None: status.append(code)))
+    return int(status[0].split()[0])
+
+def asgi_request(path):
+    import asyncio
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"localhost")], "client": ("127.0.0.1", 1), "server": ("localhost", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    return messages[0]["status"]
+
+request = wsgi_request if sys.argv[1] == "wsgi" else asgi_request
+status = request(sys.argv[2])
+first_request_done = time.perf_counter()
+request(sys.argv[2])
+second_request_done = time.perf_counter()
+print(json.dumps({
+    "status": status,
+    "setup": setup_done - started,
+    "application": application_done - setup_done,
+    "first_request": first_request_done - application_done,
+    "second_request": second_request_done - first_request_done,
+}))
+"""
+
+
+def parse_import_times(report: str) -> list:
+    """
+    Return the (module, self seconds, cumulative seconds, depth) of each line of a -X importtime report.
+    """
+    imports = []
+    for line in report.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append((module, int(self_us) / 1e6, int(cumulative_us) / 1e6, len(indent) // 2))
+    return imports
+
+
+def package_import_times(imports: list) -> dict:
+    """
+    Sum the self time of the imported modules by top-level package, slowest first.
+    """
+    packages = defaultdict(float)
+    for module, self_time, _, _ in imports:
+        packages[module.split(".")[0]] += self_time
+    return dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
+
+
+def profile_startup(app: str = "wsgi", path: str = "/api/offers/", env: dict = None, import_times: bool = True) -> dict:
+    """
+    Start a worker process of the project and return the duration of its startup phases in seconds.
+
+    Phases: "interpreter" (startup and exit of Python itself), "setup" (django.setup()),
+    "application" (import of focunti.wsgi or focunti.asgi), "first_request" and
+    "second_request" (a warm one, for comparison), and "total" until the first response.
+    "imports" lists the imported modules and "packages" their self time by package, unless
+    import_times is False: -X importtime slows the imports down a little.
+    """
+    options = ["-X", "importtime"] if import_times else []
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, *options, "-c", PROBE, app, path],
+        cwd=BASE_DIR,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(f"The profiled process failed:\n{process.stderr[-2000:]}")
+    phases = json.loads(process.stdout.strip().splitlines()[-1])
+    probe_time = phases["setup"] + phases["application"] + phases["first_request"] + phases["second_request"]
+    phases["interpreter"] = max(wall - probe_time, 0.0)
+    phases["total"] = wall - phases["second_request"]
+    imports = parse_import_times(process.stderr)
+    return {**phases, "imports": imports, "packages": package_import_times(imports)}
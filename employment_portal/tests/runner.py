@@ -0,0 +1,12 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class QueryBudgetTestRunner(DiscoverRunner):
+    """
+    Test runner failing every request that runs more queries than the query_budget of its view.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.QUERY_BUDGET_ENFORCE = True
@@ -0,0 +1,88 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from employment_portal.models import Company, Offer
+
+User = get_user_model()
+
+
+class AsyncReadViewsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        self.headers = {"Authorization": "Token " + self.token.key}
+        self.company = Company.objects.create(name="Test Company", nit="1234567890")
+        self.other_company = Company.objects.create(name="Other Company", nit="0987654321")
+        self.offers = [
+            Offer.objects.create(
+                title=f"Python Offer {index}",
+                description="Test Offer Description",
+                salary=1000 * (index + 1),
+                company=self.company if index % 2 == 0 else self.other_company,
+                skills="Python, Django",
+            )
+            for index in range(5)
+        ]
+
+    async def test_async_offer_list_matches_sync(self):
+        params = {"page_size": 2, "salary_min": "2000"}
+        response = await self.async_client.get(reverse("async-offer-list"), params, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/json")
+        expected = await self.sync_response(reverse("offer-list"), params)
+        self.assertEqual(response.json()["results"], expected.json()["results"])
+
+        next_url = response.json()["next"]
+        self.assertIn(reverse("async-offer-list"), next_url)
+        response = await self.async_client.get(next_url, headers=self.headers)
+        ids = [offer["id"] for offer in response.json()["results"]]
+        self.assertEqual(ids, [self.offers[2].id, self.offers[1].id])
+        self.assertIsNone(response.json()["next"])
+
+    async def test_async_offer_search_matches_sync(self):
+        params = {"q": "python", "company": self.company.id}
+        response = await self.async_client.get(reverse("async-offer-search"), params, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = await self.sync_response(reverse("offer-search"), params)
+        self.assertEqual(response.content, expected.content)
+
+    async def test_async_offer_and_company_detail(self):
+        offer_id = self.offers[0].id
+        response = await self.async_client.get(reverse("async-offer-detail", args=[offer_id]), headers=self.headers)
+        expected = await self.sync_response(reverse("offer-update", args=[offer_id]))
+        self.assertEqual(response.content, expected.content)
+
+        url = reverse("async-company-detail", args=[self.company.id])
+        response = await self.async_client.get(url, headers=self.headers)
+        expected = {"id": self.company.id, "name": "Test Company", "nit": "1234567890", "postulation_count": 0}
+        self.assertEqual(response.json(), expected)
+
+    async def test_async_detail_not_found(self):
+        response = await self.async_client.get(reverse("async-offer-detail", args=[99999]), headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json(), {"detail": "Not found."})
+
+    async def test_async_offer_list_failure_invalid_filters(self):
+        params = {"salary_min": "5000", "salary_max": "1000"}
+        response = await self.async_client.get(reverse("async-offer-list"), params, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("salary_min", response.json())
+
+    async def test_async_offer_list_failure_authentication(self):
+        response = await self.async_client.get(reverse("async-offer-list"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response["WWW-Authenticate"], "Token")
+
+        response = await self.async_client.get(reverse("async-offer-list"), headers={"Authorization": "Token invalid"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json(), {"detail": "Invalid token."})
+
+    async def sync_response(self, url, params=None):
+        return await sync_to_async(self.client.get)(url, params or {})
@@ -0,0 +1,223 @@
+import time
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+
+from employment_portal.authentication import (
+    CachedTokenAuthentication,
+    LocalTokenCache,
+    SignedTokenAuthentication,
+    get_token_cache,
+)
+from employment_portal.throttling import get_bucket_store
+from employment_portal.tokens import ACCESS_TOKEN, decode_token
+from employment_portal.views import OfferListView
+
+User = get_user_model()
+
+SHARED_CACHE_SETTINGS = {
+    "CACHES": {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "tokens": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tokens"},
+    },
+    "TOKEN_AUTH_CACHE": {"BACKEND": "tokens", "MAX_SIZE": 100, "TIMEOUT": 60},
+}
+
+
+class CachedTokenAuthenticationTestCase(TestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.token = Token.objects.create(user=self.user)
+        self.key = self.token.key
+        self.authentication = CachedTokenAuthentication()
+
+    def authenticate(self):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION="Token " + self.key)
+        return self.authentication.authenticate(request)
+
+    def test_cache_hit_runs_no_queries(self):
+        with self.assertNumQueries(1):
+            user, token = self.authenticate()
+        with self.assertNumQueries(0):
+            cached_user, cached_token = self.authenticate()
+        self.assertEqual(cached_user, self.user)
+        self.assertEqual(cached_token.key, self.key)
+        self.assertIsNot(cached_user, user)
+
+    def test_deleted_token_is_invalidated(self):
+        self.authenticate()
+        self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_deactivated_user_is_invalidated(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_deleted_user_is_invalidated(self):
+        self.authenticate()
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    @override_settings(**SHARED_CACHE_SETTINGS)
+    def test_shared_cache_backend(self):
+        with self.assertNumQueries(1):
+            self.authenticate()
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate()
+        self.assertEqual(user, self.user)
+        self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    @override_settings(**SHARED_CACHE_SETTINGS)
+    def test_shared_cache_clear_keeps_other_entries(self):
+        caches["tokens"].set("other", "kept")
+        self.authenticate()
+        get_token_cache().clear()
+        self.assertEqual(caches["tokens"].get("other"), "kept")
+        with self.assertNumQueries(1):
+            self.authenticate()
+        # An evicted generation doesn't bring the older entries back.
+        caches["tokens"].delete("auth-token-generation")
+        self.assertIsNone(get_token_cache().get(self.key))
+
+    @override_settings(**SHARED_CACHE_SETTINGS)
+    async def test_shared_cache_read_with_async_api(self):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION="Token " + self.key)
+        await sync_to_async(self.authentication.authenticate)(request)
+        with mock.patch.object(
+            LocMemCache, "aget_many", autospec=True, side_effect=BaseCache.aget_many
+        ) as aget_many, mock.patch.object(CachedTokenAuthentication, "authenticate") as authenticate:
+            user, token = await self.authentication.aauthenticate(request)
+        aget_many.assert_awaited_once()
+        authenticate.assert_not_called()
+        self.assertEqual(user.pk, self.user.pk)
+
+
+class LocalTokenCacheTestCase(TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LocalTokenCache(max_size=2, timeout=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_expired_entry_is_dropped(self):
+        cache = LocalTokenCache(max_size=2, timeout=60)
+        with mock.patch("employment_portal.authentication.time.monotonic", return_value=100):
+            cache.set("a", 1)
+        with mock.patch("employment_portal.authentication.time.monotonic", return_value=161):
+            self.assertIsNone(cache.get("a"))
+
+    @override_settings(CACHES=SHARED_CACHE_SETTINGS["CACHES"])
+    def test_revocations_reach_other_processes(self):
+        # Two processes sharing the "tokens" cache, the second one drops its entries after its next check.
+        processes = [LocalTokenCache(max_size=2, timeout=60, revocations="tokens", check_interval=5) for _ in range(2)]
+        with mock.patch("employment_portal.authentication.time.monotonic", return_value=100):
+            for cache in processes:
+                cache.get("a")
+                cache.set("a", 1)
+                cache.set("b", 2)
+            processes[0].delete("a")
+            self.assertIsNone(processes[0].get("a"))
+            self.assertEqual(processes[1].get("a"), 1)
+        with mock.patch("employment_portal.authentication.time.monotonic", return_value=105):
+            self.assertIsNone(processes[1].get("a"))
+            self.assertIsNone(processes[1].get("b"))
+            # The revoking process clears its entries too, the others may have revoked some meanwhile.
+            self.assertIsNone(processes[0].get("b"))
+
+
+SIGNED_TOKEN_SETTINGS = {
+    "SECRET_KEY": "test-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_LIFETIME": 60,
+    "REFRESH_TOKEN_LIFETIME": 600,
+}
+
+
+@override_settings(
+    SIGNED_TOKEN=SIGNED_TOKEN_SETTINGS,
+    REST_FRAMEWORK={
+        "DEFAULT_AUTHENTICATION_CLASSES": ["employment_portal.authentication.SignedTokenAuthentication"],
+        "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticated"],
+    },
+)
+class SignedTokenAuthenticationTestCase(TestCase):
+    def setUp(self):
+        get_bucket_store().clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.offer_list_view = OfferListView.as_view(authentication_classes=[SignedTokenAuthentication])
+
+    def login(self):
+        response = self.client.post(reverse("user-login"), {"username": "testuser", "password": "testpassword"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def list_offers(self, access_token):
+        request = APIRequestFactory().get("/api/offers/", HTTP_AUTHORIZATION="Bearer " + access_token)
+        return self.offer_list_view(request)
+
+    def test_login_issues_signed_tokens(self):
+        tokens = self.login()
+        self.assertEqual(tokens["user_id"], self.user.id)
+        self.assertNotIn("token", tokens)
+        self.assertFalse(Token.objects.exists())
+        self.assertEqual(decode_token(tokens["access"], ACCESS_TOKEN)["user_id"], self.user.id)
+
+    def test_access_token_is_verified_without_queries(self):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION="Bearer " + self.login()["access"])
+        with self.assertNumQueries(0):
+            user, claims = SignedTokenAuthentication().authenticate(request)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.username, "testuser")
+        self.assertEqual(self.list_offers(self.login()["access"]).status_code, status.HTTP_200_OK)
+
+    def test_refresh_token_is_not_an_access_token(self):
+        response = self.list_offers(self.login()["refresh"])
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tampered_and_expired_tokens_are_rejected(self):
+        access = self.login()["access"]
+        header, payload, signature = access.split(".")
+        self.assertEqual(self.list_offers(f"{header}.{payload}x.{signature}").status_code, status.HTTP_401_UNAUTHORIZED)
+        with override_settings(SIGNED_TOKEN={**SIGNED_TOKEN_SETTINGS, "SECRET_KEY": "other-secret"}):
+            self.assertEqual(self.list_offers(access).status_code, status.HTTP_401_UNAUTHORIZED)
+        with mock.patch("employment_portal.tokens.time.time", return_value=time.time() + 61):
+            self.assertEqual(self.list_offers(access).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh(self):
+        response = self.client.post(reverse("token-refresh"), {"refresh": self.login()["refresh"]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.list_offers(response.data["access"]).status_code, status.HTTP_200_OK)
+
+    def test_refresh_failure_inactive_user(self):
+        refresh = self.login()["refresh"]
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.post(reverse("token-refresh"), {"refresh": refresh})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_failure_access_token(self):
+        response = self.client.post(reverse("token-refresh"), {"refresh": self.login()["access"]})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,236 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from employment_portal.duplicates import (
+    band_buckets,
+    find_duplicate_offer,
+    jaccard,
+    lock_company_offers,
+    minhash,
+    offer_shingles,
+)
+from employment_portal.models import Company, Offer, OfferSignatureBand
+
+User = get_user_model()
+
+DESCRIPTION = (
+    "We are looking for a backend developer to build and maintain the REST APIs of our job board, "
+    "with Python and Django on PostgreSQL, working in a small remote team with weekly releases."
+)
+# The same offer reposted with a small edit.
+EDITED_DESCRIPTION = DESCRIPTION.replace("weekly releases", "weekly releases and code reviews")
+
+DUPLICATES = {"ACTION": "flag", "THRESHOLD": 0.8, "BANDS": 16, "ROWS": 4, "SHINGLE_SIZE": 3}
+
+
+@override_settings(OFFER_DUPLICATES=DUPLICATES)
+class OfferDuplicatesTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username="testuser", password="testpassword"))
+        self.company = Company.objects.create(name="Acme", nit="1")
+        self.other_company = Company.objects.create(name="Globex", nit="2")
+
+    def post_offer(self, description, skills="Python, Django", company=None):
+        data = {
+            "title": "Backend developer",
+            "description": description,
+            "salary": "3000.00",
+            "company": (company or self.company).pk,
+            "skills": skills,
+        }
+        return self.client.post(reverse("offer-create"), data)
+
+    def create_offer(self, description, **kwargs):
+        response = self.post_offer(description, **kwargs)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data
+
+    def test_shingles(self):
+        with override_settings(OFFER_DUPLICATES={**DUPLICATES, "SHINGLE_SIZE": 3}):
+            self.assertEqual(
+                offer_shingles("Build our Python APIs", "Python, Django"),
+                {"build our python", "our python apis", "skill:python", "skill:django"},
+            )
+            self.assertEqual(offer_shingles("Python", ""), {"python"})
+            self.assertEqual(offer_shingles("", ""), set())
+        self.assertEqual(jaccard({"a", "b"}, {"b", "c"}), 1 / 3)
+
+    def test_signatures(self):
+        shingles = offer_shingles(DESCRIPTION, "Python")
+        signature = minhash(shingles)
+        self.assertEqual(len(signature), 64)
+        self.assertEqual(signature, minhash(set(shingles)))
+        self.assertEqual(minhash(set()), [])
+        buckets = band_buckets(self.company.pk, signature)
+        self.assertEqual(len(buckets), 16)
+        # The buckets of a company never match the buckets of another company.
+        self.assertFalse(set(buckets) & set(band_buckets(self.other_company.pk, signature)))
+
+    def test_near_duplicate_flagged(self):
+        original = self.create_offer(DESCRIPTION)
+        self.assertIsNone(original["duplicate_of"])
+        self.assertEqual(OfferSignatureBand.objects.filter(offer_id=original["id"]).count(), 16)
+
+        with self.assertNumQueries(12):
+            duplicate = self.create_offer(EDITED_DESCRIPTION)
+        self.assertEqual(duplicate["duplicate_of"], original["id"])
+        self.assertEqual(Offer.objects.get(pk=duplicate["id"]).duplicate_of_id, original["id"])
+
+        other_company = self.create_offer(DESCRIPTION, company=self.other_company)
+        self.assertIsNone(other_company["duplicate_of"])
+        different = self.create_offer("Frontend developer for our React single page application.", skills="React")
+        self.assertIsNone(different["duplicate_of"])
+
+    @override_settings(OFFER_DUPLICATES={**DUPLICATES, "ACTION": "reject"})
+    def test_near_duplicate_rejected(self):
+        original = self.create_offer(DESCRIPTION)
+        response = self.post_offer(EDITED_DESCRIPTION)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["description"], [f"Near-duplicate of offer {original['id']} of the same company."]
+        )
+        self.assertEqual(Offer.objects.count(), 1)
+        self.create_offer(DESCRIPTION, skills="Rust, Go, Kubernetes, Terraform, AWS, GCP, Azure, Kafka")
+
+    @override_settings(OFFER_DUPLICATES={**DUPLICATES, "ACTION": "off"})
+    def test_check_disabled(self):
+        self.create_offer(DESCRIPTION)
+        self.assertIsNone(self.create_offer(DESCRIPTION)["duplicate_of"])
+        self.assertEqual(OfferSignatureBand.objects.count(), 32)
+
+    def test_updated_and_deleted_offers(self):
+        original = self.create_offer(DESCRIPTION)
+        url = reverse("offer-update", args=[original["id"]])
+        response = self.client.patch(url, {"description": "Data engineer building our Spark pipelines."})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(find_duplicate_offer(self.company.pk, DESCRIPTION, "Python, Django"))
+
+        response = self.client.patch(url, {"description": DESCRIPTION, "company": self.other_company.pk})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(find_duplicate_offer(self.company.pk, DESCRIPTION, "Python, Django"))
+        self.assertEqual(
+            find_duplicate_offer(self.other_company.pk, DESCRIPTION, "Python, Django"), (original["id"], 1)
+        )
+        self.assertIsNone(
+            find_duplicate_offer(self.other_company.pk, DESCRIPTION, "Python, Django", exclude=original["id"])
+        )
+
+        duplicate = self.create_offer(DESCRIPTION, company=self.other_company)
+        Offer.objects.get(pk=original["id"]).delete()
+        self.assertIsNone(Offer.objects.get(pk=duplicate["id"]).duplicate_of_id)
+        self.assertFalse(OfferSignatureBand.objects.filter(offer_id=original["id"]).exists())
+
+    def test_duplicate_recomputed_on_update(self):
+        original = self.create_offer(DESCRIPTION)
+        other = self.create_offer("Frontend developer for our React single page application.", skills="React")
+        url = reverse("offer-update", args=[other["id"]])
+        response = self.client.patch(url, {"description": EDITED_DESCRIPTION, "skills": "Python, Django"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["duplicate_of"], original["id"])
+        # The newer offer isn't a duplicate the original can be flagged against.
+        response = self.client.patch(reverse("offer-update", args=[original["id"]]), {"skills": "Python, Django, SQL"})
+        self.assertIsNone(response.data["duplicate_of"])
+        response = self.client.patch(url, {"description": "Data engineer building our Spark pipelines."})
+        self.assertIsNone(response.data["duplicate_of"])
+        # Updates that don't change the text keep it.
+        Offer.objects.filter(pk=other["id"]).update(duplicate_of_id=original["id"])
+        response = self.client.patch(url, {"title": "Data engineer"})
+        self.assertEqual(response.data["duplicate_of"], original["id"])
+
+    @override_settings(OFFER_DUPLICATES={**DUPLICATES, "ACTION": "reject"})
+    def test_near_duplicate_update_rejected(self):
+        original = self.create_offer(DESCRIPTION)
+        other = self.create_offer("Frontend developer for our React single page application.", skills="React")
+        response = self.client.patch(
+            reverse("offer-update", args=[other["id"]]), {"description": DESCRIPTION, "skills": "Python, Django"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["description"], [f"Near-duplicate of offer {original['id']} of the same company."]
+        )
+        self.assertEqual(Offer.objects.get(pk=other["id"]).skills, "React")
+
+    def test_company_locked_during_check(self):
+        with mock.patch("employment_portal.views.lock_company_offers", wraps=lock_company_offers) as lock:
+            self.create_offer(DESCRIPTION)
+        lock.assert_called_once_with(self.company.pk)
+
+    def test_bulk_created_offers(self):
+        payload = [
+            {"title": "A", "description": DESCRIPTION, "salary": "100.00", "company": self.company.pk, "skills": "Go"},
+            {"title": "B", "description": "D", "salary": "100.00", "company": self.company.pk, "skills": "SQL"},
+        ]
+        response = self.client.post(reverse("offer-bulk-create"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(OfferSignatureBand.objects.count(), 32)
+        duplicate = self.create_offer(EDITED_DESCRIPTION, skills="Go")
+        self.assertEqual(duplicate["duplicate_of"], response.data["created"][0]["id"])
+
+    def bulk_item(self, description, skills="Python, Django", company=None):
+        return {
+            "title": "Backend developer",
+            "description": description,
+            "salary": "3000.00",
+            "company": (company or self.company).pk,
+            "skills": skills,
+        }
+
+    def test_bulk_repost_flagged(self):
+        original = self.create_offer(DESCRIPTION)
+        payload = [
+            self.bulk_item(EDITED_DESCRIPTION),
+            self.bulk_item("Frontend developer for our React single page application.", skills="React"),
+            self.bulk_item("Frontend developer for our React single page application!", skills="React"),
+            self.bulk_item(DESCRIPTION, company=self.other_company),
+        ]
+        with mock.patch("employment_portal.serializers.lock_company_offers", wraps=lock_company_offers) as lock:
+            response = self.client.post(reverse("offer-bulk-create"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(sorted(lock.call_args.args), sorted([self.company.pk, self.other_company.pk]))
+        created = response.data["created"]
+        self.assertEqual([offer["duplicate_of"] for offer in created], [original["id"], None, created[1]["id"], None])
+        self.assertEqual(Offer.objects.get(pk=created[2]["id"]).duplicate_of_id, created[1]["id"])
+
+    @override_settings(OFFER_DUPLICATES={**DUPLICATES, "ACTION": "reject"})
+    def test_bulk_repost_rejected(self):
+        original = self.create_offer(DESCRIPTION)
+        payload = [
+            self.bulk_item(EDITED_DESCRIPTION),
+            {"title": "Invalid"},
+            self.bulk_item("Frontend developer for our React single page application.", skills="React"),
+            self.bulk_item("Frontend developer for our React single page application!", skills="React"),
+        ]
+        response = self.client.post(reverse("offer-bulk-create"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["created"]), 1)
+        errors = response.data["errors"]
+        self.assertEqual([error["index"] for error in errors], [0, 1, 3])
+        self.assertEqual(
+            errors[0]["errors"]["description"], [f"Near-duplicate of offer {original['id']} of the same company."]
+        )
+        self.assertEqual(errors[2]["errors"]["description"], ["Near-duplicate of item 2 of the same company."])
+        self.assertEqual(Offer.objects.count(), 2)
+
+        response = self.client.post(reverse("offer-bulk-create"), [self.bulk_item(DESCRIPTION)], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["created"], [])
+
+    def test_rebuild_command(self):
+        original = Offer.objects.create(
+            title="T", description=DESCRIPTION, salary="100.00", company=self.company, skills="Python, Django"
+        )
+        Offer.objects.create(title="T", description="", salary="100.00", company=self.company, skills="")
+        stdout = StringIO()
+        call_command("rebuild_offer_signatures", batch_size=1, stdout=stdout)
+        self.assertEqual(stdout.getvalue().strip(), "Indexed the signature bands of 2 offers.")
+        # An offer without shingles has no bands.
+        self.assertEqual(OfferSignatureBand.objects.count(), 16)
+        self.assertEqual(self.create_offer(EDITED_DESCRIPTION)["duplicate_of"], original.pk)
@@ -0,0 +1,138 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from employment_portal.caching import COMPANY_VERSION_KEY, _get_version
+from employment_portal.facets import count_offer_facets, salary_band
+from employment_portal.models import Company, Offer, OfferFacet, Skill
+
+User = get_user_model()
+
+
+@override_settings(OFFER_FACETS={"SALARY_BAND_WIDTH": 1000, "LIMIT": 20})
+class OfferFacetsTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username="testuser", password="testpassword"))
+        self.company = Company.objects.create(name="Acme", nit="1")
+        self.other_company = Company.objects.create(name="Globex", nit="2")
+
+    def create_offer(self, salary, skills, company=None):
+        data = {
+            "title": "Offer",
+            "description": "Description",
+            "salary": salary,
+            "company": (company or self.company).pk,
+            "skills": skills,
+        }
+        response = self.client.post(reverse("offer-create"), data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Offer.objects.get(pk=response.data["id"])
+
+    def stored_facets(self) -> dict:
+        return {
+            (facet, key): count
+            for facet, key, count in OfferFacet.objects.exclude(offer_count=0).values_list("facet", "key", "offer_count")
+        }
+
+    def assertFacetsMatchOffers(self):
+        self.assertEqual(self.stored_facets(), dict(count_offer_facets()))
+
+    def test_salary_band(self):
+        self.assertEqual(salary_band(0), 0)
+        self.assertEqual(salary_band(999.99), 0)
+        self.assertEqual(salary_band(1000), 1)
+        self.assertEqual(salary_band(2500), 2)
+
+    def test_created_and_updated_offers(self):
+        offer = self.create_offer("1500.00", "Python, Django")
+        self.create_offer("1800.00", "python")
+        self.create_offer("3200.00", "React", company=self.other_company)
+        self.assertFacetsMatchOffers()
+        python = Skill.objects.get(name="python").pk
+        self.assertEqual(self.stored_facets()[OfferFacet.SKILL, python], 2)
+
+        url = reverse("offer-update", args=[offer.pk])
+        response = self.client.patch(url, {"salary": "5000.00", "company": self.other_company.pk})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFacetsMatchOffers()
+        response = self.client.patch(url, {"skills": "Django, Rust"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFacetsMatchOffers()
+        self.assertEqual(self.stored_facets()[OfferFacet.SKILL, python], 1)
+
+        offer.delete()
+        self.assertFacetsMatchOffers()
+        self.company.delete()
+        self.assertFacetsMatchOffers()
+
+    def test_deleted_company_offers(self):
+        # The offers of a deleted company are counted out with a few queries for all of them.
+        self.create_offer("1500.00", "Python, Django")
+        for salary in ("1800.00", "2500.00", "2600.00"):
+            self.create_offer(salary, "Python, Rust", company=self.other_company)
+        queries = []
+        for company in (self.company, self.other_company):
+            version = _get_version(COMPANY_VERSION_KEY.format(company.pk))
+            with CaptureQueriesContext(connection) as context:
+                company.delete()
+            queries.append(len(context.captured_queries))
+            self.assertFacetsMatchOffers()
+            self.assertNotEqual(_get_version(COMPANY_VERSION_KEY.format(company.pk)), version)
+        self.assertEqual(queries[0], queries[1])
+
+    def test_bulk_created_offers(self):
+        payload = [
+            {"title": "A", "description": "D", "salary": "100.00", "company": self.company.pk, "skills": "Go, SQL"},
+            {"title": "B", "description": "D", "salary": "900.00", "company": self.company.pk, "skills": "sql"},
+            {"title": "C", "description": "D", "salary": "1200.00", "company": self.other_company.pk, "skills": ""},
+        ]
+        response = self.client.post(reverse("offer-bulk-create"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFacetsMatchOffers()
+        self.assertEqual(self.stored_facets()[OfferFacet.SALARY, 0], 2)
+
+    def test_facets_endpoint(self):
+        self.create_offer("1500.00", "Python, Django")
+        self.create_offer("1800.00", "Python")
+        self.create_offer("3200.00", "React", company=self.other_company)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("offer-facets"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json()["salary"], [{"min": 1000, "max": 2000, "count": 2}, {"min": 3000, "max": 4000, "count": 1}]
+        )
+        self.assertEqual(
+            response.json()["companies"],
+            [{"id": self.company.pk, "name": "Acme", "count": 2}, {"id": self.other_company.pk, "name": "Globex", "count": 1}],
+        )
+        self.assertEqual([skill["name"] for skill in response.json()["skills"]], ["python", "django", "react"])
+
+        response = self.client.get(reverse("offer-facets"), {"limit": 1})
+        self.assertEqual(len(response.json()["companies"]), 1)
+        self.assertEqual(response.json()["skills"][0]["count"], 2)
+        self.assertEqual(self.client.get(reverse("offer-facets"), {"limit": 0}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_command(self):
+        self.create_offer("1500.00", "Python")
+        Offer.objects.create(title="T", description="D", salary="7000.00", company=self.company, skills="")
+        OfferFacet.objects.create(facet=OfferFacet.SKILL, key=999, offer_count=3)
+        stdout = StringIO()
+        call_command("rebuild_offer_facets", stdout=stdout)
+        # A created salary band, an updated company count and a deleted skill.
+        self.assertEqual(stdout.getvalue().strip(), "Fixed 3 facet buckets.")
+        self.assertFacetsMatchOffers()
+        self.assertFalse(OfferFacet.objects.filter(key=999).exists())
+
+    @override_settings(OFFER_FACETS={"SALARY_BAND_WIDTH": 500, "LIMIT": 20})
+    def test_rebuild_after_band_width_change(self):
+        Offer.objects.create(title="T", description="D", salary="1700.00", company=self.company, skills="")
+        call_command("rebuild_offer_facets", stdout=StringIO())
+        self.assertEqual(self.stored_facets()[OfferFacet.SALARY, 3], 1)
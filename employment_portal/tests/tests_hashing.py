@@ -0,0 +1,180 @@
+import threading
+import time
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, get_hasher
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from employment_portal.hashing import (
+    HashingBusy,
+    HashingExecutor,
+    averify_password,
+    get_hashing_executor,
+    rehash_password,
+    schedule_rehash,
+    verify_password,
+)
+from employment_portal.throttling import get_bucket_store
+
+User = get_user_model()
+
+HASHING_SETTINGS = {"ENABLED": True, "MAX_WORKERS": 1, "MAX_QUEUE": 0, "QUEUE_TIMEOUT": 0, "REHASH": True}
+
+
+def outdated_hash(password: str) -> str:
+    hasher = get_hasher()
+    return hasher.encode(password, hasher.salt(), iterations=1000)
+
+
+class HashingExecutorTestCase(SimpleTestCase):
+    def setUp(self):
+        self.executor = HashingExecutor(max_workers=1, max_queue=1, queue_timeout=0)
+        self.addCleanup(self.executor.shutdown)
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def block(self):
+        self.started.set()
+        self.release.wait(5)
+        return "blocked"
+
+    def test_run(self):
+        self.assertEqual(self.executor.run(sum, [1, 2]), 3)
+        self.assertEqual(self.executor.pending(), 0)
+        self.assertEqual(self.executor.stats.hashed, 1)
+
+    def test_full_queue_is_rejected(self):
+        running = threading.Thread(target=self.executor.run, args=(self.block,))
+        running.start()
+        self.started.wait(5)
+        queued = threading.Thread(target=self.executor.run, args=(sum, [1]))
+        queued.start()
+        while self.executor.pending() < 2:
+            time.sleep(0.01)
+        with self.assertRaises(HashingBusy) as raised:
+            self.executor.run(sum, [1])
+        self.assertEqual(raised.exception.wait, 1)
+        self.assertEqual(self.executor.stats.rejected, 1)
+        self.assertIsNone(self.executor.submit_if_idle(sum, [1]))
+        self.release.set()
+        running.join()
+        queued.join()
+        self.assertEqual(self.executor.pending(), 0)
+        self.assertEqual(self.executor.submit_if_idle(sum, [1]).result(), 1)
+
+    def test_arun(self):
+        self.assertEqual(async_to_sync(self.executor.arun)(sum, [1, 2]), 3)
+        self.assertEqual(self.executor.pending(), 0)
+        self.assertEqual(self.executor.stats.hashed, 1)
+
+    def test_arun_full_queue_is_rejected(self):
+        with mock.patch.object(self.executor, "_acquire", return_value=False):
+            with self.assertRaises(HashingBusy):
+                async_to_sync(self.executor.arun)(sum, [1])
+        self.assertEqual(self.executor.stats.rejected, 1)
+
+
+@override_settings(PASSWORD_HASHING=HASHING_SETTINGS)
+class PasswordHashingTestCase(TestCase):
+    def setUp(self):
+        get_bucket_store().clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+
+    def test_passwords_hashed_on_executor(self):
+        stats = get_hashing_executor().stats
+        hashed = stats.hashed
+        response = self.client.post(reverse("user-login"), {"username": "testuser", "password": "testpassword"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.post(reverse("user-login"), {"username": "testuser", "password": "wrong"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # An unknown username is hashed too.
+        response = self.client.post(reverse("user-login"), {"username": "unknown", "password": "testpassword"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        data = {
+            "username": "newuser",
+            "password": "newpassword",
+            "identification_number": "2",
+            "email": "newuser@EXAMPLE.com",
+            "first_name": "New",
+            "last_name": "User",
+        }
+        response = self.client.post(reverse("user-register"), data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(stats.hashed, hashed + 4)
+        user = User.objects.get(username="newuser")
+        self.assertEqual(user.email, "newuser@example.com")
+        self.assertTrue(check_password("newpassword", user.password))
+
+    def test_inactive_user_cant_log_in(self):
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.post(reverse("user-login"), {"username": "testuser", "password": "testpassword"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_model_methods_hash_inline(self):
+        # The admin and the management commands don't go through the pool.
+        stats = get_hashing_executor().stats
+        hashed = stats.hashed
+        with mock.patch.object(HashingExecutor, "run", side_effect=HashingBusy(2)):
+            self.user.set_password("newpassword")
+            self.assertTrue(self.user.check_password("newpassword"))
+            self.assertFalse(self.user.check_password("wrong"))
+        self.assertEqual(stats.hashed, hashed)
+
+    def test_averify_password(self):
+        stats = get_hashing_executor().stats
+        hashed = stats.hashed
+        self.assertTrue(async_to_sync(averify_password)("testpassword", self.user))
+        self.assertFalse(async_to_sync(averify_password)("wrong", self.user))
+        self.assertEqual(stats.hashed, hashed + 2)
+
+    def test_busy_executor_answers_503(self):
+        with mock.patch.object(HashingExecutor, "run", side_effect=HashingBusy(2)):
+            response = self.client.post(reverse("user-login"), {"username": "testuser", "password": "testpassword"})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response["Retry-After"], "2")
+
+    def test_outdated_hash_rehashed_in_background(self):
+        self.user.password = outdated_hash("testpassword")
+        self.user.save()
+        with mock.patch("employment_portal.hashing.schedule_rehash") as schedule:
+            response = self.client.post(reverse("user-login"), {"username": "testuser", "password": "testpassword"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        schedule.assert_called_once_with(User, self.user.pk, self.user.password, "testpassword")
+        # Not on the request thread.
+        self.user.refresh_from_db()
+        self.assertTrue(get_hasher().must_update(self.user.password))
+
+    def test_rehash_password(self):
+        encoded = outdated_hash("testpassword")
+        User.objects.filter(pk=self.user.pk).update(password=encoded)
+        self.assertTrue(rehash_password(User, self.user.pk, encoded, "testpassword"))
+        self.user.refresh_from_db()
+        self.assertFalse(get_hasher().must_update(self.user.password))
+        self.assertTrue(self.user.check_password("testpassword"))
+        # The password was changed since the outdated hash was read.
+        self.assertFalse(rehash_password(User, self.user.pk, encoded, "testpassword"))
+
+    def test_rehash_skipped_when_busy(self):
+        executor = get_hashing_executor()
+        skipped = executor.stats.rehash_skipped
+        with mock.patch.object(executor, "submit_if_idle", return_value=None):
+            self.assertFalse(schedule_rehash(User, self.user.pk, self.user.password, "testpassword"))
+        self.assertEqual(executor.stats.rehash_skipped, skipped + 1)
+
+    @override_settings(PASSWORD_HASHING={**HASHING_SETTINGS, "ENABLED": False})
+    def test_disabled_rehashes_inline(self):
+        self.assertIsNone(get_hashing_executor())
+        self.user.password = outdated_hash("testpassword")
+        self.user.save()
+        self.assertTrue(verify_password("testpassword", self.user))
+        self.user.refresh_from_db()
+        self.assertIsInstance(get_hasher(), PBKDF2PasswordHasher)
+        self.assertFalse(get_hasher().must_update(self.user.password))
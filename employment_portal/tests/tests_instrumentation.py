@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from employment_portal.instrumentation import QueryBudgetExceeded
+from employment_portal.models import Company, Offer
+from employment_portal.views import OfferListView
+
+User = get_user_model()
+
+
+class RequestMetricsMiddlewareTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        company = Company.objects.create(name="Test Company", nit="1234567890")
+        Offer.objects.create(
+            title="Test Offer", description="Test Offer Description", salary=1000, company=company, skills="Python"
+        )
+        self.list_offer_url = reverse("offer-list")
+
+    def test_server_timing_header(self):
+        response = self.client.get(self.list_offer_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        server_timing = response["Server-Timing"]
+        self.assertRegex(server_timing, r'^db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn("serializer;dur=", server_timing)
+        self.assertIn("total;dur=", server_timing)
+
+    def test_request_metrics_are_logged(self):
+        with self.assertLogs("employment_portal.instrumentation", "INFO") as logs:
+            self.client.get(self.list_offer_url)
+        metrics = logs.records[-1].request_metrics
+        self.assertEqual(metrics["path"], self.list_offer_url)
+        self.assertEqual(metrics["status"], status.HTTP_200_OK)
+        self.assertGreater(metrics["queries"], 0)
+
+    @override_settings(QUERY_BUDGET_ENFORCE=True)
+    def test_query_budget_exceeded_fails_when_enforced(self):
+        with mock.patch.object(OfferListView, "query_budget", 1):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(self.list_offer_url)
+
+    @override_settings(QUERY_BUDGET_ENFORCE=False)
+    def test_query_budget_exceeded_logs_warning(self):
+        with mock.patch.object(OfferListView, "query_budget", 1):
+            with self.assertLogs("employment_portal.instrumentation", "WARNING") as logs:
+                response = self.client.get(self.list_offer_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("its budget is 1", logs.output[-1])
@@ -1,5 +1,11 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
-from employment_portal.models import ApplicantUser, Company, Offer, Postulation
+from django.test.utils import CaptureQueriesContext
+from employment_portal.models import ApplicantUser, Company, Offer, Postulation, Skill
+from employment_portal.skills import parse_skills, sync_offer_skills
 
 
 class ApplicantUserModelTestCase(TestCase):
@@ -75,3 +81,92 @@ class PostulationModelTestCase(TestCase):
 
         self.assertEqual(postulation.user, user)
         self.assertEqual(postulation.offer, offer)
+
+
+class SkillModelTestCase(TestCase):
+    def test_str_representation(self):
+        skill = Skill.objects.create(name="python")
+        self.assertEqual(str(skill), "python")
+
+    def test_parse_skills(self):
+        self.assertEqual(parse_skills("Python,  Django;django REST\n python |"), ["python", "django", "django rest"])
+        self.assertEqual(parse_skills(""), [])
+
+    def test_sync_offer_skills(self):
+        company = Company.objects.create(name="Test Company", nit="1234567890")
+        offer = Offer.objects.create(
+            title="Test Offer",
+            description="Test Offer Description",
+            salary=50000.0,
+            company=company,
+            skills="Python, Django",
+        )
+        sync_offer_skills(offer)
+        self.assertEqual(sorted(offer.skill_set.values_list("name", flat=True)), ["django", "python"])
+
+        offer.skills = "Django, React"
+        sync_offer_skills(offer)
+        self.assertEqual(sorted(offer.skill_set.values_list("name", flat=True)), ["django", "react"])
+        self.assertEqual(Skill.objects.count(), 3)
+
+
+class PostulationCountTestCase(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Company", nit="1234567890")
+        self.offers = [
+            Offer.objects.create(
+                title=f"Test Offer {index}",
+                description="Test Offer Description",
+                salary=50000.0,
+                company=self.company,
+                skills="Python, Django",
+            )
+            for index in range(3)
+        ]
+        self.users = [
+            ApplicantUser.objects.create(username=f"testuser{index}", identification_number=str(index))
+            for index in range(2)
+        ]
+
+    def test_counts_follow_postulations(self):
+        for user in self.users:
+            Postulation.objects.create(user=user, offer=self.offers[0])
+        self.users[0].delete()
+        self.offers[0].refresh_from_db()
+        self.company.refresh_from_db()
+        self.assertEqual(self.offers[0].postulation_count, 1)
+        self.assertEqual(self.company.postulation_count, 1)
+
+    def test_counts_follow_deleted_offers(self):
+        for offer in self.offers[:2]:
+            Postulation.objects.create(user=self.users[0], offer=offer)
+        self.offers[0].delete()
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.postulation_count, 1)
+        self.company.delete()
+        self.assertFalse(Postulation.objects.exists())
+
+    def test_cascade_deletion_cost(self):
+        # The postulations of a deleted user are deleted with one query, not loaded one by one.
+        queries = []
+        for user, offers in zip(self.users, (self.offers[:1], self.offers)):
+            Postulation.objects.bulk_create([Postulation(user=user, offer=offer) for offer in offers])
+            with CaptureQueriesContext(connection) as context:
+                user.delete()
+            queries.append(len(context.captured_queries))
+        self.assertEqual(queries[0], queries[1])
+        self.assertEqual(list(Offer.objects.values_list("postulation_count", flat=True)), [0, 0, 0])
+
+    def test_reconcile_postulation_counts_command(self):
+        Postulation.objects.bulk_create(
+            [Postulation(user=user, offer=offer) for user in self.users for offer in self.offers[:2]]
+        )
+        Offer.objects.filter(pk=self.offers[2].pk).update(postulation_count=7)
+        out = StringIO()
+        call_command("reconcile_postulation_counts", "--batch-size", "2", stdout=out)
+        self.assertIn("Fixed 3 offers and 1 companies.", out.getvalue())
+        self.assertEqual(
+            list(Offer.objects.order_by("pk").values_list("postulation_count", flat=True)), [2, 2, 0]
+        )
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.postulation_count, 4)
@@ -0,0 +1,77 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+from employment_portal.openapi import FINGERPRINT_FIELD, read_schema, schema_cache, urlconf_fingerprint
+
+
+class OpenAPISchemaTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "openapi.json"
+        settings_override = override_settings(OPENAPI_SCHEMA={"PATH": str(self.path)})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def count_generations(self):
+        return mock.patch.object(
+            OpenAPISchemaGenerator, "get_schema", autospec=True, side_effect=OpenAPISchemaGenerator.get_schema
+        )
+
+    def test_schema_generated_once(self):
+        with self.count_generations() as get_schema:
+            first = self.client.get("/swagger.json")
+            second = self.client.get("/swagger.json")
+        self.assertEqual(get_schema.call_count, 1)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first["Content-Type"], "application/json")
+        self.assertEqual(first.content, second.content)
+        schema = first.json()
+        self.assertIn("/offers/", schema["paths"])
+        self.assertEqual(schema[FINGERPRINT_FIELD], urlconf_fingerprint())
+
+    def test_schema_formats(self):
+        response = self.client.get("/swagger.yaml")
+        self.assertEqual(response["Content-Type"], "application/yaml")
+        self.assertIn(b"swagger: '2.0'", response.content)
+        response = self.client.get("/swagger/", {"format": "openapi"})
+        self.assertEqual(response["Content-Type"], "application/openapi+json")
+        self.assertEqual(response.content, self.client.get("/swagger.json").content)
+        self.assertEqual(self.client.get("/redoc/").status_code, 200)
+
+    def test_built_schema_is_served(self):
+        call_command("build_openapi_schema", stdout=StringIO())
+        schema = read_schema(self.path)
+        schema["info"]["title"] = "Built at deploy time"
+        self.path.write_text(json.dumps(schema))
+        schema_cache.clear()
+        with self.count_generations() as get_schema:
+            response = self.client.get("/swagger.json")
+        get_schema.assert_not_called()
+        self.assertEqual(response.json()["info"]["title"], "Built at deploy time")
+
+    def test_stale_schema_is_generated_again(self):
+        call_command("build_openapi_schema", stdout=StringIO())
+        schema = read_schema(self.path)
+        schema[FINGERPRINT_FIELD] = "stale"
+        self.path.write_text(json.dumps(schema))
+        schema_cache.clear()
+        with self.assertLogs("employment_portal.openapi", "WARNING"):
+            response = self.client.get("/swagger.json")
+        self.assertEqual(response.json()[FINGERPRINT_FIELD], urlconf_fingerprint())
+
+    def test_urlconf_change_invalidates_schema(self):
+        self.client.get("/swagger.json")
+        self.assertNotEqual(urlconf_fingerprint("employment_portal.urls"), urlconf_fingerprint())
+        with mock.patch("employment_portal.openapi.urlconf_fingerprint", return_value="changed"):
+            with self.count_generations() as get_schema:
+                self.client.get("/swagger.json")
+                self.client.get("/swagger.json")
+        self.assertEqual(get_schema.call_count, 1)
@@ -0,0 +1,108 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from employment_portal.models import OutboxEmail
+from employment_portal.outbox import queue_email, send_queued_emails
+from employment_portal.throttling import get_bucket_store
+
+EMAIL_OUTBOX_SETTINGS = {"BATCH_SIZE": 2, "MAX_ATTEMPTS": 2, "RETRY_BACKOFF": 60, "MAX_BACKOFF": 3600, "LEASE": 600}
+
+
+@override_settings(EMAIL_OUTBOX=EMAIL_OUTBOX_SETTINGS)
+class OutboxTestCase(TestCase):
+    def queue(self, index):
+        return queue_email(f"Subject {index}", "Message", "noreply@example.com", [f"user{index}@example.com"])
+
+    def test_registration_queues_email_without_sending(self):
+        get_bucket_store().clear()
+        data = {"username": "testuser", "password": "testpassword", "identification_number": "1", "email": "t@example.com"}
+        APIClient().post(reverse("user-register"), data)
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.recipient_list, ["t@example.com"])
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+
+    def test_send_queued_emails_in_batches_over_one_connection(self):
+        for index in range(3):
+            self.queue(index)
+        with mock.patch("employment_portal.outbox.get_connection", wraps=mail.get_connection) as get_connection:
+            self.assertEqual(send_queued_emails(), (2, 0))
+        get_connection.assert_called_once()
+        self.assertEqual([message.subject for message in mail.outbox], ["Subject 0", "Subject 1"])
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.SENT).count(), 2)
+
+        self.assertEqual(send_queued_emails(), (1, 0))
+        self.assertEqual(send_queued_emails(), (0, 0))
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_claimed_batch_is_skipped_while_sent(self):
+        self.queue(0)
+        other_worker = []
+
+        def send(message):
+            # Another worker running while the mail server answers finds nothing to send.
+            other_worker.append(send_queued_emails())
+            return 1
+
+        with mock.patch("django.core.mail.EmailMessage.send", autospec=True, side_effect=send):
+            self.assertEqual(send_queued_emails(), (1, 0))
+        self.assertEqual(other_worker, [(0, 0)])
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.SENT)
+
+    def test_unrecorded_batch_is_sent_after_the_lease(self):
+        email = self.queue(0)
+        # The worker stopped after claiming the batch.
+        with mock.patch("employment_portal.outbox.get_connection", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                send_queued_emails()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), (OutboxEmail.PENDING, 0))
+        self.assertEqual(send_queued_emails(), (0, 0))
+        with mock.patch("employment_portal.outbox.timezone.now", return_value=timezone.now() + timedelta(seconds=601)):
+            self.assertEqual(send_queued_emails(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failed_email_is_retried_with_backoff(self):
+        email = self.queue(0)
+        with self.assertLogs("employment_portal.outbox", "WARNING"), mock.patch(
+            "django.core.mail.EmailMessage.send", side_effect=ConnectionError("refused")
+        ):
+            self.assertEqual(send_queued_emails(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.last_error, "refused")
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+
+        self.assertEqual(send_queued_emails(), (0, 0))
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        with self.assertLogs("employment_portal.outbox", "WARNING"), mock.patch(
+            "django.core.mail.EmailMessage.send", side_effect=ConnectionError("refused")
+        ):
+            self.assertEqual(send_queued_emails(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.FAILED)
+
+    def test_connection_failure_postpones_the_batch(self):
+        self.queue(0)
+        self.queue(1)
+        with self.assertLogs("employment_portal.outbox", "WARNING"), mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.open", side_effect=OSError("down")
+        ):
+            self.assertEqual(send_queued_emails(), (0, 2))
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.PENDING, attempts=1).count(), 2)
+
+    def test_send_queued_emails_command(self):
+        self.queue(0)
+        out = StringIO()
+        call_command("send_queued_emails", stdout=out)
+        self.assertIn("Sent 1 emails, 0 failed.", out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
@@ -0,0 +1,134 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from employment_portal.db.pool import ConnectionPool, PoolClosed, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+        self.resets = 0
+
+    def close(self):
+        self.closed = True
+
+
+def check(connection):
+    if connection.broken:
+        raise ConnectionError("broken")
+
+
+def reset(connection):
+    if connection.broken:
+        raise ConnectionError("broken")
+    connection.resets += 1
+
+
+class ConnectionPoolTestCase(SimpleTestCase):
+    def make_pool(self, **kwargs):
+        options = {
+            "connect": FakeConnection,
+            "max_size": 2,
+            "timeout": 0.05,
+            "health_check_interval": 30,
+            "max_lifetime": 0,
+            "check": check,
+            "reset": reset,
+            "name": "test",
+        }
+        return ConnectionPool(**{**options, **kwargs})
+
+    def test_connections_are_reused(self):
+        pool = self.make_pool()
+        connection = pool.checkout()
+        pool.checkin(connection)
+        self.assertIs(pool.checkout(), connection)
+        self.assertEqual(connection.resets, 1)
+        self.assertEqual(pool.stats.created, 1)
+        self.assertEqual(pool.stats.checkouts, 2)
+
+    def test_checkout_waits_for_a_free_connection(self):
+        pool = self.make_pool(max_size=1, timeout=5)
+        connection = pool.checkout()
+        threading.Timer(0.05, pool.checkin, [connection]).start()
+        with self.assertLogs("employment_portal.db.pool", "WARNING"):
+            self.assertIs(pool.checkout(), connection)
+        self.assertEqual(pool.stats.waits, 1)
+        self.assertGreater(pool.stats.wait_time, 0)
+
+    def test_checkout_timeout(self):
+        pool = self.make_pool(max_size=1)
+        pool.checkout()
+        with self.assertLogs("employment_portal.db.pool", "ERROR"), self.assertRaises(PoolTimeout):
+            pool.checkout()
+        self.assertEqual(pool.stats.timeouts, 1)
+
+    def test_broken_idle_connection_is_replaced(self):
+        pool = self.make_pool(health_check_interval=0)
+        connection = pool.checkout()
+        pool.checkin(connection)
+        connection.broken = True
+        with self.assertLogs("employment_portal.db.pool", "WARNING"):
+            replacement = pool.checkout()
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats.discarded, 1)
+
+    def test_failed_reset_discards_the_connection(self):
+        pool = self.make_pool(max_size=1)
+        connection = pool.checkout()
+        connection.broken = True
+        pool.checkin(connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.idle, 0)
+        # The slot of the discarded connection is free again.
+        self.assertIsNot(pool.checkout(), connection)
+
+    def test_expired_connection_is_closed(self):
+        pool = self.make_pool(max_lifetime=60)
+        connection = pool.checkout()
+        with mock.patch("employment_portal.db.pool.time.monotonic", return_value=10**9):
+            pool.checkin(connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.idle, 0)
+
+    def test_connect_error_frees_the_slot(self):
+        pool = self.make_pool(max_size=1, connect=mock.Mock(side_effect=[ConnectionError("down"), FakeConnection()]))
+        with self.assertLogs("employment_portal.db.pool", "ERROR"), self.assertRaises(ConnectionError):
+            pool.checkout()
+        self.assertIsInstance(pool.checkout(), FakeConnection)
+        self.assertEqual(pool.stats.errors, 1)
+
+    def test_stats_are_logged(self):
+        pool = self.make_pool(log_interval=0.001)
+        pool._logged_at = 0
+        with self.assertLogs("employment_portal.db.pool", "INFO") as logs:
+            pool.checkout()
+        self.assertEqual(logs.records[-1].pool_stats["checkouts"], 1)
+        self.assertEqual(logs.records[-1].pool_stats["max_size"], 2)
+
+    def test_close_closes_idle_connections(self):
+        pool = self.make_pool()
+        connections = [pool.checkout(), pool.checkout()]
+        pool.checkin(connections[0])
+        pool.close()
+        self.assertTrue(connections[0].closed)
+        self.assertFalse(connections[1].closed)
+        # Returned after close(), it isn't kept idle.
+        pool.checkin(connections[1])
+        self.assertTrue(connections[1].closed)
+        self.assertEqual(pool.idle, 0)
+        with self.assertRaises(PoolClosed):
+            pool.checkout()
+
+    def test_creation_time_stored_on_connection(self):
+        pool = self.make_pool(max_lifetime=60)
+        with mock.patch("employment_portal.db.pool.time.monotonic", return_value=100):
+            connection = pool.checkout()
+        self.assertEqual(connection.pool_created_at, 100)
+        with mock.patch("employment_portal.db.pool.time.monotonic", return_value=150):
+            pool.checkin(connection)
+        self.assertFalse(connection.closed)
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from employment_portal.models import Company, Offer, Postulation
+from employment_portal.read_serializers import ValuesSerializer, get_values_serializer
+from employment_portal.serializers import CompanySerializer, OfferSerializer, PostulationSerializer
+
+User = get_user_model()
+
+
+class ValuesSerializerTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.company = Company.objects.create(name="Test Company", nit="1234567890")
+        self.offers = [
+            Offer.objects.create(
+                title=f"Oferta {index} ✓",
+                description="Test Offer Description",
+                salary="1234.5",
+                company=self.company,
+                skills="Python, Django" if index else "",
+            )
+            for index in range(3)
+        ]
+        Postulation.objects.create(user=self.user, offer=self.offers[0])
+
+    def assertParity(self, serializer_class, queryset):
+        expected = serializer_class(queryset, many=True).data
+        values_serializer = get_values_serializer(serializer_class)
+        rows = values_serializer.many_to_representation(values_serializer.values(queryset))
+        self.assertEqual(rows, expected)
+        self.assertEqual([list(row) for row in rows], [list(row) for row in expected])
+
+    def test_offer_parity(self):
+        self.assertParity(OfferSerializer, Offer.objects.order_by("id"))
+        with timezone.override("America/Bogota"):
+            self.assertParity(OfferSerializer, Offer.objects.order_by("id"))
+
+    def test_company_parity(self):
+        self.assertParity(CompanySerializer, Company.objects.order_by("id"))
+
+    def test_postulation_parity(self):
+        self.assertParity(PostulationSerializer, Postulation.objects.order_by("id"))
+
+    def test_unsupported_fields(self):
+        class OfferTitleSerializer(serializers.ModelSerializer):
+            company_name = serializers.CharField(source="company.name")
+
+            class Meta:
+                model = Offer
+                fields = ["id", "company_name"]
+
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer(OfferTitleSerializer)
+
+    def test_offer_list_parity(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION="Token " + Token.objects.create(user=self.user).key)
+        response = client.get(reverse("offer-list"), {"page_size": 2})
+        expected = OfferSerializer(Offer.objects.order_by("-created_at", "-id")[:2], many=True).data
+        self.assertEqual(response.json()["results"], expected)
+        response = client.get(response.data["next"])
+        self.assertEqual([offer["id"] for offer in response.json()["results"]], [self.offers[0].id])
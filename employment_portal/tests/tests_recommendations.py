@@ -0,0 +1,236 @@
+import fcntl
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+from employment_portal.authentication import SignedTokenAuthentication
+from employment_portal.models import Company, Offer
+from employment_portal.recommendations import OfferIndex, offer_recommender, offer_terms, tokenize
+from employment_portal.tokens import create_token_pair
+from employment_portal.views import OfferRecommendationView
+
+User = get_user_model()
+
+
+class OfferRecommendationsTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "offers.idx"
+        self.settings = {
+            "PATH": str(self.path),
+            "MAX_POSTINGS": 2000,
+            "MAX_QUERY_TERMS": 32,
+            "LIMIT": 10,
+            "CHANGES_INTERVAL": 0,
+            "MAX_CHANGES": 100,
+        }
+        settings_override = override_settings(OFFER_RECOMMENDATIONS=self.settings)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="testpassword",
+            profile_description="Backend developer with Python and Django, some PostgreSQL.",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.company = Company.objects.create(name="Acme", nit="1")
+        self.django = self.create_offer("Django developer", "Python, Django, PostgreSQL", "Build our Python APIs.")
+        self.python = self.create_offer("Data engineer", "Python, Airflow", "Pipelines in Python.")
+        self.react = self.create_offer("Frontend developer", "React, TypeScript", "Build our web app.")
+        self.ios = self.create_offer("iOS engineer", "Swift", "Ship the mobile app.")
+        # Built long ago, so the index doesn't see them as changed since it was built.
+        Offer.objects.update(updated_at=timezone.now() - timedelta(days=1))
+
+    def create_offer(self, title, skills, description):
+        return Offer.objects.create(
+            title=title, description=description, salary="1000.00", company=self.company, skills=skills
+        )
+
+    def build_index(self):
+        call_command("build_offer_recommendations", stdout=StringIO())
+
+    def recommended(self, **params):
+        response = self.client.get(reverse("offer-recommendations"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()["results"]
+
+    def test_tokenize(self):
+        self.assertEqual(
+            tokenize("Senior Python/Django developer, C++ and Node.js."),
+            ["senior", "python", "django", "developer", "c++", "node.js"],
+        )
+        self.assertEqual(
+            offer_terms("Python developer", "Python", "The python team"), {"python": 4, "developer": 1, "team": 1}
+        )
+
+    def test_recommended_offers(self):
+        self.build_index()
+        with self.assertNumQueries(3):
+            results = self.recommended()
+        self.assertEqual([result["id"] for result in results], [self.django.pk, self.python.pk, self.react.pk])
+        self.assertEqual(results[0]["title"], "Django developer")
+        self.assertGreater(results[0]["score"], results[1]["score"])
+        self.assertLessEqual(results[0]["score"], 1)
+
+        self.assertEqual(len(self.recommended(limit=1)), 1)
+        response = self.client.get(reverse("offer-recommendations"), {"limit": 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(
+        SIGNED_TOKEN={
+            "SECRET_KEY": "test-secret",
+            "ALGORITHM": "HS256",
+            "ACCESS_TOKEN_LIFETIME": 60,
+            "REFRESH_TOKEN_LIFETIME": 600,
+        }
+    )
+    def test_signed_token_user(self):
+        # The user of a signed token is rebuilt from its claims, without its profile description.
+        self.build_index()
+        view = OfferRecommendationView.as_view(authentication_classes=[SignedTokenAuthentication])
+        access = create_token_pair(self.user)["access"]
+        response = view(APIRequestFactory().get("/api/offers/recommended/", HTTP_AUTHORIZATION="Bearer " + access))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["id"], self.django.pk)
+
+    def test_changes_interval(self):
+        self.build_index()
+        self.recommended()
+        with override_settings(OFFER_RECOMMENDATIONS={**self.settings, "CHANGES_INTERVAL": 60}):
+            offer_recommender.recommend("", 10)
+            self.create_offer("Django developer", "Python, Django, PostgreSQL", "Build our Python APIs.")
+            # The changes were read less than CHANGES_INTERVAL seconds ago, only the profile and the offers are read.
+            with self.assertNumQueries(2):
+                self.assertEqual(len(self.recommended()), 3)
+
+    def test_top_matches_every_posting(self):
+        for index in range(20):
+            self.create_offer(f"Offer {index}", "Python" if index % 3 else "Go", f"Team {index % 5} with Django")
+        self.build_index()
+        index = OfferIndex(self.path)
+        query = {"python": 0.2, "django": 0.5, "go": 0.6, "team": 0.1, "5": 0.3, "swift": 0.4}
+        every = index.top(query, len(index.offer_ids))
+        for limit in (1, 3, 10):
+            self.assertEqual(index.top(query, limit), every[:limit])
+
+    def test_changed_offers(self):
+        self.build_index()
+        self.recommended()
+        response = self.client.post(
+            reverse("offer-create"),
+            {
+                "title": "Python developer",
+                "description": "Django and PostgreSQL backend.",
+                "salary": "2000.00",
+                "company": self.company.pk,
+                "skills": "Python, Django, PostgreSQL",
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        created = response.data["id"]
+        url = reverse("offer-update", args=[self.python.pk])
+        response = self.client.patch(url, {"skills": "Scala", "description": "Spark"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.react.delete()
+
+        ids = [result["id"] for result in self.recommended()]
+        self.assertEqual(set(ids[:2]), {self.django.pk, created})
+        self.assertNotIn(self.react.pk, ids)
+        self.assertNotIn(self.python.pk, ids)
+
+    def test_index_missing(self):
+        self.assertFalse(self.path.exists())
+        with self.assertLogs("employment_portal.recommendations", "ERROR"):
+            self.assertEqual(self.recommended(), [])
+        # The missing index is only logged once.
+        with self.assertNoLogs("employment_portal.recommendations", "ERROR"), self.assertNumQueries(1):
+            self.assertEqual(self.recommended(), [])
+        self.assertFalse(self.path.exists())
+        self.build_index()
+        self.assertEqual(self.recommended()[0]["id"], self.django.pk)
+
+    def test_rebuilt_after_max_changes(self):
+        self.build_index()
+        self.recommended()
+        for index in range(3):
+            self.create_offer(f"Go developer {index}", "Go", "Microservices in Go.")
+        with override_settings(OFFER_RECOMMENDATIONS={**self.settings, "MAX_CHANGES": 2}), mock.patch(
+            "employment_portal.recommendations.threading.Thread"
+        ) as thread:
+            recommended = self.recommended()
+            self.recommended()
+            # A single rebuild runs at a time.
+            thread.assert_called_once()
+            path, file_id = thread.call_args.kwargs["args"]
+            self.assertEqual(path, str(self.path))
+            offer_recommender._rebuild(path, file_id)
+        self.assertEqual(len(OfferIndex(self.path).offer_ids), 7)
+        self.assertEqual(len(self.recommended()), len(recommended))
+
+    def test_rebuild_by_one_process(self):
+        self.build_index()
+        self.recommended()
+        file_id = offer_recommender._file_id
+        with mock.patch("employment_portal.recommendations.build_offer_index") as build:
+            # Another process holds the lock.
+            with open(f"{self.path}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                offer_recommender._rebuild(str(self.path), file_id)
+            build.assert_not_called()
+            # Another process already replaced the loaded file.
+            offer_recommender._rebuild(str(self.path), (0, 0, 0))
+            build.assert_not_called()
+            offer_recommender._rebuild(str(self.path), file_id)
+            build.assert_called_once_with(str(self.path))
+
+    def test_changes_scored_from_snapshot(self):
+        self.build_index()
+        self.recommended()
+        changed = offer_recommender._changed
+        self.create_offer("Go developer", "Go", "Microservices in Go.")
+        self.recommended()
+        # The changes are new maps, the ones taken by a request in progress are left as they were.
+        self.assertIsNot(offer_recommender._changed, changed)
+        self.assertNotIn(Offer.objects.latest("pk").pk, changed)
+
+    def test_unknown_profile_terms(self):
+        self.build_index()
+        self.user.profile_description = "Carpenter"
+        self.user.save()
+        self.assertEqual(self.recommended(), [])
+        self.user.profile_description = ""
+        self.user.save()
+        self.assertEqual(self.recommended(), [])
+
+    def test_max_postings(self):
+        with override_settings(OFFER_RECOMMENDATIONS={**self.settings, "MAX_POSTINGS": 1}):
+            self.build_index()
+            index = OfferIndex(self.path)
+            # "python" only keeps the offer where it weighs the most.
+            rows = [row for row, _ in index.top({"python": 1.0}, 10)]
+            self.assertEqual([index.offer_ids[row] for row in rows], [self.python.pk])
+            self.assertEqual(len(self.recommended()), 3)
+
+    def test_build_command(self):
+        stdout = StringIO()
+        call_command("build_offer_recommendations", stdout=stdout)
+        self.assertIn("Wrote the index of 4 offers", stdout.getvalue())
+        index = OfferIndex(self.path)
+        self.assertEqual(sorted(index.offer_ids), sorted([self.django.pk, self.python.pk, self.react.pk, self.ios.pk]))
+        self.path.write_bytes(b"garbage")
+        offer_recommender.clear()
+        with self.assertLogs("employment_portal.recommendations", "ERROR"):
+            self.assertEqual(self.recommended(), [])
@@ -0,0 +1,68 @@
+import io
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from employment_portal.models import Company, Offer
+from employment_portal.parsers import ORJSONParser
+from employment_portal.renderers import ORJSONRenderer
+from employment_portal.serializers import OfferSerializer
+
+
+class ORJSONRendererTestCase(TestCase):
+    def assertSameRendering(self, data, accepted_media_type="application/json"):
+        expected = JSONRenderer().render(data, accepted_media_type)
+        self.assertEqual(ORJSONRenderer().render(data, accepted_media_type), expected)
+
+    def test_offers_rendering(self):
+        company = Company.objects.create(name="Test Company", nit="1234567890")
+        Offer.objects.create(
+            title="Desarrollador Python Señor", description="Descripción ✓", salary=1000, company=company
+        )
+        self.assertSameRendering(OfferSerializer(Offer.objects.all(), many=True).data)
+
+    def test_native_types_rendering(self):
+        self.assertSameRendering(
+            {
+                "decimal": Decimal("1234.50"),
+                "datetime": datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=timezone.utc),
+                "offset_datetime": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=-5))),
+                "naive_datetime": datetime(2024, 1, 2, 3, 4, 5),
+                "date": date(2024, 1, 2),
+                "uuid": uuid.uuid4(),
+                "timedelta": timedelta(minutes=5),
+                "lazy": gettext_lazy("Offer"),
+                "keys": {1: "a", 2: "b"},
+                "nested": [(1, 2), {"none": None, "bool": True}],
+            }
+        )
+
+    def test_escaped_line_separators(self):
+        self.assertSameRendering({"text": "line\u2028separator\u2029"})
+
+    def test_fallback_rendering(self):
+        self.assertSameRendering({"big": 2**70})
+        self.assertSameRendering({"id": 1}, "application/json; indent=4")
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+
+class ORJSONParserTestCase(TestCase):
+    def parse(self, parser, body, encoding="utf-8"):
+        return parser.parse(io.BytesIO(body), "application/json", {"encoding": encoding})
+
+    def test_same_parsing(self):
+        body = '{"title": "Señor", "salary": "1000.00", "company": 1, "skills": ["python"], "ratio": 0.5}'.encode()
+        self.assertEqual(self.parse(ORJSONParser(), body), self.parse(JSONParser(), body))
+        latin1 = '{"title": "Señor"}'.encode("latin-1")
+        self.assertEqual(self.parse(ORJSONParser(), latin1, "latin-1"), {"title": "Señor"})
+
+    def test_parse_errors(self):
+        for body in (b"{", b'{"salary": NaN}', b""):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                self.parse(ORJSONParser(), body)
@@ -0,0 +1,171 @@
+import asyncio
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from employment_portal.caching import DelayedVersionBumps, bump_offer_cache_versions
+from employment_portal.db.routers import (
+    PrimaryReplicaRouter,
+    ReplicaStickinessMiddleware,
+    replica_lag_monitor,
+    use_primary,
+)
+from employment_portal.models import Offer
+
+REPLICATION = {**settings.DATABASE_REPLICATION, "REPLICAS": ["replica"], "MAX_LAG": 5, "LAG_CHECK_INTERVAL": 60}
+
+
+@override_settings(DATABASE_REPLICATION=REPLICATION)
+class PrimaryReplicaRouterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        replica_lag_monitor.reset()
+        self.addCleanup(replica_lag_monitor.reset)
+
+    def measure(self, lag):
+        return mock.patch.object(replica_lag_monitor, "measure", return_value=lag)
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        with self.measure(0.0):
+            self.assertEqual(self.router.db_for_read(Offer), "replica")
+        self.assertEqual(self.router.db_for_write(Offer), "default")
+        self.assertTrue(self.router.allow_migrate("default", "employment_portal"))
+        self.assertFalse(self.router.allow_migrate("replica", "employment_portal"))
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        with self.measure(30.0), self.assertLogs("employment_portal.db.routers", "WARNING"):
+            self.assertEqual(self.router.db_for_read(Offer), "default")
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        with self.measure(None):
+            self.assertEqual(self.router.db_for_read(Offer), "default")
+
+    def test_lag_is_measured_once_per_interval(self):
+        with self.measure(0.0) as measure:
+            self.router.db_for_read(Offer)
+            self.router.db_for_read(Offer)
+        measure.assert_called_once_with("replica")
+
+    async def test_lag_measured_off_the_event_loop(self):
+        measured_on = []
+
+        def measure(alias):
+            measured_on.append(threading.current_thread())
+            return 0.0
+
+        with mock.patch.object(replica_lag_monitor, "measure", side_effect=measure):
+            # No lag is known yet, the read goes to the primary while it is measured on a thread.
+            self.assertEqual(self.router.db_for_read(Offer), "default")
+            for _ in range(500):
+                if replica_lag_monitor.lag("replica") is not None:
+                    break
+                await asyncio.sleep(0.01)
+            self.assertEqual(self.router.db_for_read(Offer), "replica")
+        self.assertEqual(len(measured_on), 1)
+        self.assertIsNot(measured_on[0], threading.current_thread())
+
+    def test_use_primary(self):
+        with self.measure(0.0), use_primary():
+            self.assertEqual(self.router.db_for_read(Offer), "default")
+
+
+@override_settings(DATABASE_REPLICATION=REPLICATION)
+class ReplicaOfferCacheTestCase(TestCase):
+    def test_offer_cache_is_invalidated_again_after_the_lag_window(self):
+        with mock.patch("employment_portal.caching.delayed_version_bumps.schedule") as schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                bump_offer_cache_versions(1)
+        schedule.assert_called_once_with(["offers:version", "offers:version:company:1"], 5)
+
+
+class DelayedVersionBumpsTestCase(SimpleTestCase):
+    def bump_threads(self) -> int:
+        return sum(thread.name == "offer-cache-bumps" for thread in threading.enumerate())
+
+    def test_bumps_share_one_thread(self):
+        bumps = DelayedVersionBumps()
+        bumped = threading.Event()
+        threads = self.bump_threads()
+        with mock.patch("employment_portal.caching._bump_versions", side_effect=lambda keys: bumped.set()) as bump:
+            for index in range(20):
+                bumps.schedule(["offers:version", f"offers:version:company:{index % 2}"], 0.2)
+            self.assertEqual(self.bump_threads(), threads + 1)
+            self.assertTrue(bumped.wait(5))
+        # The due bumps of a burst are merged.
+        bump.assert_called_once_with(["offers:version", "offers:version:company:0", "offers:version:company:1"])
+        self.assertEqual(bumps.pending(), 0)
+
+
+@override_settings(DATABASE_REPLICATION=REPLICATION)
+class ReplicaStickinessMiddlewareTestCase(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+        self.read_from = []
+        # The pins need a cache shared by the processes.
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        cache_settings = override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location}}
+        )
+        cache_settings.enable()
+        self.addCleanup(cache_settings.disable)
+        replica_lag_monitor.reset()
+        self.addCleanup(replica_lag_monitor.reset)
+        patcher = mock.patch.object(replica_lag_monitor, "measure", return_value=0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Measured before the async requests, which don't measure on the event loop.
+        replica_lag_monitor.lag("replica")
+
+    def view(self, request):
+        self.read_from.append(self.router.db_for_read(Offer))
+        if request.method == "POST":
+            self.router.db_for_write(Offer)
+            self.read_from.append(self.router.db_for_read(Offer))
+        return HttpResponse()
+
+    async def async_view(self, request):
+        return self.view(request)
+
+    def request(self, method, token):
+        return getattr(self.factory, method)("/api/offers/", HTTP_AUTHORIZATION=f"Token {token}")
+
+    def test_requester_reads_own_writes(self):
+        middleware = ReplicaStickinessMiddleware(self.view)
+        middleware(self.request("get", "writer"))
+        middleware(self.request("post", "writer"))
+        middleware(self.request("get", "writer"))
+        middleware(self.request("get", "reader"))
+        self.assertEqual(self.read_from, ["replica", "replica", "default", "default", "replica"])
+
+    async def test_requester_reads_own_writes_async(self):
+        middleware = ReplicaStickinessMiddleware(self.async_view)
+        await middleware(self.request("post", "writer"))
+        await middleware(self.request("get", "writer"))
+        await middleware(self.request("get", "reader"))
+        self.assertEqual(self.read_from, ["replica", "default", "default", "replica"])
+
+    def test_sticky_pin_expires(self):
+        middleware = ReplicaStickinessMiddleware(self.view)
+        with override_settings(DATABASE_REPLICATION={**REPLICATION, "STICKY_SECONDS": 0}):
+            middleware(self.request("post", "writer"))
+        middleware(self.request("get", "writer"))
+        self.assertEqual(self.read_from[-1], "replica")
+
+    def test_not_used_without_replicas(self):
+        with override_settings(DATABASE_REPLICATION={**REPLICATION, "REPLICAS": []}):
+            with self.assertRaises(MiddlewareNotUsed):
+                ReplicaStickinessMiddleware(self.view)
+
+    def test_local_cache_is_refused(self):
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            with self.assertRaisesMessage(ImproperlyConfigured, "isn't shared between processes"):
+                ReplicaStickinessMiddleware(self.view)
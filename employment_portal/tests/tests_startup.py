@@ -0,0 +1,45 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from employment_portal.startup import package_import_times, parse_import_times, profile_startup
+
+REPORT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     yaml.error
+import time:      2000 |       2120 |   yaml
+import time:       500 |       2620 | drf_yasg.codecs
+import time:       300 |        300 | django.urls
+garbage line
+"""
+
+
+class StartupProfilingTestCase(SimpleTestCase):
+    def test_parse_import_times(self):
+        imports = parse_import_times(REPORT)
+        self.assertEqual(imports[0], ("yaml.error", 0.00012, 0.00012, 2))
+        self.assertEqual(imports[2], ("drf_yasg.codecs", 0.0005, 0.00262, 0))
+        self.assertEqual(list(package_import_times(imports)), ["yaml", "drf_yasg", "django"])
+
+    def test_docs_are_loaded_lazily(self):
+        profile = profile_startup("wsgi", "/api/offers/")
+        self.assertEqual(profile["status"], 401)
+        self.assertGreater(profile["total"], profile["setup"])
+        self.assertIn("django", profile["packages"])
+        self.assertNotIn("drf_yasg", profile["packages"])
+        self.assertNotIn("pkg_resources", profile["packages"])
+
+        profile = profile_startup("asgi", "/swagger.json")
+        self.assertEqual(profile["status"], 200)
+        self.assertIn("drf_yasg", profile["packages"])
+
+    def test_components_switched_off(self):
+        profile = profile_startup("wsgi", "/admin/", env={"ADMIN_ENABLED": "False", "API_DOCS_ENABLED": "False"})
+        self.assertEqual(profile["status"], 404)
+        self.assertNotIn("employment_portal.openapi", [module for module, *_ in profile["imports"]])
+
+    def test_profile_startup_command(self):
+        stdout = StringIO()
+        call_command("profile_startup", "--top", "3", stdout=stdout)
+        self.assertIn("first_request", stdout.getvalue())
+        self.assertIn("Import time by package", stdout.getvalue())
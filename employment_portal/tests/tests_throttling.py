@@ -0,0 +1,127 @@
+from unittest import mock
+
+from django.contrib.auth import base_user, get_user_model
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from employment_portal.throttling import LocalBucketStore, SharedBucketStore, get_bucket_store, parse_rate, take_token
+
+User = get_user_model()
+
+THROTTLE_SETTINGS = {
+    "ENABLED": True,
+    "BACKEND": "local",
+    "MAX_SIZE": 100,
+    "RATES": {"login_ip": "3/min", "login_username": "2/min", "register_ip": "2/min", "register_username": "5/min"},
+}
+
+
+class TokenBucketTestCase(SimpleTestCase):
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("10/min"), (10, 60))
+        self.assertEqual(parse_rate("5/s"), (5, 1))
+        self.assertEqual(parse_rate("100/day"), (100, 86400))
+
+    def test_take_token(self):
+        state, wait = take_token(None, 2, 60, 100.0)
+        self.assertEqual((state, wait), ((1, 100.0), 0.0))
+        state, wait = take_token(state, 2, 60, 100.0)
+        self.assertEqual((state, wait), ((0, 100.0), 0.0))
+        state, wait = take_token(state, 2, 60, 115.0)
+        self.assertEqual(state, (0.5, 115.0))
+        self.assertAlmostEqual(wait, 15.0)
+        # The bucket refills up to its capacity only.
+        state, wait = take_token(state, 2, 60, 1000.0)
+        self.assertEqual((state, wait), ((1, 1000.0), 0.0))
+
+    def test_local_store_is_bounded(self):
+        store = LocalBucketStore(max_size=2)
+        for key in ("a", "b", "c"):
+            store.take(key, 1, 60)
+        self.assertEqual(list(store._buckets), ["b", "c"])
+        self.assertEqual(store.take("a", 1, 60), 0.0)
+        self.assertGreater(store.take("a", 1, 60), 0.0)
+
+
+@override_settings(AUTH_THROTTLE=THROTTLE_SETTINGS)
+class AuthThrottlingTestCase(TestCase):
+    def setUp(self):
+        get_bucket_store().clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+
+    def login(self, username="testuser", password="wrong", ip="10.0.0.1"):
+        return self.client.post(reverse("user-login"), {"username": username, "password": password}, REMOTE_ADDR=ip)
+
+    def register(self, username, identification_number, ip="10.0.0.1"):
+        data = {
+            "username": username,
+            "password": "testpassword",
+            "identification_number": identification_number,
+            "email": f"{username}@example.com",
+            "first_name": "Test",
+            "last_name": "User",
+            "phone_number": "1234567890",
+        }
+        return self.client.post(reverse("user-register"), data, REMOTE_ADDR=ip)
+
+    def count_hashing(self):
+        check = mock.patch.object(base_user, "check_password", wraps=base_user.check_password)
+        make = mock.patch.object(base_user, "make_password", wraps=base_user.make_password)
+        return check, make
+
+    def test_login_throttled_per_username_before_hashing(self):
+        self.assertEqual(self.login(ip="10.0.0.1").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.login(ip="10.0.0.2").status_code, status.HTTP_400_BAD_REQUEST)
+        check, make = self.count_hashing()
+        with check as check_password, make as make_password:
+            response = self.login(username=" TestUser ", password="testpassword", ip="10.0.0.3")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+        check_password.assert_not_called()
+        make_password.assert_not_called()
+        self.assertEqual(self.login(username="other", ip="10.0.0.3").status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_login_throttled_per_ip(self):
+        for username in ("a", "b", "c"):
+            self.assertEqual(self.login(username=username).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.login(username="d").status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.login(password="testpassword", ip="10.0.0.2").status_code, status.HTTP_200_OK)
+
+    def test_register_throttled_before_hashing(self):
+        self.assertEqual(self.register("first", "1000000001").status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.register("second", "1000000002").status_code, status.HTTP_201_CREATED)
+        check, make = self.count_hashing()
+        with check, make as make_password:
+            response = self.register("third", "1000000003")
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        make_password.assert_not_called()
+        self.assertFalse(User.objects.filter(username="third").exists())
+
+    @override_settings(AUTH_THROTTLE={**THROTTLE_SETTINGS, "ENABLED": False})
+    def test_disabled(self):
+        for _ in range(4):
+            self.assertEqual(self.login().status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "throttle": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "throttle"},
+        },
+        AUTH_THROTTLE={**THROTTLE_SETTINGS, "BACKEND": "throttle"},
+    )
+    def test_shared_backend(self):
+        self.assertIsInstance(get_bucket_store(), SharedBucketStore)
+        self.login()
+        self.login(ip="10.0.0.2")
+        # Another process sees the same buckets.
+        self.assertGreater(SharedBucketStore("throttle").take("login:username:testuser", 2, 60), 0)
+        self.assertEqual(self.login(ip="10.0.0.3").status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        caches["throttle"].set("other", "kept")
+        get_bucket_store().clear()
+        # Only the buckets are cleared.
+        self.assertEqual(caches["throttle"].get("other"), "kept")
+        self.assertEqual(self.login(ip="10.0.0.3").status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,12 +1,20 @@
+import json
+
+from django.core.cache import caches
 from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 
+from employment_portal.caching import offer_cache_stats
 from employment_portal.models import Company, Offer, Postulation
+from employment_portal.throttling import get_bucket_store
+from employment_portal.authentication import SignedTokenAuthentication
+from employment_portal.tokens import create_token_pair
+from employment_portal.views import OfferPostulationExportView, OfferUpdateView
 
 User = get_user_model()
 
@@ -23,6 +31,7 @@ class ApplicantUserLoginViewTestCase(SQLiteMemoryTestCase):
         cls.client = APIClient()
 
     def setUp(self):
+        get_bucket_store().clear()
         self.user = User.objects.create_user(username="testuser", password="testpassword")
 
     def test_applicant_user_login_success(self):
@@ -54,6 +63,9 @@ class ApplicantUserCreateViewTestCase(SQLiteMemoryTestCase):
         super().setUpClass()
         cls.client = APIClient()
 
+    def setUp(self):
+        get_bucket_store().clear()
+
     def test_applicant_user_create_success(self):
         register_url = reverse("user-register")
         data = {
@@ -154,6 +166,7 @@ class OfferCreateViewTestCase(SQLiteMemoryTestCase):
         self.assertEqual(str(offer.salary), self.offer_data["salary"])
         self.assertEqual(offer.company.id, self.offer_data["company"])
         self.assertEqual(offer.skills, self.offer_data["skills"])
+        self.assertEqual(sorted(offer.skill_set.values_list("name", flat=True)), ["django", "python"])
 
     def test_offer_create_failure_missing_required_fields(self):
         create_offer_url = reverse("offer-create")
@@ -209,6 +222,9 @@ class OfferUpdateViewTestCase(SQLiteMemoryTestCase):
         self.assertEqual(str(updated_offer.salary), self.updated_offer_data["salary"])
         self.assertEqual(updated_offer.company.id, self.updated_offer_data["company"])
         self.assertEqual(updated_offer.skills, self.updated_offer_data["skills"])
+        self.assertEqual(
+            sorted(updated_offer.skill_set.values_list("name", flat=True)), ["django", "python", "react"]
+        )
 
     def test_offer_update_failure_invalid_authentication_token(self):
         response = self.client.patch(self.update_offer_url, self.updated_offer_data)
@@ -246,6 +262,17 @@ class PostulationCreateViewTestCase(TestCase):
         self.assertEqual(postulation.user, self.user)
         self.assertEqual(postulation.offer, self.offer)
 
+        self.offer.refresh_from_db()
+        self.company.refresh_from_db()
+        self.assertEqual(self.offer.postulation_count, 1)
+        self.assertEqual(self.company.postulation_count, 1)
+
+        postulation.delete()
+        self.offer.refresh_from_db()
+        self.company.refresh_from_db()
+        self.assertEqual(self.offer.postulation_count, 0)
+        self.assertEqual(self.company.postulation_count, 0)
+
     def test_postulation_create_failure_invalid_offer(self):
         create_postulation_url = reverse("postulation-create")
 
@@ -273,3 +300,499 @@ class PostulationCreateViewTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
         self.assertIn("user", response.data)
+
+
+class OfferListViewTestCase(SQLiteMemoryTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        self.company = Company.objects.create(name="Test Company", nit="1234567890")
+        self.other_company = Company.objects.create(name="Other Company", nit="0987654321")
+        self.offers = [
+            Offer.objects.create(
+                title=f"Test Offer {index}",
+                description="Test Offer Description",
+                salary=1000 * (index + 1),
+                company=self.company if index % 2 == 0 else self.other_company,
+                skills="Python, Django",
+            )
+            for index in range(5)
+        ]
+        self.list_offer_url = reverse("offer-list")
+
+    def collect_pages(self, params):
+        ids = []
+        response = self.client.get(self.list_offer_url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(offer["id"] for offer in response.data["results"])
+            if response.data["next"] is None:
+                return ids
+            response = self.client.get(response.data["next"])
+
+    def test_offer_list_newest_first(self):
+        response = self.client.get(self.list_offer_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["next"])
+        self.assertEqual([offer["id"] for offer in response.data["results"]], [offer.id for offer in reversed(self.offers)])
+
+    def test_offer_list_cursor_walks_all_pages(self):
+        ids = self.collect_pages({"page_size": 2})
+        self.assertEqual(ids, [offer.id for offer in reversed(self.offers)])
+
+    def test_offer_list_cursor_with_equal_created_at(self):
+        Offer.objects.update(created_at=self.offers[0].created_at)
+        ids = self.collect_pages({"page_size": 2})
+        self.assertEqual(ids, [offer.id for offer in reversed(self.offers)])
+
+    def test_offer_list_filter_by_company_and_salary(self):
+        ids = self.collect_pages({"page_size": 1, "company": self.company.id, "salary_min": "2000", "salary_max": "5000"})
+        self.assertEqual(ids, [self.offers[4].id, self.offers[2].id])
+
+    def test_offer_list_filter_by_skills(self):
+        self.client.patch(reverse("offer-update", args=[self.offers[0].id]), {"skills": "Python, React"})
+        self.client.patch(reverse("offer-update", args=[self.offers[1].id]), {"skills": "Django"})
+        self.client.patch(reverse("offer-update", args=[self.offers[2].id]), {"skills": "python, django"})
+
+        ids = self.collect_pages({"skills": "python,  DJANGO"})
+        self.assertEqual(ids, [self.offers[2].id])
+        ids = self.collect_pages({"skills": "python, django", "skills_match": "any"})
+        self.assertEqual(ids, [self.offers[2].id, self.offers[1].id, self.offers[0].id])
+        ids = self.collect_pages({"skills": "python, rust"})
+        self.assertEqual(ids, [])
+
+    def test_offer_list_failure_invalid_filters(self):
+        response = self.client.get(self.list_offer_url, {"salary_min": "5000", "salary_max": "1000"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("salary_min", response.data)
+
+    def test_offer_list_failure_invalid_cursor(self):
+        response = self.client.get(self.list_offer_url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_offer_list_failure_invalid_authentication_token(self):
+        self.client.credentials()
+        response = self.client.get(self.list_offer_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class OfferSearchViewTestCase(SQLiteMemoryTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        self.company = Company.objects.create(name="Test Company", nit="1234567890")
+        self.description_match = Offer.objects.create(
+            title="Backend Developer",
+            description="We use Django every day",
+            salary="1000.00",
+            company=self.company,
+            skills="Python",
+        )
+        self.title_match = Offer.objects.create(
+            title="Django Developer",
+            description="Build APIs",
+            salary="2000.00",
+            company=self.company,
+            skills="Python, REST",
+        )
+        self.skills_match = Offer.objects.create(
+            title="Backend Engineer",
+            description="Build APIs",
+            salary="3000.00",
+            company=self.company,
+            skills="Python, Django",
+        )
+        Offer.objects.create(
+            title="Frontend Developer",
+            description="Build user interfaces",
+            salary="4000.00",
+            company=self.company,
+            skills="React",
+        )
+        self.search_offer_url = reverse("offer-search")
+
+    def test_offer_search_ranks_title_over_skills_over_description(self):
+        response = self.client.get(self.search_offer_url, {"q": "django"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [offer["id"] for offer in response.data["results"]],
+            [self.title_match.id, self.skills_match.id, self.description_match.id],
+        )
+
+    def test_offer_search_requires_every_word(self):
+        response = self.client.get(self.search_offer_url, {"q": "django apis"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([offer["id"] for offer in response.data["results"]], [self.title_match.id, self.skills_match.id])
+
+    def test_offer_search_pagination(self):
+        response = self.client.get(self.search_offer_url, {"q": "django", "page_size": 2})
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNone(response.data["previous"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([offer["id"] for offer in response.data["results"]], [self.description_match.id])
+        self.assertIsNone(response.data["next"])
+        self.assertIsNotNone(response.data["previous"])
+
+    def test_offer_search_with_filters(self):
+        response = self.client.get(self.search_offer_url, {"q": "django", "salary_min": "1500"})
+        self.assertEqual([offer["id"] for offer in response.data["results"]], [self.title_match.id, self.skills_match.id])
+
+    def test_offer_search_failure_missing_query(self):
+        response = self.client.get(self.search_offer_url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("q", response.data)
+
+    def test_offer_search_failure_invalid_page(self):
+        response = self.client.get(self.search_offer_url, {"q": "django", "page": "0"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class OfferListCacheTestCase(SQLiteMemoryTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        self.company = Company.objects.create(name="Test Company", nit="1234567890")
+        self.other_company = Company.objects.create(name="Other Company", nit="0987654321")
+        self.offer = Offer.objects.create(
+            title="Test Offer", description="Test Offer Description", salary=1000, company=self.company
+        )
+        self.list_offer_url = reverse("offer-list")
+
+    def offer_data(self, company):
+        return {
+            "title": "New Offer",
+            "description": "New Offer Description",
+            "salary": "2000.00",
+            "company": company,
+            "skills": "Python",
+        }
+
+    def list_ids(self, params=None, cache_status="MISS"):
+        response = self.client.get(self.list_offer_url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["X-Cache"], cache_status)
+        return [offer["id"] for offer in response.data["results"]]
+
+    def test_offer_list_served_from_cache(self):
+        ids = self.list_ids()
+        # The token is already cached and the page is neither queried nor serialized.
+        with self.assertNumQueries(0):
+            self.assertEqual(self.list_ids(cache_status="HIT"), ids)
+        self.list_ids({"page_size": 5})
+
+    def test_offer_create_invalidates_cache(self):
+        self.list_ids()
+        response = self.client.post(reverse("offer-create"), self.offer_data(self.company.id), format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.list_ids(), [response.data["id"], self.offer.id])
+
+    def test_offer_of_other_company_keeps_filtered_pages(self):
+        self.list_ids({"company": self.company.id})
+        self.client.post(reverse("offer-create"), self.offer_data(self.other_company.id), format="json")
+        self.assertEqual(self.list_ids({"company": self.company.id}, cache_status="HIT"), [self.offer.id])
+        self.assertEqual(len(self.list_ids()), 2)
+
+    def test_offer_update_invalidates_previous_company(self):
+        self.list_ids({"company": self.company.id})
+        self.list_ids({"company": self.other_company.id})
+        update_url = reverse("offer-update", args=[self.offer.id])
+        response = self.client.patch(update_url, {"company": self.other_company.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.list_ids({"company": self.company.id}), [])
+        self.assertEqual(self.list_ids({"company": self.other_company.id}), [self.offer.id])
+
+    def test_offer_bulk_create_invalidates_cache(self):
+        self.list_ids({"company": self.other_company.id})
+        data = [self.offer_data(self.other_company.id)] * 2
+        response = self.client.post(reverse("offer-bulk-create"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(self.list_ids({"company": self.other_company.id})), 2)
+
+    def test_offer_delete_invalidates_cache(self):
+        self.list_ids()
+        self.offer.delete()
+        self.assertEqual(self.list_ids(), [])
+
+    def test_postulation_refreshes_cached_count(self):
+        self.list_ids()
+        Postulation.objects.create(user=self.user, offer=self.offer)
+        response = self.client.get(self.list_offer_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"][0]["postulation_count"], 1)
+
+    def test_offer_search_served_from_cache(self):
+        response = self.client.get(reverse("offer-search"), {"q": "test"})
+        self.assertEqual(response["X-Cache"], "MISS")
+        response = self.client.get(reverse("offer-search"), {"q": "test"})
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual([offer["id"] for offer in response.data["results"]], [self.offer.id])
+
+    def test_offer_list_cache_counts_hits_and_misses(self):
+        before = offer_cache_stats.as_dict()
+        self.list_ids()
+        self.list_ids(cache_status="HIT")
+        after = offer_cache_stats.as_dict()
+        self.assertEqual(after["hits"] - before["hits"], 1)
+        self.assertEqual(after["misses"] - before["misses"], 1)
+
+    def test_offer_list_cache_disabled(self):
+        with self.settings(OFFER_CACHE={"ENABLED": False, "BACKEND": "default", "TIMEOUT": 300}):
+            response = self.client.get(self.list_offer_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header("X-Cache"))
+
+
+class OfferConditionalRequestTestCase(SQLiteMemoryTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        self.company = Company.objects.create(name="Test Company", nit="1234567890")
+        self.offer = Offer.objects.create(
+            title="Test Offer", description="Test Offer Description", salary=1000, company=self.company
+        )
+        self.list_offer_url = reverse("offer-list")
+        self.offer_url = reverse("offer-update", args=[self.offer.id])
+
+    def assertNotModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_offer_list_not_modified(self):
+        response = self.client.get(self.list_offer_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        self.assertIn("Last-Modified", response)
+        # Served from the offer cache without any query.
+        with self.assertNumQueries(0):
+            self.assertNotModified(self.list_offer_url, response["ETag"])
+
+    @override_settings(OFFER_CACHE={"ENABLED": False, "BACKEND": "default", "TIMEOUT": 300})
+    def test_offer_list_not_modified_without_cache(self):
+        etag = self.client.get(self.list_offer_url)["ETag"]
+        # Only the page query runs, the page isn't serialized.
+        with self.assertNumQueries(1):
+            self.assertNotModified(self.list_offer_url, etag)
+
+    @override_settings(OFFER_CACHE={"ENABLED": False, "BACKEND": "default", "TIMEOUT": 300})
+    def test_offer_list_etag_changes(self):
+        etags = [self.client.get(self.list_offer_url)["ETag"]]
+        Postulation.objects.create(user=self.user, offer=self.offer)
+        etags.append(self.client.get(self.list_offer_url)["ETag"])
+        Offer.objects.create(title="Other Offer", description="Other", salary=1000, company=self.company)
+        etags.append(self.client.get(self.list_offer_url)["ETag"])
+        self.offer.delete()
+        response = self.client.get(self.list_offer_url, HTTP_IF_NONE_MATCH=", ".join(etags))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(set(etags + [response["ETag"]])), 4)
+
+    def test_offer_retrieve_not_modified(self):
+        response = self.client.get(self.offer_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["id"], self.offer.id)
+        self.assertFalse(response["ETag"].startswith("W/"))
+        self.assertIn("Last-Modified", response)
+        self.assertNotModified(self.offer_url, response["ETag"])
+
+    def test_offer_update_with_current_etag(self):
+        etag = self.client.get(self.offer_url)["ETag"]
+        response = self.client.patch(self.offer_url, {"salary": "2000.00"}, format="json", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response["ETag"], self.client.get(self.offer_url)["ETag"])
+
+    def test_offer_update_failure_stale_etag(self):
+        etag = self.client.get(self.offer_url)["ETag"]
+        self.client.patch(self.offer_url, {"salary": "2000.00"}, format="json")
+        response = self.client.patch(self.offer_url, {"salary": "3000.00"}, format="json", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.salary, 2000)
+
+    def test_offer_update_locks_offer(self):
+        # The offer compared with If-Match is read with SELECT ... FOR UPDATE, reads don't lock it.
+        view = OfferUpdateView()
+        view.request = APIRequestFactory().patch(self.offer_url)
+        self.assertTrue(view.get_queryset().query.select_for_update)
+        view.request = APIRequestFactory().get(self.offer_url)
+        self.assertFalse(view.get_queryset().query.select_for_update)
+
+    @override_settings(OFFER_CACHE={"ENABLED": False, "BACKEND": "default", "TIMEOUT": 300})
+    def test_offer_list_etag_of_page(self):
+        for index in range(3):
+            Offer.objects.create(title=f"Offer {index}", description="Other", salary=1000, company=self.company)
+        url = self.list_offer_url + "?page_size=2"
+        etag = self.client.get(url)["ETag"]
+        # Changes outside of the page keep its ETag.
+        Postulation.objects.create(user=self.user, offer=self.offer)
+        self.assertNotModified(url, etag)
+        Offer.objects.get(title="Offer 2").save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+
+class OfferBulkCreateViewTestCase(SQLiteMemoryTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpassword")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        self.company = Company.objects.create(name="Test Company", nit="1234567890")
+        self.other_company = Company.objects.create(name="Other Company", nit="0987654321")
+        self.bulk_create_offer_url = reverse("offer-bulk-create")
+
+    def offer_data(self, index, company):
+        return {
+            "title": f"Test Offer {index}",
+            "description": "This is a test offer",
+            "salary": "1000.00",
+            "company": company,
+            "skills": "Python, Django",
+        }
+
+    def test_offer_bulk_create_success(self):
+        data = [self.offer_data(index, self.company.id if index % 2 else self.other_company.id) for index in range(5)]
+        # token, companies, savepoint, company locks, bands of the near-duplicate check, offers, duplicate_of
+        # of the offers repeating an earlier one, skills (insert + select), offer skills, facets (insert +
+        # update), signature bands and release savepoint, the search vector update is skipped on SQLite
+        with self.assertNumQueries(14):
+            response = self.client.post(self.bulk_create_offer_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["created"]), 5)
+        self.assertEqual(response.data["errors"], [])
+        self.assertEqual(Offer.objects.count(), 5)
+        self.assertEqual(Offer.objects.filter(company=self.other_company).count(), 3)
+        offer = Offer.objects.get(pk=response.data["created"][0]["id"])
+        self.assertEqual(sorted(offer.skill_set.values_list("name", flat=True)), ["django", "python"])
+
+    def test_offer_bulk_create_reports_item_errors(self):
+        invalid_company = self.offer_data(1, 99999)
+        missing_title = self.offer_data(2, self.company.id)
+        del missing_title["title"]
+        data = [self.offer_data(0, self.company.id), invalid_company, missing_title, self.offer_data(3, "abc")]
+        response = self.client.post(self.bulk_create_offer_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([offer["title"] for offer in response.data["created"]], ["Test Offer 0"])
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1, 2, 3])
+        self.assertIn("company", response.data["errors"][0]["errors"])
+        self.assertIn("title", response.data["errors"][1]["errors"])
+        self.assertIn("company", response.data["errors"][2]["errors"])
+        self.assertEqual(Offer.objects.count(), 1)
+
+    def test_offer_bulk_create_failure_all_items_invalid(self):
+        response = self.client.post(self.bulk_create_offer_url, [self.offer_data(0, 99999)], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["created"], [])
+        self.assertEqual(len(response.data["errors"]), 1)
+
+    def test_offer_bulk_create_failure_not_a_list(self):
+        response = self.client.post(self.bulk_create_offer_url, self.offer_data(0, self.company.id), format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data)
+
+    @override_settings(OFFER_BULK_CREATE_MAX_ITEMS=2)
+    def test_offer_bulk_create_failure_too_many_items(self):
+        data = [self.offer_data(index, self.company.id) for index in range(3)]
+        response = self.client.post(self.bulk_create_offer_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Offer.objects.count(), 0)
+
+
+class PostulationExportViewTestCase(SQLiteMemoryTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="testuser", password="testpassword", is_staff=True)
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION="Token " + self.token.key)
+        self.company = Company.objects.create(name="Test Company", nit="1234567890")
+        self.offers = [
+            Offer.objects.create(
+                title=f"Test Offer {index}",
+                description="Test Offer Description",
+                salary=50000.0,
+                company=self.company,
+                skills="Python, Django",
+            )
+            for index in range(2)
+        ]
+        self.applicants = [
+            User.objects.create_user(
+                username=f"applicant{index}",
+                password="testpassword",
+                identification_number=str(index),
+                email=f"applicant{index}@example.com",
+            )
+            for index in range(3)
+        ]
+        for applicant in self.applicants:
+            Postulation.objects.create(user=applicant, offer=self.offers[0])
+        Postulation.objects.create(user=self.applicants[0], offer=self.offers[1])
+
+    def export(self, url_name, pk, **params):
+        response = self.client.get(reverse(url_name, args=[pk]), params)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_offer_postulation_export_csv(self):
+        with self.assertNumQueries(3):
+            response, content = self.export("offer-postulation-export", self.offers[0].id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn(f"postulations-offer-{self.offers[0].id}.csv", response["Content-Disposition"])
+        lines = content.splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["postulation_id", "offer_id", "offer_title"])
+        self.assertEqual(len(lines), 4)
+        self.assertIn("applicant2@example.com", lines[3])
+
+    def test_company_postulation_export_ndjson(self):
+        response, content = self.export("company-postulation-export", self.company.id, export_format="ndjson")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row["offer_id"] for row in rows], [self.offers[0].id] * 3 + [self.offers[1].id])
+        self.assertEqual(rows[-1]["username"], "applicant0")
+        self.assertEqual(rows[-1]["offer_title"], "Test Offer 1")
+
+    def test_postulation_export_failure_not_found(self):
+        response = self.client.get(reverse("offer-postulation-export", args=[99999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_postulation_export_failure_not_staff(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.get(reverse("company-postulation-export", args=[self.company.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(self.applicants[0])
+        response = self.client.get(reverse("offer-postulation-export", args=[self.offers[0].id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(
+        SIGNED_TOKEN={
+            "SECRET_KEY": "test-secret",
+            "ALGORITHM": "HS256",
+            "ACCESS_TOKEN_LIFETIME": 60,
+            "REFRESH_TOKEN_LIFETIME": 600,
+        }
+    )
+    def test_postulation_export_signed_token(self):
+        # The staff status comes from the token claims, the user row isn't read.
+        view = OfferPostulationExportView.as_view(authentication_classes=[SignedTokenAuthentication])
+        for user, expected in ((self.user, status.HTTP_200_OK), (self.applicants[0], status.HTTP_403_FORBIDDEN)):
+            access = create_token_pair(user)["access"]
+            request = APIRequestFactory().get("/", HTTP_AUTHORIZATION="Bearer " + access)
+            response = view(request, pk=self.offers[0].id)
+            self.assertEqual(response.status_code, expected)
+
+    def test_postulation_export_failure_invalid_format(self):
+        response = self.client.get(reverse("offer-postulation-export", args=[self.offers[0].id]), {"export_format": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("export_format", response.data)
@@ -0,0 +1,199 @@
+"""
+Token bucket throttling of the unauthenticated endpoints that hash passwords (login and registration).
+
+Every (scope, key) pair has a bucket holding up to 'capacity' tokens, refilled continuously at
+capacity / period tokens per second. A request takes one token, or is rejected with 429 Too Many
+Requests and a Retry-After header when the bucket is empty. The throttles run in
+APIView.initial(), before the serializer validates the payload, so a rejected request never
+reaches the password hasher.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate: str) -> tuple:
+    """
+    Return the (capacity, period in seconds) of a DRF style rate such as "10/min".
+    """
+    capacity, period = rate.split("/")
+    return int(capacity), PERIODS[period[0]]
+
+
+def take_token(state, capacity: int, period: float, now: float) -> tuple:
+    """
+    Take a token from a bucket.
+
+    Parameters:
+    - state: The (tokens, updated_at) of the bucket, or None for a full bucket.
+
+    Returns:
+    - A tuple with the new state and the seconds to wait for a token, 0 when one was taken.
+    """
+    tokens, updated_at = state if state is not None else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated_at) * capacity / period)
+    if tokens >= 1:
+        return (tokens - 1, now), 0.0
+    return (tokens, now), (1 - tokens) * period / capacity
+
+
+class LocalBucketStore:
+    """
+    Token buckets of this process, in a bounded LRU.
+
+    Attributes:
+    - max_size (int): Maximum number of buckets, the least recently used one is dropped first
+        (a dropped bucket is full again).
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, period: float) -> float:
+        with self._lock:
+            state, wait = take_token(self._buckets.get(key), capacity, period, time.monotonic())
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_size:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class SharedBucketStore:
+    """
+    Token buckets stored in one of the Django cache backends (settings.CACHES), shared by all the processes.
+
+    The bucket is read and written back without a lock, so concurrent requests of the same key
+    on different processes may occasionally both take the last token. Buckets are stored with
+    the generation of the store, read in the same round trip, and clear() moves to a new
+    generation: the other entries of the Django cache are kept.
+
+    Attributes:
+    - alias (str): The alias of the Django cache.
+    """
+
+    key_prefix = "throttle:"
+    generation_key = "throttle-generation"
+
+    def __init__(self, alias: str):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def take(self, key: str, capacity: int, period: float) -> float:
+        cache_key = self.key_prefix + hashlib.sha256(key.encode()).hexdigest()
+        values = self.cache.get_many([cache_key, self.generation_key])
+        generation = values.get(self.generation_key)
+        if generation is None:
+            # An evicted generation restarts from a new unique value, never from an old one.
+            self.cache.add(self.generation_key, time.time_ns(), None)
+            generation = self.cache.get(self.generation_key)
+        entry = values.get(cache_key)
+        # Buckets stored before the last clear() belong to an older generation and start full.
+        bucket = entry[1] if entry is not None and entry[0] == generation else None
+        state, wait = take_token(bucket, capacity, period, time.time())
+        # An untouched bucket is full again after one period, it doesn't need to be kept longer.
+        self.cache.set(cache_key, (generation, state), int(period) + 1)
+        return wait
+
+    def clear(self) -> None:
+        self.cache.set(self.generation_key, time.time_ns(), None)
+
+
+_bucket_store = None
+
+
+def get_bucket_store():
+    """
+    Return the bucket store configured in settings.AUTH_THROTTLE, built on first use.
+    """
+    global _bucket_store
+    if _bucket_store is None:
+        config = settings.AUTH_THROTTLE
+        if config["BACKEND"] == "local":
+            _bucket_store = LocalBucketStore(config["MAX_SIZE"])
+        else:
+            _bucket_store = SharedBucketStore(config["BACKEND"])
+    return _bucket_store
+
+
+def reset_bucket_store() -> None:
+    global _bucket_store
+    _bucket_store = None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Base throttle taking a token from the bucket of the request key.
+
+    The rate is settings.AUTH_THROTTLE["RATES"]["<throttle_scope of the view>_<key_name>"],
+    a request without a rate or without a key isn't throttled.
+
+    Attributes:
+    - key_name (str): The name of the key in the rates, "ip" or "username".
+
+    Methods:
+    - get_key(request): Returns the key of the bucket of the request, or None.
+
+    """
+
+    key_name = None
+
+    def get_key(self, request):
+        raise NotImplementedError(".get_key() must be overridden")
+
+    def allow_request(self, request, view) -> bool:
+        self.wait_time = 0.0
+        config = settings.AUTH_THROTTLE
+        rate = config["RATES"].get(f"{getattr(view, 'throttle_scope', None)}_{self.key_name}")
+        if not config["ENABLED"] or rate is None:
+            return True
+        key = self.get_key(request)
+        if key is None:
+            return True
+        capacity, period = parse_rate(rate)
+        self.wait_time = get_bucket_store().take(f"{view.throttle_scope}:{self.key_name}:{key}", capacity, period)
+        return self.wait_time == 0
+
+    def wait(self) -> float:
+        return self.wait_time
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Token bucket per client IP address (see REST_FRAMEWORK["NUM_PROXIES"] behind a proxy).
+    """
+
+    key_name = "ip"
+
+    def get_key(self, request):
+        return self.get_ident(request)
+
+
+class UsernameTokenBucketThrottle(TokenBucketThrottle):
+    """
+    Token bucket per submitted username, whatever the IP address the attempts come from.
+    """
+
+    key_name = "username"
+
+    def get_key(self, request):
+        data = request.data
+        username = data.get("username") if hasattr(data, "get") else None
+        return username.strip().lower() if isinstance(username, str) and username.strip() else None
@@ -0,0 +1,95 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# HMAC digest used by each supported APP_ALGORITHM, tokens use the JWT compact format.
+ALGORITHMS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+
+class InvalidSignedToken(Exception):
+    pass
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _get_signing_config():
+    config = settings.SIGNED_TOKEN
+    if not config["SECRET_KEY"]:
+        raise ImproperlyConfigured("APP_SECRET_KEY must be set to use signed tokens.")
+    if config["ALGORITHM"] not in ALGORITHMS:
+        raise ImproperlyConfigured(f"APP_ALGORITHM must be one of {', '.join(ALGORITHMS)}.")
+    return config["SECRET_KEY"].encode(), config["ALGORITHM"]
+
+
+def _sign(signing_input: bytes, secret: bytes, algorithm: str) -> bytes:
+    return hmac.new(secret, signing_input, ALGORITHMS[algorithm]).digest()
+
+
+def encode_token(claims: dict) -> str:
+    secret, algorithm = _get_signing_config()
+    header = _b64encode(json.dumps({"alg": algorithm, "typ": "JWT"}, separators=(",", ":")).encode())
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    signing_input = f"{header}.{payload}".encode("ascii")
+    return f"{header}.{payload}.{_b64encode(_sign(signing_input, secret, algorithm))}"
+
+
+def decode_token(token: str, token_type: str) -> dict:
+    """
+    Verify a signed token and return its claims, without any database access.
+
+    Raises InvalidSignedToken when the token is malformed, signed with another key or
+    algorithm, expired, or isn't of the expected type.
+    """
+    secret, algorithm = _get_signing_config()
+    try:
+        header, payload, signature = token.split(".")
+        signing_input = f"{header}.{payload}".encode("ascii")
+        if json.loads(_b64decode(header)).get("alg") != algorithm:
+            raise InvalidSignedToken("Invalid token algorithm.")
+        if not hmac.compare_digest(_b64decode(signature), _sign(signing_input, secret, algorithm)):
+            raise InvalidSignedToken("Invalid token signature.")
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, UnicodeError, AttributeError):
+        raise InvalidSignedToken("Malformed token.")
+
+    if not isinstance(claims, dict) or claims.get("type") != token_type:
+        raise InvalidSignedToken("Invalid token type.")
+    if not isinstance(claims.get("exp"), int) or claims["exp"] <= time.time():
+        raise InvalidSignedToken("Token has expired.")
+    return claims
+
+
+def create_token_pair(user) -> dict:
+    """
+    Issue a short-lived access token and a longer-lived refresh token for the user.
+
+    The tokens carry the staff status of the user, checked by the admin-only views.
+    """
+    now = int(time.time())
+    claims = {"user_id": user.pk, "username": user.get_username(), "is_staff": user.is_staff, "iat": now}
+    lifetimes = {
+        ACCESS_TOKEN: settings.SIGNED_TOKEN["ACCESS_TOKEN_LIFETIME"],
+        REFRESH_TOKEN: settings.SIGNED_TOKEN["REFRESH_TOKEN_LIFETIME"],
+    }
+    return {
+        token_type: encode_token({**claims, "type": token_type, "exp": now + lifetime})
+        for token_type, lifetime in lifetimes.items()
+    }
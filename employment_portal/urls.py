@@ -1,20 +1,50 @@
 from django.urls import path
 
 
+from .async_views import AsyncCompanyDetailView, AsyncOfferDetailView, AsyncOfferListView, AsyncOfferSearchView
 from .views import (
     ApplicantUserLoginView,
+    SignedTokenRefreshView,
     ApplicantUserCreateView,
+    OfferBulkCreateView,
     OfferCreateView,
+    OfferFacetsView,
+    OfferListView,
+    OfferRecommendationView,
+    OfferSearchView,
     OfferUpdateView,
     CompanyCreateView,
     PostulationCreateView,
+    OfferPostulationExportView,
+    CompanyPostulationExportView,
 )
 
 urlpatterns = [
     path("login/", ApplicantUserLoginView.as_view(), name="user-login"),
+    path("token/refresh/", SignedTokenRefreshView.as_view(), name="token-refresh"),
     path("register/", ApplicantUserCreateView.as_view(), name="user-register"),
     path("create-company/", CompanyCreateView.as_view(), name="company-create"),
+    path("offers/", OfferListView.as_view(), name="offer-list"),
+    path("offers/search/", OfferSearchView.as_view(), name="offer-search"),
+    path("offers/facets/", OfferFacetsView.as_view(), name="offer-facets"),
+    path("offers/recommended/", OfferRecommendationView.as_view(), name="offer-recommendations"),
     path("create-offer/", OfferCreateView.as_view(), name="offer-create"),
+    path("bulk-create-offers/", OfferBulkCreateView.as_view(), name="offer-bulk-create"),
     path("update-offer/<int:pk>/", OfferUpdateView.as_view(), name="offer-update"),
     path("create-postulation/", PostulationCreateView.as_view(), name="postulation-create"),
+    path(
+        "offers/<int:pk>/postulations/export/",
+        OfferPostulationExportView.as_view(),
+        name="offer-postulation-export",
+    ),
+    path(
+        "companies/<int:pk>/postulations/export/",
+        CompanyPostulationExportView.as_view(),
+        name="company-postulation-export",
+    ),
+    # Async read endpoints, served without holding a thread per request under ASGI (focunti/asgi.py)
+    path("async/offers/", AsyncOfferListView.as_view(), name="async-offer-list"),
+    path("async/offers/search/", AsyncOfferSearchView.as_view(), name="async-offer-search"),
+    path("async/offers/<int:pk>/", AsyncOfferDetailView.as_view(), name="async-offer-detail"),
+    path("async/companies/<int:pk>/", AsyncCompanyDetailView.as_view(), name="async-company-detail"),
 ]
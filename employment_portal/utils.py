@@ -1,4 +1,4 @@
-from django.core.mail import send_mail
+from .outbox import queue_email
 
 
 def send_registration_email(username, email):
@@ -6,5 +6,6 @@ def send_registration_email(username, email):
     message = f"Hola {username}, gracias por registrarte en nuestro sitio."
     from_email = "noreply@example.com"
     recipient_list = [email]
+    # The email is sent by the send_queued_emails command, so registration doesn't wait for the mail server.
+    queue_email(subject, message, from_email, recipient_list)
     return {"subject": subject, "message": message, "from_email": from_email, "recipient_list": recipient_list}
-    # send_mail(subject, message, from_email, recipient_list)
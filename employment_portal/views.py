@@ -1,22 +1,63 @@
+from django.conf import settings
+from django.db import transaction
+from django.shortcuts import get_object_or_404
 from rest_framework import status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authtoken.models import Token
-from rest_framework.generics import ListAPIView, CreateAPIView, UpdateAPIView
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.generics import ListAPIView, CreateAPIView, RetrieveUpdateAPIView
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
+from .authentication import SignedTokenAuthentication, signed_tokens_enabled
+from .caching import OfferCacheMixin, bump_offer_cache_versions
+from .conditional import ConditionalListMixin, ConditionalObjectMixin
+from .duplicates import FLAG, REJECT, find_duplicate_offer, lock_company_offers
+from .exports import export_response
+from .facets import get_offer_facets
+from .filters import filter_offers
 from .models import ApplicantUser, Company, Offer, Postulation
-from .serializers import ApplicantUserSerializer, CompanySerializer, OfferSerializer, PostulationSerializer
+from .pagination import OfferCursorPagination, OfferSearchPagination
+from .read_serializers import ValuesListMixin
+from .recommendations import offer_recommender
+from .search import search_offers, update_offer_search_vector
+from .serializers import (
+    ApplicantUserLoginSerializer,
+    ApplicantUserSerializer,
+    CompanySerializer,
+    OfferBulkSerializer,
+    OfferFacetsFilterSerializer,
+    OfferFilterSerializer,
+    OfferRecommendationFilterSerializer,
+    OfferSearchFilterSerializer,
+    OfferSerializer,
+    PostulationExportSerializer,
+    PostulationSerializer,
+)
+from .throttling import IPTokenBucketThrottle, UsernameTokenBucketThrottle
+from .tokens import REFRESH_TOKEN, InvalidSignedToken, create_token_pair, decode_token
 from .utils import send_registration_email
 
 
 class ApplicantUserLoginView(ObtainAuthToken):
     """
     Custom authentication view for obtaining the auth token.
+
+    When settings.REST_FRAMEWORK authenticates with SignedTokenAuthentication it issues
+    signed 'access' and 'refresh' tokens instead of a database backed token.
+
+    Attempts are throttled per IP address and per username (settings.AUTH_THROTTLE), before
+    the password is checked. The password is checked on the bounded hashing pool of
+    employment_portal.hashing, which answers 503 with a Retry-After header when it is full.
     """
 
+    serializer_class = ApplicantUserLoginSerializer
+    throttle_classes = [IPTokenBucketThrottle, UsernameTokenBucketThrottle]
+    throttle_scope = "login"
+    query_budget = 5
+
     def post(self, request, *args, **kwargs) -> Response:
         """
         Handle POST requests to obtain an authentication token.
@@ -25,11 +66,44 @@ class ApplicantUserLoginView(ObtainAuthToken):
         - request: The HTTP request object.
 
         Returns:
-        - Response object with 'token' and 'user_id' upon successful authentication.
+        - Response object with 'token' and 'user_id' upon successful authentication,
+            or with 'access', 'refresh' and 'user_id' when signed tokens are enabled.
         """
-        response = super().post(request, *args, **kwargs)
-        token = Token.objects.get(key=response.data["token"])
-        return Response({"token": token.key, "user_id": token.user_id}, status=status.HTTP_200_OK)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data["user"]
+        if signed_tokens_enabled():
+            return Response({**create_token_pair(user), "user_id": user.pk}, status=status.HTTP_200_OK)
+        token, _ = Token.objects.get_or_create(user=user)
+        return Response({"token": token.key, "user_id": user.pk}, status=status.HTTP_200_OK)
+
+
+class SignedTokenRefreshView(APIView):
+    """
+    View for exchanging a signed refresh token for a new pair of signed tokens.
+
+    The user is loaded once here to reject deleted or deactivated users, which keeps the
+    database out of the authentication of every other request.
+
+    Supported HTTP methods:
+    - POST: Returns new 'access' and 'refresh' tokens for a valid 'refresh' token.
+
+    """
+
+    # Only used to answer 401 with the Bearer challenge, the endpoint itself is public.
+    authentication_classes = [SignedTokenAuthentication]
+    permission_classes = [AllowAny]
+    query_budget = 1
+
+    def post(self, request) -> Response:
+        try:
+            claims = decode_token(str(request.data.get("refresh", "")), REFRESH_TOKEN)
+        except InvalidSignedToken as exc:
+            raise AuthenticationFailed(str(exc))
+        user = ApplicantUser.objects.filter(pk=claims["user_id"], is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed("User not found or inactive.")
+        return Response({**create_token_pair(user), "user_id": user.pk}, status=status.HTTP_200_OK)
 
 
 class ApplicantUserCreateView(CreateAPIView):
@@ -51,10 +125,13 @@ class ApplicantUserCreateView(CreateAPIView):
         In this case, authentication is omitted.
     - permission_classes (list): List of permission classes used to control access to the view.
         In this case, any unauthenticated user is allowed to access the view.
+    - throttle_classes (list): Token bucket throttles per IP address and per username, applied
+        before the password is hashed (settings.AUTH_THROTTLE, scope "register").
 
     Methods:
     - perform_create(serializer): A method that is executed during the creation of a new ApplicantUser.
         It saves the new ApplicantUser object and sends a registration email to the newly created user.
+        The password is hashed on the bounded hashing pool of employment_portal.hashing (503 when full).
 
     """
 
@@ -62,6 +139,9 @@ class ApplicantUserCreateView(CreateAPIView):
     serializer_class = ApplicantUserSerializer
     authentication_classes = []
     permission_classes = [AllowAny]
+    throttle_classes = [IPTokenBucketThrottle, UsernameTokenBucketThrottle]
+    throttle_scope = "register"
+    query_budget = 4
 
     def perform_create(self, serializer):
         user = serializer.save()
@@ -91,14 +171,42 @@ class CompanyCreateView(CreateAPIView):
 
     queryset = Company.objects.all()
     serializer_class = CompanySerializer
-    authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    query_budget = 3
 
     def perform_create(self, serializer):
         serializer.save()
 
 
-class OfferCreateView(CreateAPIView):
+class OfferDuplicateMixin:
+    """
+    Offer view mixin looking for a near-duplicate offer of the same company (see duplicates.py).
+
+    Methods:
+    - check_duplicate(company_id, description, skills, offer_id): Locks the company until the
+        transaction ends and returns the id of the older offer the offer nearly duplicates, or
+        None. Depending on settings.OFFER_DUPLICATES["ACTION"] a near-duplicate is returned
+        ("flag") or refused with a 400 response ("reject"). Must run in the transaction saving
+        the offer, so concurrent offers of the company are checked one after the other.
+
+    """
+
+    def check_duplicate(self, company_id: int, description: str, skills: str, offer_id=None):
+        action = settings.OFFER_DUPLICATES["ACTION"]
+        if action not in (FLAG, REJECT):
+            return None
+        lock_company_offers(company_id)
+        duplicate = find_duplicate_offer(company_id, description, skills, exclude=offer_id, older_than=offer_id)
+        if duplicate is None:
+            return None
+        if action == REJECT:
+            raise ValidationError(
+                {"description": [f"Near-duplicate of offer {duplicate[0]} of the same company."]}, code="duplicate"
+            )
+        return duplicate[0]
+
+
+class OfferCreateView(OfferDuplicateMixin, CreateAPIView):
     """
     View for creating an Offer.
 
@@ -113,26 +221,225 @@ class OfferCreateView(CreateAPIView):
 
     Methods:
     - perform_create(serializer): A method that is executed during the creation of a new Offer.
-        It saves the new Offer object.
+        In one transaction, it looks for a near-duplicate offer of the same company with the
+        company locked (see OfferDuplicateMixin), saves the new Offer object and computes its
+        search vector. A near-duplicate is saved with 'duplicate_of' set or refused.
 
     """
 
     queryset = Offer.objects.all()
     serializer_class = OfferSerializer
-    authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    query_budget = 14
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        serializer.save()
+        data = serializer.validated_data
+        duplicate_of = self.check_duplicate(data["company"].pk, data["description"], data["skills"])
+        offer = serializer.save(duplicate_of_id=duplicate_of)
+        update_offer_search_vector(Offer.objects.filter(pk=offer.pk))
+
+
+class OfferBulkCreateView(CreateAPIView):
+    """
+    View for creating many Offers in a single request.
+
+    This view receives a list of offers. The companies referenced by all of them are
+    validated with a single query and the valid offers are inserted with bulk_create in
+    batches inside one transaction. Invalid offers, and near-duplicates with the "reject"
+    duplicate action, are reported by their position in the payload and don't prevent the
+    valid ones from being created.
+
+    Supported HTTP methods:
+    - POST: Creates the valid Offers of the list.
+
+    Attributes:
+    - queryset (QuerySet): A QuerySet that defines the set of Offer objects available for the view.
+    - serializer_class (Serializer): The serializer used to validate each offer of the payload.
+
+    Methods:
+    - create(request): Validates the payload, creates the valid Offers and returns the created
+        offers and the errors of the invalid ones. It responds 201 if at least one offer was created.
+
+    """
+
+    queryset = Offer.objects.all()
+    serializer_class = OfferBulkSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = 15
+
+    def create(self, request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data, many=True, max_length=settings.OFFER_BULK_CREATE_MAX_ITEMS)
+        serializer.is_valid(raise_exception=True)
+        created = serializer.save() if serializer.validated_data else []
+        response = {"created": serializer.data if created else [], "errors": serializer.item_errors}
+        response_status = status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        return Response(response, status=response_status)
+
+
+class OfferListView(OfferCacheMixin, ConditionalListMixin, ValuesListMixin, ListAPIView):
+    """
+    View for listing Offers.
+
+    This view returns offers ordered from newest to oldest using cursor pagination
+    over (created_at, id), so each page costs the same regardless of its depth.
+    Pages are cached until an offer of the listed companies changes (see caching.py).
+    Responses carry a weak ETag of the offers of the page and requests sending it back in
+    If-None-Match get 304 Not Modified while none of them changed (see conditional.py).
+    Pages are read with .values() and serialized by the ValuesSerializer of OfferSerializer,
+    which returns the same JSON without building model instances.
+
+    Supported HTTP methods:
+    - GET: Lists Offers, optionally filtered by company and salary range.
+
+    Query parameters:
+    - company (int): Only offers of this Company.
+    - salary_min (decimal): Only offers with salary greater than or equal to this value.
+    - salary_max (decimal): Only offers with salary less than or equal to this value.
+    - skills (str): Comma separated skill names the offers must require.
+    - skills_match (str): "all" (default) to require every skill, "any" for at least one of them.
+    - cursor (str): Opaque cursor taken from the 'next' link of the previous page.
+    - page_size (int): Number of offers per page.
+
+    Attributes:
+    - queryset (QuerySet): A QuerySet that defines the set of Offer objects available for the view.
+    - serializer_class (Serializer): The serializer used to convert Offer instances into JSON.
+    - pagination_class (Pagination): The keyset pagination used to split the results in pages.
+    - filter_serializer_class (Serializer): The serializer used to validate the query parameters.
+
+    Methods:
+    - get_filter_params(): Validates the query parameters and returns them.
+    - get_queryset(): Applies the validated query parameter filters to the queryset.
+
+    """
+
+    queryset = Offer.objects.all()
+    serializer_class = OfferSerializer
+    pagination_class = OfferCursorPagination
+    permission_classes = [IsAuthenticated]
+    query_budget = 3
+
+    filter_serializer_class = OfferFilterSerializer
+
+    def get_filter_params(self) -> dict:
+        if not hasattr(self, "_filter_params"):
+            filters = self.filter_serializer_class(data=self.request.query_params)
+            filters.is_valid(raise_exception=True)
+            self._filter_params = filters.validated_data
+        return self._filter_params
+
+    def get_queryset(self):
+        return filter_offers(super().get_queryset(), self.get_filter_params())
+
+
+class OfferSearchView(OfferListView):
+    """
+    View for searching Offers by keyword.
+
+    On PostgreSQL the search runs against the weighted search vector of the offer
+    (title > skills > description) through its GIN index and is ranked with ts_rank.
+    Other databases fall back to a slower case-insensitive match over the same fields.
+
+    Supported HTTP methods:
+    - GET: Lists the Offers matching the search terms, most relevant first.
+
+    Query parameters:
+    - q (str): Required. The search terms.
+    - company, salary_min, salary_max, skills, skills_match: The same filters as the offer listing.
+    - page (int): Page number, starting at 1.
+    - page_size (int): Number of offers per page.
+
+    Attributes:
+    - pagination_class (Pagination): Page number pagination that doesn't count the matches.
+    - filter_serializer_class (Serializer): The serializer used to validate the query parameters.
+
+    Methods:
+    - get_queryset(): Applies the filters and the ranked search to the queryset.
+
+    """
+
+    pagination_class = OfferSearchPagination
+    filter_serializer_class = OfferSearchFilterSerializer
 
+    def get_queryset(self):
+        return search_offers(super().get_queryset(), self.get_filter_params()["q"])
 
-class OfferUpdateView(UpdateAPIView):
+
+class OfferFacetsView(APIView):
     """
-    View for updating an Offer.
+    View for the offer facets of the job board sidebar.
 
-    This view allows updating an existing Offer object.
+    The facets are read from the buckets of the OfferFacet table, kept up to date when offers
+    are created, updated and deleted (see facets.py), so the cost of a request depends on the
+    number of buckets and not on the number of offers.
 
     Supported HTTP methods:
+    - GET: Returns the salary band histogram ('salary', with the 'min' and 'max' of each band),
+        and the companies and skills with the most offers ('companies', 'skills').
+
+    Query parameters:
+    - limit (int): Number of companies and skills returned, settings.OFFER_FACETS["LIMIT"] by default.
+
+    """
+
+    permission_classes = [IsAuthenticated]
+    query_budget = 3
+
+    def get(self, request) -> Response:
+        filters = OfferFacetsFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        limit = filters.validated_data.get("limit", settings.OFFER_FACETS["LIMIT"])
+        return Response(get_offer_facets(limit), status=status.HTTP_200_OK)
+
+
+class OfferRecommendationView(APIView):
+    """
+    View for the offers recommended to the authenticated user.
+
+    The offers are ranked by the TF-IDF cosine similarity of their title, skills and description
+    with the profile description of the user, scored on the inverted index of recommendations.py,
+    so the cost of a request depends on the terms of the profile and not on the number of offers.
+
+    Supported HTTP methods:
+    - GET: Returns the recommended offers, most similar first, each with its 'score' between 0
+        and 1. The list is empty when the profile description has no known terms, or when the
+        index hasn't been built yet.
+
+    Query parameters:
+    - limit (int): Number of offers returned, settings.OFFER_RECOMMENDATIONS["LIMIT"] by default.
+
+    """
+
+    permission_classes = [IsAuthenticated]
+    query_budget = 4
+
+    def get(self, request) -> Response:
+        filters = OfferRecommendationFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        limit = filters.validated_data.get("limit", settings.OFFER_RECOMMENDATIONS["LIMIT"])
+        # request.user only holds the id and username with signed tokens, and may be a cached copy.
+        profile = ApplicantUser.objects.filter(pk=request.user.pk).values_list("profile_description", flat=True)
+        # Offers deleted since the index was built are still scored, extra candidates replace them.
+        scores = dict(offer_recommender.recommend(profile.first() or "", limit * 2))
+        offers = Offer.objects.in_bulk(list(scores))
+        recommended = [offers[offer_id] for offer_id in scores if offer_id in offers][:limit]
+        results = OfferSerializer(recommended, many=True).data
+        for result in results:
+            result["score"] = round(scores[result["id"]], 4)
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class OfferUpdateView(OfferDuplicateMixin, ConditionalObjectMixin, RetrieveUpdateAPIView):
+    """
+    View for retrieving and updating an Offer.
+
+    This view allows reading and updating an existing Offer object. Responses carry the
+    ETag and Last-Modified of the offer: GET with a matching If-None-Match returns
+    304 Not Modified, and PUT or PATCH with an If-Match that no longer matches returns
+    412 Precondition Failed instead of overwriting a newer version.
+
+    Supported HTTP methods:
+    - GET: Retrieves an existing Offer.
     - PUT: Updates an existing Offer.
     - PATCH: Partially updates an existing Offer.
 
@@ -142,17 +449,35 @@ class OfferUpdateView(UpdateAPIView):
 
     Methods:
     - perform_update(serializer): A method that is executed during the update of an existing Offer.
-        It saves the updated Offer object.
+        When its description, skills or company change, 'duplicate_of' is recomputed against
+        the older offers of its company (see OfferDuplicateMixin). It then saves the updated
+        Offer object, recomputes its search vector and invalidates the cached offer pages of
+        its previous company when it changes. The newer offers flagged as duplicates of it keep
+        their 'duplicate_of', which records what they duplicated when they were written.
 
     """
 
     queryset = Offer.objects.all()
     serializer_class = OfferSerializer
-    authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    query_budget = 17
 
     def perform_update(self, serializer):
-        serializer.save()
+        offer, data = serializer.instance, serializer.validated_data
+        previous_company_id = offer.company_id
+        extra = {}
+        if data.keys() & {"description", "skills", "company"}:
+            extra["duplicate_of_id"] = self.check_duplicate(
+                data["company"].pk if "company" in data else offer.company_id,
+                data.get("description", offer.description),
+                data.get("skills", offer.skills),
+                offer.pk,
+            )
+        offer = serializer.save(**extra)
+        if offer.company_id != previous_company_id:
+            # Saving the offer only invalidates the cached pages of its new company.
+            bump_offer_cache_versions(previous_company_id)
+        update_offer_search_vector(Offer.objects.filter(pk=offer.pk))
 
 
 class PostulationCreateView(CreateAPIView):
@@ -170,14 +495,73 @@ class PostulationCreateView(CreateAPIView):
 
     Methods:
     - perform_create(serializer): A method that is executed during the creation of a new Postulation.
-        It saves the new Postulation object.
+        It saves the new Postulation object, the postulation counters of its Offer and Company
+        are incremented in the same transaction (see signals.py).
 
     """
 
     queryset = Postulation.objects.all()
     serializer_class = PostulationSerializer
-    authentication_classes = [TokenAuthentication]
     permission_classes = [IsAuthenticated]
+    query_budget = 8
 
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save()
+
+
+class PostulationExportView(APIView):
+    """
+    Base view for exporting Postulations as a streamed CSV or NDJSON file.
+
+    The applicant and offer columns are read with joins in a single query and the rows are
+    written to the response while they are fetched in chunks, so memory stays flat whatever
+    the number of postulations. The exports hold the email and phone number of the applicants,
+    only staff users can download them.
+
+    Supported HTTP methods:
+    - GET: Streams the Postulations of the object identified by 'pk'.
+
+    Query parameters:
+    - export_format (str): "csv" (default) or "ndjson".
+
+    Attributes:
+    - parent_model (Model): The model whose Postulations are exported.
+    - parent_lookup (str): The Postulation lookup that filters by the parent primary key.
+
+    Methods:
+    - get(request, pk): Validates the format, checks the parent exists and streams the export.
+
+    """
+
+    permission_classes = [IsAdminUser]
+    query_budget = 2
+    parent_model = None
+    parent_lookup = None
+
+    def get(self, request, pk):
+        params = PostulationExportSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        get_object_or_404(self.parent_model.objects.only("pk"), pk=pk)
+
+        queryset = Postulation.objects.filter(**{self.parent_lookup: pk}).order_by("offer_id", "id")
+        filename = f"postulations-{self.parent_model._meta.model_name}-{pk}"
+        return export_response(queryset, params.validated_data["export_format"], filename)
+
+
+class OfferPostulationExportView(PostulationExportView):
+    """
+    View for exporting the Postulations of an Offer.
+    """
+
+    parent_model = Offer
+    parent_lookup = "offer_id"
+
+
+class CompanyPostulationExportView(PostulationExportView):
+    """
+    View for exporting the Postulations to all the Offers of a Company.
+    """
+
+    parent_model = Company
+    parent_lookup = "offer__company_id"
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
+from importlib.util import find_spec
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -31,20 +32,30 @@ ALLOWED_HOSTS = []
 
 # Application definition
 
+# Optional components, API-only workers can switch them off to start faster.
+ADMIN_ENABLED = os.getenv("ADMIN_ENABLED", "True") == "True"
+API_DOCS_ENABLED = os.getenv("API_DOCS_ENABLED", "True") == "True"
+
 INSTALLED_APPS = [
-    "django.contrib.admin",
+    *(["django.contrib.admin"] if ADMIN_ENABLED else []),
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-    "drf_yasg",
     "rest_framework",
     "rest_framework.authtoken",
     "employment_portal",
 ]
 
+# drf_yasg isn't an installed app: the app registry would import it at startup (and pkg_resources
+# with it), the docs views import it on their first request. Only its templates and static files
+# are needed, they are found without importing it.
+DRF_YASG_DIR = Path(find_spec("drf_yasg").origin).parent if API_DOCS_ENABLED else None
+
 MIDDLEWARE = [
+    "employment_portal.instrumentation.RequestMetricsMiddleware",
+    "employment_portal.db.routers.ReplicaStickinessMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -59,7 +70,7 @@ ROOT_URLCONF = "focunti.urls"
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
-        "DIRS": [],
+        "DIRS": [DRF_YASG_DIR / "templates"] if API_DOCS_ENABLED else [],
         "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
@@ -78,17 +89,54 @@ WSGI_APPLICATION = "focunti.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+DATABASE_POOL_ENABLED = os.getenv("DATABASE_POOL_ENABLED", "True") == "True"
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "employment_portal.db.postgresql" if DATABASE_POOL_ENABLED else "django.db.backends.postgresql",
         "NAME": os.getenv("POSTGRES_DB"),
         "USER": os.getenv("POSTGRES_USER"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOSTNAME"),
         "PORT": os.getenv("POSTGRES_PORT"),
+        # With the pool every request returns its connection to the pool, persistent
+        # connections only apply to the plain backend.
+        "CONN_MAX_AGE": 0 if DATABASE_POOL_ENABLED else int(os.getenv("DATABASE_CONN_MAX_AGE", "0")),
+        "CONN_HEALTH_CHECKS": True,
+        # Connection pool of each process, see employment_portal/db/postgresql/base.py.
+        "POOL": {
+            "MAX_SIZE": int(os.getenv("DATABASE_POOL_MAX_SIZE", "10")),
+            "TIMEOUT": float(os.getenv("DATABASE_POOL_TIMEOUT", "30")),
+            "HEALTH_CHECK_INTERVAL": float(os.getenv("DATABASE_POOL_HEALTH_CHECK_INTERVAL", "30")),
+            "MAX_LIFETIME": float(os.getenv("DATABASE_POOL_MAX_LIFETIME", "3600")),
+            "LOG_INTERVAL": float(os.getenv("DATABASE_POOL_LOG_INTERVAL", "60")),
+        },
     }
 }
 
+# Read replicas of "default", as comma separated "host" or "host:port" of PostgreSQL servers with
+# the same database and credentials. Reads are routed to them by PrimaryReplicaRouter.
+for index, replica in enumerate(filter(None, os.getenv("DATABASE_REPLICA_HOSTS", "").split(",")), start=1):
+    host, _, port = replica.strip().partition(":")
+    DATABASES[f"replica{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["employment_portal.db.routers.PrimaryReplicaRouter"]
+
+DATABASE_REPLICATION = {
+    "REPLICAS": [alias for alias in DATABASES if alias != "default"],
+    # Seconds a requester reads from the primary after writing.
+    "STICKY_SECONDS": int(os.getenv("DATABASE_REPLICA_STICKY_SECONDS", "5")),
+    # Seconds of lag above which a replica stops serving reads.
+    "MAX_LAG": float(os.getenv("DATABASE_REPLICA_MAX_LAG", "5")),
+    "LAG_CHECK_INTERVAL": float(os.getenv("DATABASE_REPLICA_LAG_CHECK_INTERVAL", "5")),
+    "CACHE_BACKEND": "default",
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -110,13 +158,190 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# "db" authenticates with authtoken keys stored in the database (cached), "signed" with stateless
+# access tokens signed with APP_SECRET_KEY that are verified without any database access.
+AUTH_TOKEN_MODE = os.getenv("APP_AUTH_TOKEN_MODE", "db")
+
+AUTHENTICATION_CLASSES = {
+    "db": "employment_portal.authentication.CachedTokenAuthentication",
+    "signed": "employment_portal.authentication.SignedTokenAuthentication",
+}
+
+SIGNED_TOKEN = {
+    "SECRET_KEY": os.getenv("APP_SECRET_KEY"),
+    "ALGORITHM": os.getenv("APP_ALGORITHM", "HS256"),
+    "ACCESS_TOKEN_LIFETIME": int(os.getenv("APP_ACCESS_TOKEN_LIFETIME", "900")),
+    "REFRESH_TOKEN_LIFETIME": int(os.getenv("APP_REFRESH_TOKEN_LIFETIME", "604800")),
+}
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        AUTHENTICATION_CLASSES[AUTH_TOKEN_MODE],
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # orjson based drop-in replacements of JSONRenderer and JSONParser
+    "DEFAULT_RENDERER_CLASSES": [
+        "employment_portal.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "employment_portal.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    # Number of proxies in front of the application, the client IP of the throttles is read from X-Forwarded-For.
+    "NUM_PROXIES": int(os.environ["NUM_PROXIES"]) if os.getenv("NUM_PROXIES") else None,
+    # Turns domain exceptions such as a full password hashing queue into API responses.
+    "EXCEPTION_HANDLER": "employment_portal.exceptions.exception_handler",
+}
+
+# Local memory cache by default, set CACHE_BACKEND and CACHE_LOCATION to share it between processes,
+# e.g. django.core.cache.backends.redis.RedisCache and redis://redis:6379/0
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    },
+}
+
+# Cache of the offer listing and search pages, BACKEND is the alias of a cache in CACHES
+OFFER_CACHE = {
+    "ENABLED": os.getenv("OFFER_CACHE_ENABLED", "True") == "True",
+    "BACKEND": os.getenv("OFFER_CACHE_BACKEND", "default"),
+    "TIMEOUT": int(os.getenv("OFFER_CACHE_TIMEOUT", "300")),
+}
+
+# Cache of the token to user resolution used by CachedTokenAuthentication.
+# BACKEND is "local" for an in-process LRU or the alias of a cache in CACHES to share it between processes.
+# A local cache only drops the tokens deleted and the users deactivated by its own process. The other processes
+# drop them within REVOCATION_CHECK_INTERVAL seconds through a generation kept in the REVOCATION_BACKEND cache
+# of CACHES, which must be shared by the processes (e.g. Redis): with a per-process cache such as the default
+# local memory one, or an empty REVOCATION_BACKEND, they keep accepting them for up to TIMEOUT seconds.
+TOKEN_AUTH_CACHE = {
+    "BACKEND": os.getenv("TOKEN_AUTH_CACHE_BACKEND", "local"),
+    "MAX_SIZE": int(os.getenv("TOKEN_AUTH_CACHE_MAX_SIZE", "10000")),
+    "TIMEOUT": int(os.getenv("TOKEN_AUTH_CACHE_TIMEOUT", "300")),
+    "REVOCATION_BACKEND": os.getenv("TOKEN_AUTH_CACHE_REVOCATION_BACKEND", "default"),
+    "REVOCATION_CHECK_INTERVAL": float(os.getenv("TOKEN_AUTH_CACHE_REVOCATION_CHECK_INTERVAL", "1")),
+}
+
+# Token bucket throttling of login and registration, checked before any password is hashed.
+# BACKEND is "local" for in-process buckets or the alias of a cache in CACHES to share them between processes.
+# RATES are "<capacity>/<period>" per "<scope>_<key>", the bucket refills at capacity per period.
+AUTH_THROTTLE = {
+    "ENABLED": os.getenv("AUTH_THROTTLE_ENABLED", "True") == "True",
+    "BACKEND": os.getenv("AUTH_THROTTLE_BACKEND", "local"),
+    "MAX_SIZE": int(os.getenv("AUTH_THROTTLE_MAX_SIZE", "100000")),
+    "RATES": {
+        "login_ip": os.getenv("AUTH_THROTTLE_LOGIN_IP_RATE", "20/min"),
+        "login_username": os.getenv("AUTH_THROTTLE_LOGIN_USERNAME_RATE", "5/min"),
+        "register_ip": os.getenv("AUTH_THROTTLE_REGISTER_IP_RATE", "10/min"),
+        "register_username": os.getenv("AUTH_THROTTLE_REGISTER_USERNAME_RATE", "3/min"),
+    },
+}
+
+# Password hashing on a bounded pool of threads of each process (employment_portal.hashing).
+# MAX_WORKERS hashes run at once (0 for the number of CPUs), MAX_QUEUE more wait for a worker and a request
+# waiting more than QUEUE_TIMEOUT seconds for a place is answered with 503. REHASH upgrades the outdated
+# hashes of logged in users in the background when a worker is idle.
+PASSWORD_HASHING = {
+    "ENABLED": os.getenv("PASSWORD_HASHING_POOL_ENABLED", "True") == "True",
+    "MAX_WORKERS": int(os.getenv("PASSWORD_HASHING_MAX_WORKERS", "0")),
+    "MAX_QUEUE": int(os.getenv("PASSWORD_HASHING_MAX_QUEUE", "32")),
+    "QUEUE_TIMEOUT": float(os.getenv("PASSWORD_HASHING_QUEUE_TIMEOUT", "5")),
+    "REHASH": os.getenv("PASSWORD_HASHING_REHASH", "True") == "True",
+}
+
+# Text search configuration used for the offer full-text search on PostgreSQL
+OFFER_SEARCH_CONFIG = os.getenv("OFFER_SEARCH_CONFIG", "simple")
+
+# Limits of the bulk offer creation endpoint
+OFFER_BULK_CREATE_MAX_ITEMS = int(os.getenv("OFFER_BULK_CREATE_MAX_ITEMS", "1000"))
+OFFER_BULK_CREATE_BATCH_SIZE = int(os.getenv("OFFER_BULK_CREATE_BATCH_SIZE", "500"))
+
+# Offer facets of the /api/offers/facets/ endpoint: width of the salary bands of the histogram (run
+# "manage.py rebuild_offer_facets" after changing it) and default number of companies and skills returned.
+OFFER_FACETS = {
+    "SALARY_BAND_WIDTH": int(os.getenv("OFFER_FACETS_SALARY_BAND_WIDTH", "1000")),
+    "LIMIT": int(os.getenv("OFFER_FACETS_LIMIT", "20")),
+}
+
+# Near-duplicate offers of the same company found at creation (see employment_portal/duplicates.py).
+# ACTION is "flag" to create them with duplicate_of set, "reject" to refuse them or "off". Changing
+# BANDS, ROWS or SHINGLE_SIZE requires "manage.py rebuild_offer_signatures".
+OFFER_DUPLICATES = {
+    "ACTION": os.getenv("OFFER_DUPLICATES_ACTION", "flag"),
+    "THRESHOLD": float(os.getenv("OFFER_DUPLICATES_THRESHOLD", "0.8")),
+    "BANDS": int(os.getenv("OFFER_DUPLICATES_BANDS", "16")),
+    "ROWS": int(os.getenv("OFFER_DUPLICATES_ROWS", "4")),
+    "SHINGLE_SIZE": int(os.getenv("OFFER_DUPLICATES_SHINGLE_SIZE", "3")),
+}
+
+# Inverted index of the offer TF-IDF vectors written by "manage.py build_offer_recommendations"
+# and mapped by the recommendation view, which recommends nothing until the file exists.
+# MAX_POSTINGS keeps only the offers where each term weighs the most, which bounds the cost of a
+# request but may miss offers matching mostly frequent terms (0 keeps them all, exact results).
+# Every CHANGES_INTERVAL seconds a process reads the offers changed since the index was built, and
+# rebuilds the index in the background once more than MAX_CHANGES offers changed.
+OFFER_RECOMMENDATIONS = {
+    "PATH": os.getenv("OFFER_RECOMMENDATIONS_PATH", str(BASE_DIR / "offer_recommendations.idx")),
+    "MAX_POSTINGS": int(os.getenv("OFFER_RECOMMENDATIONS_MAX_POSTINGS", "2000")),
+    "MAX_QUERY_TERMS": int(os.getenv("OFFER_RECOMMENDATIONS_MAX_QUERY_TERMS", "32")),
+    "LIMIT": int(os.getenv("OFFER_RECOMMENDATIONS_LIMIT", "10")),
+    "CHANGES_INTERVAL": float(os.getenv("OFFER_RECOMMENDATIONS_CHANGES_INTERVAL", "5")),
+    "MAX_CHANGES": int(os.getenv("OFFER_RECOMMENDATIONS_MAX_CHANGES", "10000")),
+}
+
+# OpenAPI schema written by "manage.py build_openapi_schema" and served by the schema views,
+# generated on the first request when the file is missing or doesn't match the URL conf.
+OPENAPI_SCHEMA = {
+    "PATH": os.getenv("OPENAPI_SCHEMA_PATH", str(BASE_DIR / "openapi.json")),
+}
+
+# Email delivery, registration emails are queued in the outbox and sent by the send_queued_emails command
+EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
+EMAIL_HOST = os.getenv("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", "25"))
+EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "False") == "True"
+
+EMAIL_OUTBOX = {
+    "BATCH_SIZE": int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "100")),
+    "MAX_ATTEMPTS": int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5")),
+    "RETRY_BACKOFF": int(os.getenv("EMAIL_OUTBOX_RETRY_BACKOFF", "60")),
+    "MAX_BACKOFF": int(os.getenv("EMAIL_OUTBOX_MAX_BACKOFF", "3600")),
+    # Seconds the other workers skip a claimed batch, longer than sending a batch takes.
+    "LEASE": int(os.getenv("EMAIL_OUTBOX_LEASE", "600")),
+}
+
+# When True a view running more queries than its query_budget fails instead of logging a warning,
+# the test runner always enforces the budgets.
+QUERY_BUDGET_ENFORCE = os.getenv("QUERY_BUDGET_ENFORCE", "False") == "True"
+
+TEST_RUNNER = "employment_portal.tests.runner.QueryBudgetTestRunner"
+
+# Request metrics (queries, db and serializer time) are logged at INFO by employment_portal.instrumentation
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "employment_portal.instrumentation": {
+            "handlers": ["console"],
+            "level": os.getenv("REQUEST_METRICS_LOG_LEVEL", "WARNING"),
+            "propagate": False,
+        },
+        "employment_portal.db": {
+            "handlers": ["console"],
+            "level": os.getenv("DATABASE_POOL_LOG_LEVEL", "WARNING"),
+            "propagate": False,
+        },
+    },
 }
 
 # Internationalization
@@ -136,6 +361,8 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+STATICFILES_DIRS = [DRF_YASG_DIR / "static"] if API_DOCS_ENABLED else []
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -14,29 +14,41 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, re_path, include
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Your API",
-        default_version="v1",
-        description="Your API description",
-        terms_of_service="https://www.yourapp.com/terms/",
-        contact=openapi.Contact(email="contact@yourapp.com"),
-        license=openapi.License(name="Your License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt
+
+
+def lazy_schema_view(method: str, *args):
+    """
+    Return the view of SchemaView.<method>(*args), imported on its first request so that
+    drf_yasg isn't loaded by the workers that never serve the docs.
+    """
+    view = None
+
+    @csrf_exempt
+    def schema_view(request, *view_args, **view_kwargs):
+        nonlocal view
+        if view is None:
+            view = getattr(import_string("employment_portal.openapi.SchemaView"), method)(*args, cache_timeout=0)
+        return view(request, *view_args, **view_kwargs)
+
+    return schema_view
+
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
     path("api/", include("employment_portal.urls")),
-    re_path(r"^swagger(?P<format>\.json|\.yaml)$", schema_view.without_ui(cache_timeout=0), name="schema-json"),
-    path("swagger/", schema_view.with_ui("swagger", cache_timeout=0), name="schema-swagger-ui"),
-    path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
 ]
+
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path("admin/", admin.site.urls))
+
+if settings.API_DOCS_ENABLED:
+    urlpatterns += [
+        re_path(r"^swagger(?P<format>\.json|\.yaml)$", lazy_schema_view("without_ui"), name="schema-json"),
+        path("swagger/", lazy_schema_view("with_ui", "swagger"), name="schema-swagger-ui"),
+        path("redoc/", lazy_schema_view("with_ui", "redoc"), name="schema-redoc"),
+    ]